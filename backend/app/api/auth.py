@@ -194,7 +194,11 @@ def refresh_token():
     try:
         current_user_id = get_jwt_identity()
         
-        # Generate new access token
+        # Deactivated or deleted users cannot refresh
+        user = User.query.get(current_user_id)
+        if not user or not user.is_active:
+            return error_response("User not found or inactive", 401)
+        
         new_access_token = create_access_token(identity=current_user_id)
         
         return success_response(
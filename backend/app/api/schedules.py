@@ -1,21 +1,56 @@
 # backend/app/api/schedules.py - COMPLETE VERSION
 """Schedule Management API - Complete with all missing endpoints."""
-from flask import Blueprint, request, jsonify
+from flask import Blueprint, request, jsonify, Response, stream_with_context, current_app, has_app_context
 from flask_jwt_extended import jwt_required, get_jwt_identity
 from app import db, limiter
 from app.models.schedule import Schedule, WeekDay
 from app.models.user import User, UserRole
 from app.models.room import Room
 from app.models.student import Section, StudyType
-from app.utils.helpers import success_response, error_response
+from app.utils.helpers import success_response, error_response, json_response, get_redis
 from app.utils.decorators import admin_required, teacher_required
 from datetime import datetime, time, timedelta
-from sqlalchemy import and_, or_
+from functools import lru_cache
+from operator import itemgetter
+from collections import Counter
+from itertools import chain
+from sqlalchemy import event, inspect
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.orm import Session, selectinload
 import pandas as pd
+import redis
+import json
+import csv
 import io
 
 schedules_bp = Blueprint('schedules', __name__)
 
+# Current-schedule candidates are cached per day, 5-minute bucket and audience
+CURRENT_SCHEDULE_BUCKET_MINUTES = 5
+CURRENT_SCHEDULE_CACHE_TTL = 600  # seconds
+# Bumped whenever a commit changes schedules, rooms or teacher names
+CURRENT_SCHEDULE_GENERATION_KEY = 'schedules:current:generation'
+
+# Per-process /current results, keyed on (user id, minute)
+CURRENT_RESULT_CACHE_TTL = 30  # seconds
+CURRENT_RESULT_CACHE_MAX = 1024
+CURRENT_SCHEDULE_ERROR = 'Error fetching current schedule'
+
+# Enum lookups keyed by lower- and upper-case member names, built once at import
+_WEEKDAY_LUT = {m.name.lower(): m for m in WeekDay} | {m.name: m for m in WeekDay}
+_SECTION_LUT = {m.name.lower(): m for m in Section} | {m.name: m for m in Section}
+_STUDY_TYPE_LUT = {m.name.lower(): m for m in StudyType} | {m.name: m for m in StudyType}
+
+def _lookup_enum(lut, value, field):
+    """Resolve a request value through an enum lookup table."""
+    member = lut.get(value)
+    if member is None:
+        # Mixed-case input such as "Sunday"
+        member = lut.get(str(value).upper())
+    if member is None:
+        raise ValueError(f"Invalid {field}: {value}")
+    return member
+
 @schedules_bp.route('/health', methods=['GET'])
 def health_check():
     """Health check endpoint."""
@@ -31,7 +66,10 @@ def get_schedules():
         user = User.query.get(current_user_id)
         
         # Build query
-        query = Schedule.query.filter_by(is_active=True)
+        query = Schedule.query.filter_by(is_active=True).options(
+            selectinload(Schedule.teacher),
+            selectinload(Schedule.room)
+        )
         
         # Apply filters based on user role
         if user.role == UserRole.STUDENT:
@@ -56,13 +94,13 @@ def get_schedules():
         room_id = request.args.get('room_id', type=int)
         
         if section:
-            query = query.filter_by(section=Section[section.upper()])
+            query = query.filter_by(section=_lookup_enum(_SECTION_LUT, section, 'section'))
         if study_year:
             query = query.filter_by(study_year=study_year)
         if study_type:
-            query = query.filter_by(study_type=StudyType[study_type.upper()])
+            query = query.filter_by(study_type=_lookup_enum(_STUDY_TYPE_LUT, study_type, 'study_type'))
         if day:
-            query = query.filter_by(day_of_week=WeekDay[day.upper()])
+            query = query.filter_by(day_of_week=_lookup_enum(_WEEKDAY_LUT, day, 'day'))
         if room_id:
             query = query.filter_by(room_id=room_id)
         
@@ -70,9 +108,11 @@ def get_schedules():
         schedules = query.order_by(Schedule.day_of_week, Schedule.start_time).all()
         
         return success_response(
-            data=[schedule.to_dict() for schedule in schedules]
+            data=[schedule_dict(schedule) for schedule in schedules]
         )
         
+    except ValueError as e:
+        return error_response(str(e), 400)
     except Exception as e:
         return error_response(f"Error fetching schedules: {str(e)}", 500)
 
@@ -90,7 +130,10 @@ def get_weekly_schedule():
         teacher_id = request.args.get('teacher_id', type=int)
         
         # Build base query
-        query = Schedule.query.filter_by(is_active=True)
+        query = Schedule.query.filter_by(is_active=True).options(
+            selectinload(Schedule.teacher),
+            selectinload(Schedule.room)
+        )
         
         # Apply user-based filters
         if user.role == UserRole.STUDENT:
@@ -108,7 +151,7 @@ def get_weekly_schedule():
                 query = query.filter_by(teacher_id=teacher_id)
         else:  # Admin
             if section:
-                query = query.filter_by(section=Section[section.upper()])
+                query = query.filter_by(section=_lookup_enum(_SECTION_LUT, section, 'section'))
             if study_year:
                 query = query.filter_by(study_year=study_year)
             if teacher_id:
@@ -121,9 +164,18 @@ def get_weekly_schedule():
         for day in WeekDay:
             weekly_schedule[day.name.lower()] = []
         
+        # Statistics are accumulated in the same pass
+        subjects = set()
+        total_seconds = 0
+        per_day_count = Counter()
+        
         for schedule in schedules:
             day_name = schedule.day_of_week.name.lower()
-            schedule_data = schedule.to_dict()
+            schedule_data = dict(schedule_dict(schedule))
+            
+            subjects.add(schedule.subject_name)
+            total_seconds += _to_seconds(schedule.end_time) - _to_seconds(schedule.start_time)
+            per_day_count[day_name] += 1
             
             # Add room details
             room = Room.query.get(schedule.room_id)
@@ -139,14 +191,11 @@ def get_weekly_schedule():
         
         # Calculate schedule statistics
         stats = {
-            'total_subjects': len(set(s.subject_name for s in schedules)),
-            'total_hours_per_week': sum(
-                (datetime.combine(datetime.today(), s.end_time) - 
-                 datetime.combine(datetime.today(), s.start_time)).total_seconds() / 3600
-                for s in schedules
-            ),
-            'days_with_classes': len([day for day, classes in weekly_schedule.items() if classes]),
-            'busiest_day': max(weekly_schedule.items(), key=lambda x: len(x[1]))[0] if schedules else None
+            'total_subjects': len(subjects),
+            'total_hours_per_week': total_seconds / 3600,
+            'days_with_classes': len(per_day_count),
+            # Ties resolve in WeekDay order, as before
+            'busiest_day': max(weekly_schedule, key=per_day_count.__getitem__) if per_day_count else None
         }
         
         return success_response(
@@ -157,6 +206,8 @@ def get_weekly_schedule():
             message="Weekly schedule retrieved"
         )
         
+    except ValueError as e:
+        return error_response(str(e), 400)
     except Exception as e:
         return error_response(f"Error fetching weekly schedule: {str(e)}", 500)
 
@@ -241,35 +292,48 @@ def check_schedule_conflicts():
         
         # Time overlap conflicts (more sophisticated)
         if check_type in ['all', 'time']:
-            all_schedules = Schedule.query.filter_by(is_active=True).all()
+            all_schedules = Schedule.query.filter_by(is_active=True).options(
+                selectinload(Schedule.room)
+            ).order_by(Schedule.start_time, Schedule.id).all()
             
-            for i, schedule1 in enumerate(all_schedules):
-                for schedule2 in all_schedules[i+1:]:
-                    if (schedule1.day_of_week == schedule2.day_of_week and
-                        schedule1.room_id == schedule2.room_id):
-                        
-                        # Check for time overlap
-                        start1 = datetime.combine(datetime.today(), schedule1.start_time)
-                        end1 = datetime.combine(datetime.today(), schedule1.end_time)
-                        start2 = datetime.combine(datetime.today(), schedule2.start_time)
-                        end2 = datetime.combine(datetime.today(), schedule2.end_time)
+            # Only schedules in the same room on the same day can overlap, so
+            # partition once and compare within each partition
+            partitions = {}
+            for schedule in all_schedules:
+                partitions.setdefault((schedule.day_of_week, schedule.room_id), []).append(schedule)
+            
+            for group in partitions.values():
+                for i, first in enumerate(group):
+                    for second in group[i+1:]:
+                        # Sorted by start time: later schedules cannot overlap either
+                        if second.start_time >= first.end_time:
+                            break
+                        if first.start_time >= second.end_time:
+                            continue
                         
-                        if not (end1 <= start2 or end2 <= start1):  # Overlap exists
-                            conflicts.append({
-                                'type': 'time_overlap',
-                                'schedule1_id': schedule1.id,
-                                'schedule1_subject': schedule1.subject_name,
-                                'schedule2_id': schedule2.id,
-                                'schedule2_subject': schedule2.subject_name,
-                                'room_name': schedule1.room.name if schedule1.room else 'Unknown',
-                                'day': schedule1.day_of_week.name,
-                                'overlap_time': f"{max(start1, start2).time()} - {min(end1, end2).time()}"
-                            })
+                        schedule1, schedule2 = (first, second) if first.id < second.id else (second, first)
+                        conflicts.append({
+                            'type': 'time_overlap',
+                            'schedule1_id': schedule1.id,
+                            'schedule1_subject': schedule1.subject_name,
+                            'schedule2_id': schedule2.id,
+                            'schedule2_subject': schedule2.subject_name,
+                            'room_name': schedule1.room.name if schedule1.room else 'Unknown',
+                            'day': schedule1.day_of_week.name,
+                            'overlap_time': f"{max(first.start_time, second.start_time)} - "
+                                            f"{min(first.end_time, second.end_time)}"
+                        })
         
         # Generate resolution suggestions
         suggestions = []
         if conflicts:
-            suggestions = generate_conflict_resolutions(conflicts)
+            suggestions = [
+                dict(zip(_SUGGESTION_KEYS, suggestion))
+                for suggestion in generate_conflict_resolutions(conflicts)
+            ]
+        
+        # Classify conflicts in a single pass
+        type_counts = Counter(conflict['type'] for conflict in conflicts)
         
         return success_response(
             data={
@@ -277,9 +341,9 @@ def check_schedule_conflicts():
                 'conflict_count': len(conflicts),
                 'suggestions': suggestions,
                 'conflict_types': {
-                    'teacher_conflicts': len([c for c in conflicts if c['type'] == 'teacher_conflict']),
-                    'room_conflicts': len([c for c in conflicts if c['type'] == 'room_conflict']),
-                    'time_overlaps': len([c for c in conflicts if c['type'] == 'time_overlap'])
+                    'teacher_conflicts': type_counts['teacher_conflict'],
+                    'room_conflicts': type_counts['room_conflict'],
+                    'time_overlaps': type_counts['time_overlap']
                 }
             },
             message=f"Found {len(conflicts)} conflicts"
@@ -322,14 +386,25 @@ def create_bulk_schedules():
         if missing_columns:
             return error_response(f"Missing columns: {', '.join(missing_columns)}", 400)
         
+        # Resolve every teacher and room referenced by the file in one query each
+        emails = {value.strip() for value in df['teacher_email'] if isinstance(value, str)}
+        room_names = {value.strip() for value in df['room_name'] if isinstance(value, str)}
+        teachers = {
+            user.email: user for user in User.query.filter(User.email.in_(emails))
+        } if emails else {}
+        rooms = {
+            room.name: room for room in Room.query.filter(Room.name.in_(room_names))
+        } if room_names else {}
+        
         # Process schedules
         results = []
+        created = []  # (result, schedule) pairs awaiting IDs
         created_count = 0
         
-        for index, row in df.iterrows():
+        for index, row in enumerate(df.to_dict('records')):
             try:
                 # Find teacher
-                teacher = User.query.filter_by(email=row['teacher_email'].strip()).first()
+                teacher = teachers.get(row['teacher_email'].strip())
                 if not teacher or not teacher.is_teacher():
                     results.append({
                         'row': index + 2,
@@ -340,7 +415,7 @@ def create_bulk_schedules():
                     continue
                 
                 # Find room
-                room = Room.query.filter_by(name=row['room_name'].strip()).first()
+                room = rooms.get(row['room_name'].strip())
                 if not room:
                     results.append({
                         'row': index + 2,
@@ -364,17 +439,14 @@ def create_bulk_schedules():
                     continue
                 
                 # Check for conflicts
-                day_of_week = WeekDay[row['day_of_week'].upper()]
+                day_of_week = _lookup_enum(_WEEKDAY_LUT, row['day_of_week'], 'day_of_week')
                 conflict = Schedule.query.filter_by(
                     room_id=room.id,
                     day_of_week=day_of_week,
                     is_active=True
                 ).filter(
-                    or_(
-                        and_(Schedule.start_time <= start_time, Schedule.end_time > start_time),
-                        and_(Schedule.start_time < end_time, Schedule.end_time >= end_time),
-                        and_(Schedule.start_time >= start_time, Schedule.end_time <= end_time)
-                    )
+                    Schedule.start_time < end_time,
+                    Schedule.end_time > start_time
                 ).first()
                 
                 if conflict:
@@ -392,9 +464,9 @@ def create_bulk_schedules():
                     subject_code=row.get('subject_code', '').strip(),
                     teacher_id=teacher.id,
                     room_id=room.id,
-                    section=Section[row['section'].upper()],
+                    section=_lookup_enum(_SECTION_LUT, row['section'], 'section'),
                     study_year=int(row['study_year']),
-                    study_type=StudyType[row['study_type'].upper()],
+                    study_type=_lookup_enum(_STUDY_TYPE_LUT, row['study_type'], 'study_type'),
                     day_of_week=day_of_week,
                     start_time=start_time,
                     end_time=end_time,
@@ -405,12 +477,14 @@ def create_bulk_schedules():
                 db.session.add(schedule)
                 created_count += 1
                 
-                results.append({
+                result = {
                     'row': index + 2,
                     'subject': row['subject_name'],
                     'success': True,
-                    'schedule_id': None  # Will be set after commit
-                })
+                    'schedule_id': None  # Will be set after flush
+                }
+                results.append(result)
+                created.append((result, schedule))
                 
             except Exception as e:
                 results.append({
@@ -422,15 +496,13 @@ def create_bulk_schedules():
         
         # Commit successful creations
         if created_count > 0:
-            db.session.commit()
+            # The flush INSERTs return the new primary keys (RETURNING on PostgreSQL),
+            # so read them off the instances before commit expires them
+            db.session.flush()
+            for result, schedule in created:
+                result['schedule_id'] = schedule.id
             
-            # Update schedule IDs in results
-            successful_results = [r for r in results if r['success']]
-            recent_schedules = Schedule.query.order_by(Schedule.id.desc()).limit(created_count).all()
-            
-            for i, result in enumerate(successful_results):
-                if i < len(recent_schedules):
-                    result['schedule_id'] = recent_schedules[-(i+1)].id
+            db.session.commit()
         
         return success_response(
             data={
@@ -462,74 +534,59 @@ def export_schedules():
         query = Schedule.query.filter_by(is_active=True)
         
         if section:
-            query = query.filter_by(section=Section[section.upper()])
+            query = query.filter_by(section=_lookup_enum(_SECTION_LUT, section, 'section'))
         if study_year:
             query = query.filter_by(study_year=study_year)
         if teacher_id:
             query = query.filter_by(teacher_id=teacher_id)
         
-        schedules = query.order_by(Schedule.day_of_week, Schedule.start_time).all()
-        
-        # Prepare data
-        data = []
-        for schedule in schedules:
-            teacher = User.query.get(schedule.teacher_id)
-            room = Room.query.get(schedule.room_id)
-            
-            data.append({
-                'subject_name': schedule.subject_name,
-                'subject_code': schedule.subject_code or '',
-                'teacher_name': teacher.name if teacher else '',
-                'teacher_email': teacher.email if teacher else '',
-                'room_name': room.name if room else '',
-                'room_building': room.building if room else '',
-                'section': schedule.section.value if schedule.section else '',
-                'study_year': schedule.study_year,
-                'study_type': schedule.study_type.value if schedule.study_type else '',
-                'day_of_week': schedule.day_of_week.name if schedule.day_of_week else '',
-                'start_time': schedule.start_time.strftime('%H:%M') if schedule.start_time else '',
-                'end_time': schedule.end_time.strftime('%H:%M') if schedule.end_time else '',
-                'semester': schedule.semester,
-                'academic_year': schedule.academic_year
-            })
-        
-        df = pd.DataFrame(data)
-        
-        if format_type.lower() == 'excel':
-            # Export as Excel
-            output = io.BytesIO()
-            with pd.ExcelWriter(output, engine='openpyxl') as writer:
-                df.to_excel(writer, sheet_name='Schedules', index=False)
-                
-                # Add summary sheet
-                summary_data = {
-                    'Metric': ['Total Schedules', 'Unique Subjects', 'Unique Teachers', 'Unique Rooms'],
-                    'Count': [
-                        len(data),
-                        len(set(item['subject_name'] for item in data)),
-                        len(set(item['teacher_name'] for item in data if item['teacher_name'])),
-                        len(set(item['room_name'] for item in data if item['room_name']))
-                    ]
+        # One IN query per relationship instead of a lookup per row
+        query = query.options(
+            selectinload(Schedule.teacher),
+            selectinload(Schedule.room)
+        ).order_by(Schedule.day_of_week, Schedule.start_time)
+        
+        if format_type.lower() != 'excel':
+            # Export as CSV, streamed row by row
+            return Response(
+                stream_with_context(generate_schedules_csv(query)),
+                content_type='text/csv; charset=utf-8-sig',
+                headers={
+                    'Content-Disposition': f'attachment; filename=schedules_export_{datetime.now().strftime("%Y%m%d")}.csv'
                 }
-                pd.DataFrame(summary_data).to_excel(writer, sheet_name='Summary', index=False)
-            
-            output.seek(0)
-            
-            return output.getvalue(), 200, {
-                'Content-Type': 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet',
-                'Content-Disposition': f'attachment; filename=schedules_export_{datetime.now().strftime("%Y%m%d")}.xlsx'
-            }
-        else:
-            # Export as CSV
-            output = io.StringIO()
-            df.to_csv(output, index=False, encoding='utf-8-sig')
-            output.seek(0)
+            )
+        
+        # Export as Excel
+        df = pd.DataFrame(
+            [schedule_export_row(schedule) for schedule in query.all()],
+            columns=EXPORT_COLUMNS
+        )
+        
+        output = io.BytesIO()
+        with pd.ExcelWriter(output, engine='openpyxl') as writer:
+            df.to_excel(writer, sheet_name='Schedules', index=False)
             
-            return output.getvalue(), 200, {
-                'Content-Type': 'text/csv; charset=utf-8-sig',
-                'Content-Disposition': f'attachment; filename=schedules_export_{datetime.now().strftime("%Y%m%d")}.csv'
+            # Add summary sheet
+            summary_data = {
+                'Metric': ['Total Schedules', 'Unique Subjects', 'Unique Teachers', 'Unique Rooms'],
+                'Count': [
+                    len(df),
+                    df['subject_name'].nunique(),
+                    df.loc[df['teacher_name'] != '', 'teacher_name'].nunique(),
+                    df.loc[df['room_name'] != '', 'room_name'].nunique()
+                ]
             }
+            pd.DataFrame(summary_data).to_excel(writer, sheet_name='Summary', index=False)
+        
+        output.seek(0)
+        
+        return output.getvalue(), 200, {
+            'Content-Type': 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet',
+            'Content-Disposition': f'attachment; filename=schedules_export_{datetime.now().strftime("%Y%m%d")}.xlsx'
+        }
         
+    except ValueError as e:
+        return error_response(str(e), 400)
     except Exception as e:
         return error_response(f"Error exporting schedules: {str(e)}", 500)
 
@@ -540,7 +597,7 @@ def get_schedule(schedule_id):
     """Get single schedule details."""
     try:
         schedule = Schedule.query.get_or_404(schedule_id)
-        return success_response(data=schedule.to_dict())
+        return success_response(data=schedule_dict(schedule))
         
     except Exception as e:
         return error_response(f"Error fetching schedule: {str(e)}", 500)
@@ -577,17 +634,18 @@ def create_schedule():
         if start_time >= end_time:
             return error_response("End time must be after start time", 400)
         
+        day_of_week = _lookup_enum(_WEEKDAY_LUT, data['day_of_week'], 'day_of_week')
+        section = _lookup_enum(_SECTION_LUT, data['section'], 'section')
+        study_type = _lookup_enum(_STUDY_TYPE_LUT, data['study_type'], 'study_type')
+        
         # Check for conflicts
         conflict = Schedule.query.filter_by(
             room_id=data['room_id'],
-            day_of_week=WeekDay[data['day_of_week'].upper()],
+            day_of_week=day_of_week,
             is_active=True
         ).filter(
-            or_(
-                and_(Schedule.start_time <= start_time, Schedule.end_time > start_time),
-                and_(Schedule.start_time < end_time, Schedule.end_time >= end_time),
-                and_(Schedule.start_time >= start_time, Schedule.end_time <= end_time)
-            )
+            Schedule.start_time < end_time,
+            Schedule.end_time > start_time
         ).first()
         
         if conflict:
@@ -602,10 +660,10 @@ def create_schedule():
             subject_code=data.get('subject_code'),
             teacher_id=data['teacher_id'],
             room_id=data['room_id'],
-            section=Section[data['section'].upper()],
+            section=section,
             study_year=data['study_year'],
-            study_type=StudyType[data['study_type'].upper()],
-            day_of_week=WeekDay[data['day_of_week'].upper()],
+            study_type=study_type,
+            day_of_week=day_of_week,
             start_time=start_time,
             end_time=end_time,
             semester=data.get('semester', 1),
@@ -620,6 +678,9 @@ def create_schedule():
             message="Schedule created successfully"
         ), 201
         
+    except ValueError as e:
+        db.session.rollback()
+        return error_response(str(e), 400)
     except Exception as e:
         db.session.rollback()
         return error_response(f"Error creating schedule: {str(e)}", 500)
@@ -693,111 +754,361 @@ def delete_schedule(schedule_id):
 @jwt_required()
 def get_current_schedule():
     """Get currently active schedule based on time."""
+    now = datetime.now()
+    
+    # Only the DB/cache lookup is guarded; response building stays outside the try
     try:
-        now = datetime.now()
-        current_day = now.weekday()  # 0 = Monday, 6 = Sunday
-        current_time = now.time()
-        
-        # Map Python weekday to our WeekDay enum
-        day_mapping = {
-            6: WeekDay.SUNDAY,    # Sunday
-            0: WeekDay.MONDAY,    # Monday
-            1: WeekDay.TUESDAY,   # Tuesday
-            2: WeekDay.WEDNESDAY, # Wednesday
-            3: WeekDay.THURSDAY,  # Thursday
-            4: WeekDay.FRIDAY,    # Friday
-            5: WeekDay.SATURDAY,  # Saturday
-        }
-        
-        current_weekday = day_mapping[current_day]
-        
-        # Get current user
-        current_user_id = get_jwt_identity()
-        user = User.query.get(current_user_id)
-        
-        # Build query
-        query = Schedule.query.filter_by(
-            is_active=True,
-            day_of_week=current_weekday
-        ).filter(
-            Schedule.start_time <= current_time,
-            Schedule.end_time > current_time
-        )
-        
-        # Filter based on user role
-        if user.role == UserRole.STUDENT:
-            student = user.student_profile
-            if student:
-                query = query.filter_by(
-                    section=student.section,
-                    study_year=student.study_year,
-                    study_type=student.study_type
-                )
-        elif user.role == UserRole.TEACHER:
-            query = query.filter_by(teacher_id=current_user_id)
-        
-        current_schedule = query.first()
-        
-        if current_schedule:
-            return success_response(
-                data={
-                    'current': current_schedule.to_dict(),
-                    'server_time': now.isoformat()
-                }
-            )
-        else:
-            return success_response(
-                data={
-                    'current': None,
-                    'message': 'No active schedule at this time',
-                    'server_time': now.isoformat()
-                }
-            )
-        
-    except Exception as e:
-        return error_response(f"Error fetching current schedule: {str(e)}", 500)
+        current_schedule = cached_current_schedule(now)
+    except CurrentUserNotFound:
+        return error_response('User not found', 404)
+    except SQLAlchemyError:
+        # Details go to the log only; clients get a fixed message
+        current_app.logger.exception('current_schedule')
+        return error_response(CURRENT_SCHEDULE_ERROR, 500)
+    
+    data = {'current': current_schedule, 'server_time': _iso_now(now)}
+    if current_schedule is None:
+        data['message'] = 'No active schedule at this time'
+    
+    return json_response(data=data)
 
 # =================== HELPER FUNCTIONS ===================
 
+# Python weekday() (0 = Monday) to our WeekDay enum (0 = Sunday)
+_PY_WEEKDAYS = (
+    WeekDay.MONDAY, WeekDay.TUESDAY, WeekDay.WEDNESDAY, WeekDay.THURSDAY,
+    WeekDay.FRIDAY, WeekDay.SATURDAY, WeekDay.SUNDAY
+)
+
+class CurrentUserNotFound(Exception):
+    """The JWT identity no longer matches a user (e.g. the account was deleted)."""
+
+def fetch_current_schedule(now):
+    """Return the schedule dict active at `now` for the current user, or None."""
+    current_weekday = _PY_WEEKDAYS[now.weekday()]
+    current_time = now.time()
+    
+    # Get current user
+    current_user_id = get_jwt_identity()
+    user = User.query.get(current_user_id)
+    if user is None:
+        raise CurrentUserNotFound(current_user_id)
+    
+    # Audience filters based on user role
+    filters = {}
+    scope = 'all'
+    if user.role == UserRole.STUDENT:
+        student = user.student_profile
+        if student:
+            filters = {
+                'section': student.section,
+                'study_year': student.study_year,
+                'study_type': student.study_type
+            }
+            scope = f"{student.section.name}:{student.study_year}:{student.study_type.name}"
+    elif user.role == UserRole.TEACHER:
+        filters = {'teacher_id': current_user_id}
+        scope = f"teacher:{current_user_id}"
+    
+    candidates = get_current_candidates(current_weekday, current_time, filters, scope)
+    return next(
+        (data for start, end, data in candidates if start <= current_time < end),
+        None
+    )
+
+# (user id, minute) -> (expires_at, schedule dict or None)
+_current_results = {}
+
+def cached_current_schedule(now):
+    """Read-through cache over fetch_current_schedule.
+
+    Schedule times are minute-granular, so the answer for a user is the same
+    for the whole minute; the short TTL bounds staleness after edits.
+    """
+    key = (get_jwt_identity(), now.replace(second=0, microsecond=0))
+    clock = now.timestamp()
+    hit = _current_results.get(key)
+    if hit is not None and hit[0] > clock:
+        return hit[1]
+    
+    current_schedule = fetch_current_schedule(now)
+    if len(_current_results) >= CURRENT_RESULT_CACHE_MAX:
+        # Keys from past minutes are dead weight; dropping everything is cheap
+        _current_results.clear()
+    _current_results[key] = (clock + CURRENT_RESULT_CACHE_TTL, current_schedule)
+    return current_schedule
+
+# (second, iso string) for the most recent /current response; replaced as one
+# tuple so concurrent readers never see a mismatched pair
+_iso_cache = (None, '')
+
+def _iso_now(now):
+    """ISO timestamp truncated to the second, formatted once per second."""
+    global _iso_cache
+    second = now.replace(microsecond=0)
+    cached = _iso_cache
+    if cached[0] != second:
+        cached = (second, second.isoformat())
+        _iso_cache = cached
+    return cached[1]
+
+@lru_cache(maxsize=256)
+def _load_candidates(payload):
+    """Parse a cached candidates payload once; identical payloads share the result."""
+    return tuple(
+        (time.fromisoformat(data['start_time']), time.fromisoformat(data['end_time']), data)
+        for data in json.loads(payload)
+    )
+
+def get_current_candidates(weekday, current_time, filters, scope):
+    """(start, end, schedule dict) for schedules overlapping the current 5-minute bucket.
+
+    Served from Redis when available. The dicts are shared across requests
+    and must not be mutated.
+    """
+    bucket = (current_time.hour * 60 + current_time.minute) // CURRENT_SCHEDULE_BUCKET_MINUTES
+    
+    redis_client = get_redis()
+    if redis_client:
+        try:
+            generation = redis_client.get(CURRENT_SCHEDULE_GENERATION_KEY) or 0
+            cache_key = f"current:{generation}:{weekday.name.lower()}:{bucket}:{scope}"
+            cached = redis_client.get(cache_key)
+            if cached is not None:
+                return _load_candidates(cached)
+        except redis.RedisError:
+            redis_client = None
+    
+    bucket_start = bucket * CURRENT_SCHEDULE_BUCKET_MINUTES
+    bucket_end = bucket_start + CURRENT_SCHEDULE_BUCKET_MINUTES
+    start = time(*divmod(bucket_start, 60))
+    end = time(*divmod(bucket_end, 60)) if bucket_end < 24 * 60 else time.max
+    
+    schedules = Schedule.query.filter_by(
+        is_active=True,
+        day_of_week=weekday,
+        **filters
+    ).options(
+        selectinload(Schedule.teacher),
+        selectinload(Schedule.room)
+    ).filter(
+        Schedule.start_time < end,
+        Schedule.end_time > start
+    ).order_by(Schedule.start_time).all()
+    
+    candidates = tuple(
+        (schedule.start_time, schedule.end_time, schedule_dict(schedule))
+        for schedule in schedules
+    )
+    
+    if redis_client:
+        try:
+            payload = json.dumps([data for _, _, data in candidates])
+            redis_client.setex(cache_key, CURRENT_SCHEDULE_CACHE_TTL, payload)
+        except redis.RedisError:
+            pass
+    
+    return candidates
+
+@event.listens_for(Session, 'after_flush')
+def _mark_current_schedules_stale(session, flush_context):
+    """Remember that this transaction changed what /current can return."""
+    for instance in chain(session.new, session.dirty, session.deleted):
+        if isinstance(instance, (Schedule, Room)) or (
+            # Logins write to users too; only a rename shows up in the candidates
+            isinstance(instance, User) and inspect(instance).attrs.name.history.has_changes()
+        ):
+            session.info['current_schedules_stale'] = True
+            return
+
+@event.listens_for(Session, 'after_commit')
+def _invalidate_current_schedules_on_commit(session):
+    """Start a new candidates generation once those writes are committed."""
+    if session.info.pop('current_schedules_stale', False):
+        invalidate_current_schedules()
+
+@event.listens_for(Session, 'after_rollback')
+def _forget_current_schedule_writes(session):
+    """Rolled back writes leave the cached candidates valid."""
+    session.info.pop('current_schedules_stale', None)
+
+def invalidate_current_schedules():
+    """Drop this process's /current results and move Redis candidates to a new generation."""
+    _current_results.clear()
+    if not has_app_context():
+        return
+    redis_client = get_redis()
+    if redis_client:
+        try:
+            redis_client.incr(CURRENT_SCHEDULE_GENERATION_KEY)
+        except redis.RedisError:
+            pass
+
+def _to_seconds(t):
+    """Seconds since midnight for a time object."""
+    return t.hour * 3600 + t.minute * 60 + t.second
+
+EXPORT_COLUMNS = (
+    'subject_name', 'subject_code', 'teacher_name', 'teacher_email',
+    'room_name', 'room_building', 'section', 'study_year', 'study_type',
+    'day_of_week', 'start_time', 'end_time', 'semester', 'academic_year'
+)
+
+def schedule_export_row(schedule):
+    """Build one export row in EXPORT_COLUMNS order."""
+    teacher = schedule.teacher
+    room = schedule.room
+    
+    return [
+        schedule.subject_name,
+        schedule.subject_code or '',
+        teacher.name if teacher else '',
+        teacher.email if teacher else '',
+        room.name if room else '',
+        room.building if room else '',
+        schedule.section.value if schedule.section else '',
+        schedule.study_year,
+        schedule.study_type.value if schedule.study_type else '',
+        schedule.day_of_week.name if schedule.day_of_week else '',
+        schedule.start_time.strftime('%H:%M') if schedule.start_time else '',
+        schedule.end_time.strftime('%H:%M') if schedule.end_time else '',
+        schedule.semester,
+        schedule.academic_year
+    ]
+
+def generate_schedules_csv(query, batch_size=500):
+    """Yield CSV chunks for the export query without buffering the whole file."""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    
+    # BOM so Excel opens the Arabic content as UTF-8
+    buffer.write('\ufeff')
+    writer.writerow(EXPORT_COLUMNS)
+    yield buffer.getvalue()
+    buffer.seek(0)
+    buffer.truncate()
+    
+    for schedule in query.yield_per(batch_size):
+        writer.writerow(schedule_export_row(schedule))
+        yield buffer.getvalue()
+        buffer.seek(0)
+        buffer.truncate()
+
+@lru_cache(maxsize=4096)
+def _schedule_dict(schedule_id, updated_at, teacher_updated_at, room_updated_at):
+    """Serialize a schedule once per revision of it and of its teacher and room."""
+    # The instance is already in the session identity map, so get() does not hit the DB
+    return Schedule.query.get(schedule_id).to_dict()
+
+def schedule_dict(schedule):
+    """Return the cached dict for a schedule.
+    
+    to_dict embeds the teacher and room names, so their updated_at is part
+    of the key too; editing any of the three misses the cache.
+    """
+    teacher, room = schedule.teacher, schedule.room
+    return _schedule_dict(
+        schedule.id,
+        schedule.updated_at,
+        teacher.updated_at if teacher else None,
+        room.updated_at if room else None
+    )
+
+# Suggestion builders are cached on the conflict signature, so the same
+# teacher/room/day reported several times reuses one suggestion. They return
+# immutable tuples in _SUGGESTION_KEYS order; dicts are only built for the
+# response, so shared cache entries can never be mutated by a caller.
+_SUGGESTION_KEYS = ('conflict_id', 'type', 'suggestion', 'options')
+
+_TEACHER_OPTS = (
+    'Move one subject to a different time slot',
+    'Move one subject to a different day',
+    'Assign different teacher to one subject'
+)
+_ROOM_OPTS = (
+    'Move one subject to a different room',
+    'Change time slot for one subject',
+    'Split the time slot if possible'
+)
+_OVERLAP_OPTS = (
+    'Adjust start/end times to eliminate overlap',
+    'Move one subject to different room',
+    'Reschedule one subject completely'
+)
+
+_TEACHER_SUGG = "Reschedule one of the subjects for {teacher_name} on {day}"
+_ROOM_SUGG = "Resolve room conflict for {room_name} on {day}"
+_OVERLAP_SUGG = "Resolve time overlap between {schedule1_subject} and {schedule2_subject}"
+
+@lru_cache(maxsize=512)
+def _build_teacher(teacher_id, day, teacher_name):
+    return (
+        ''.join(('teacher_', str(teacher_id), '_', day)),
+        'teacher_conflict',
+        _TEACHER_SUGG.format(teacher_name=teacher_name, day=day),
+        _TEACHER_OPTS
+    )
+
+@lru_cache(maxsize=512)
+def _build_room(room_id, day, room_name):
+    return (
+        ''.join(('room_', str(room_id), '_', day)),
+        'room_conflict',
+        _ROOM_SUGG.format(room_name=room_name, day=day),
+        _ROOM_OPTS
+    )
+
+@lru_cache(maxsize=512)
+def _build_overlap(schedule1_id, schedule2_id, schedule1_subject, schedule2_subject):
+    return (
+        ''.join(('overlap_', str(schedule1_id), '_', str(schedule2_id))),
+        'time_overlap',
+        _OVERLAP_SUGG.format(
+            schedule1_subject=schedule1_subject, schedule2_subject=schedule2_subject
+        ),
+        _OVERLAP_OPTS
+    )
+
+# Fields each conflict type feeds its builder, pulled in one C-level call
+_TEACHER_FIELDS = itemgetter('teacher_id', 'day', 'teacher_name')
+_ROOM_FIELDS = itemgetter('room_id', 'day', 'room_name')
+_OVERLAP_FIELDS = itemgetter('schedule1_id', 'schedule2_id', 'schedule1_subject', 'schedule2_subject')
+
+def _teacher_suggestion(conflict):
+    return _build_teacher(*_TEACHER_FIELDS(conflict))
+
+def _room_suggestion(conflict):
+    return _build_room(*_ROOM_FIELDS(conflict))
+
+def _overlap_suggestion(conflict):
+    return _build_overlap(*_OVERLAP_FIELDS(conflict))
+
+# One specialized builder per known conflict type
+_BUILDERS = {
+    'teacher_conflict': _teacher_suggestion,
+    'room_conflict': _room_suggestion,
+    'time_overlap': _overlap_suggestion,
+}
+
 def generate_conflict_resolutions(conflicts):
-    """Generate suggestions for resolving conflicts."""
-    suggestions = []
+    """Yield suggestion tuples (see _SUGGESTION_KEYS) for resolving conflicts."""
+    builder_for = _BUILDERS.get  # bound once; avoids a global + attribute lookup per conflict
+    seen = set()
     
     for conflict in conflicts:
-        if conflict['type'] == 'teacher_conflict':
-            suggestions.append({
-                'conflict_id': f"teacher_{conflict['teacher_id']}_{conflict['day']}",
-                'type': 'teacher_conflict',
-                'suggestion': f"Reschedule one of the subjects for {conflict['teacher_name']} on {conflict['day']}",
-                'options': [
-                    'Move one subject to a different time slot',
-                    'Move one subject to a different day',
-                    'Assign different teacher to one subject'
-                ]
-            })
-        
-        elif conflict['type'] == 'room_conflict':
-            suggestions.append({
-                'conflict_id': f"room_{conflict['room_id']}_{conflict['day']}",
-                'type': 'room_conflict',
-                'suggestion': f"Resolve room conflict for {conflict['room_name']} on {conflict['day']}",
-                'options': [
-                    'Move one subject to a different room',
-                    'Change time slot for one subject',
-                    'Split the time slot if possible'
-                ]
-            })
-        
-        elif conflict['type'] == 'time_overlap':
-            suggestions.append({
-                'conflict_id': f"overlap_{conflict['schedule1_id']}_{conflict['schedule2_id']}",
-                'type': 'time_overlap',
-                'suggestion': f"Resolve time overlap between {conflict['schedule1_subject']} and {conflict['schedule2_subject']}",
-                'options': [
-                    'Adjust start/end times to eliminate overlap',
-                    'Move one subject to different room',
-                    'Reschedule one subject completely'
-                ]
-            })
-    
-    return suggestions
\ No newline at end of file
+        builder = builder_for(conflict['type'])
+        if builder is None:
+            continue
+        
+        # One suggestion per (type, entity, day), e.g. a teacher clashing at several times
+        signature = (
+            conflict['type'],
+            conflict.get('teacher_id') or conflict.get('room_id')
+            or (conflict.get('schedule1_id'), conflict.get('schedule2_id')),
+            conflict.get('day')
+        )
+        if signature in seen:
+            continue
+        seen.add(signature)
+        
+        yield builder(conflict)
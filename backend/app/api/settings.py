@@ -1,23 +1,122 @@
 # File: backend/app/api/settings.py
 """System Settings API for configuration management."""
-from flask import Blueprint, request, jsonify
+from flask import Blueprint, request, jsonify, current_app
 from flask_jwt_extended import jwt_required, get_jwt_identity
 from app import db
 from app.models.user import User, UserRole
-from app.utils.helpers import success_response, error_response
-from app.utils.decorators import admin_required, super_admin_required
-from datetime import datetime, timedelta
+from app.utils.helpers import success_response, error_response, handle_error, json_response, get_redis
+from app.utils.decorators import admin_required, super_admin_required, gzip_response, load_current_user
+from app.utils.http_client import get_json
+from werkzeug.exceptions import HTTPException
+from datetime import datetime, timedelta, timezone
+from types import MappingProxyType
 from typing import Dict, List, Any, Optional
+from collections import OrderedDict
+from functools import wraps
+from concurrent.futures import Future, ThreadPoolExecutor, wait
+import hashlib
 import json
 import os
+import queue
+import threading
+import time
+import redis
+
+try:
+    import orjson
+except ImportError:  # optional fast JSON encoder
+    orjson = None
 
 settings_bp = Blueprint('settings', __name__)
 
-# In-memory settings cache (in production, use Redis)
-settings_cache = {}
+# Canonical settings live in Redis when REDIS_URL is configured; writers bump
+# a generational revision so readers only re-parse the blob when it changed.
+# Without Redis, settings fall back to the local JSON file.
+SETTINGS_FILE = 'system_settings.json'
+SETTINGS_REV_KEY = 'settings:rev'
+SETTINGS_BLOB_KEY = 'settings:blob'
+SETTINGS_UPDATED_KEY = 'settings:updated_at'
+SETTINGS_CHANNEL = 'settings:invalidate'
+SETTINGS_ERROR_MESSAGE = 'Error processing settings request'
+
+# Categories readable per role (security and integration are super admin only)
+ALL_CATEGORIES = ('attendance', 'security', 'notifications', 'system', 'ui', 'integration')
+ADMIN_CATEGORIES = ('attendance', 'notifications', 'system', 'ui')
+
+# Settings hidden from or masked for admins below super admin
+HIDDEN_SECURITY_KEYS = frozenset(('allowed_ip_ranges', 'jwt_expiry_hours'))
+MASKED_INTEGRATION_KEYS = frozenset(('google_maps_api_key', 'telegram_bot_token', 'email_password'))
+
+# Settings changes are written by a background thread so PUTs never wait on it
+AUDIT_BATCH_SIZE = 100
+AUDIT_FLUSH_SECONDS = 1.0
+_audit_queue = queue.SimpleQueue()
+_audit_lock = threading.Lock()
+_audit_writer = None
+
+# (settings dict, filtered view) for the most recent non-super-admin GET /
+_filtered_view = (None, None)
+
+# Settings only a super admin may change through PUT /
+PROTECTED_KEYS = {
+    'security': frozenset(('jwt_expiry_hours', 'allowed_ip_ranges', 'two_factor_enabled')),
+    'integration': frozenset(('google_maps_api_key', 'telegram_bot_token'))
+}
+
+# Shared workers for running several integration connection tests at once
+_connection_test_pool = ThreadPoolExecutor(max_workers=4, thread_name_prefix='settings-conn-test')
+
+# External endpoints probed by the connection tests
+TELEGRAM_API_URL = 'https://api.telegram.org'
+MAPS_GEOCODE_URL = 'https://maps.googleapis.com/maps/api/geocode/json'
+CONNECTION_TEST_TIMEOUT = 5.0  # seconds per probe, retries included
+
+# Probe verdicts are reused briefly: (service, sha256 of credential) -> (expires_at, result)
+CONNECTION_RESULT_TTL = 60  # seconds
+CONNECTION_FAILURE_TTL = 10  # seconds; transient errors clear quickly
+CONNECTION_RESULT_CACHE_MAX = 64
+PROBE_CREDENTIAL_KEYS = {'telegram': 'telegram_bot_token', 'maps': 'google_maps_api_key'}
+_connection_results = {}
+_connection_results_lock = threading.Lock()
+# Probes currently running, so concurrent callers can share their result
+_inflight_probes = {}
+
+# Simulated history entries: (id, changed_by, change_type, age, summary)
+SETTINGS_HISTORY_TEMPLATE = (
+    (1, 'super@admin.com', 'UPDATE_ATTENDANCE', timedelta(hours=2), 'Updated QR code expiry time'),
+    (2, 'admin@university.edu', 'UPDATE_UI', timedelta(hours=24), 'Changed theme to dark mode')
+)
 
-# Default system settings
-DEFAULT_SETTINGS = {
+# Validation results for recently validated payloads (admin UIs re-send
+# identical forms), evicted least-recently-used first
+VALIDATION_CACHE_SIZE = 256
+_validation_cache = OrderedDict()
+
+# In-memory settings cache and the Redis revision it was built from. Loads
+# and saves run under _cache_lock so a cold-start burst parses storage once.
+_MISSING = object()
+_cache_lock = threading.RLock()
+settings_cache = _MISSING
+settings_rev = None
+settings_updated_at = None
+
+# Each process subscribes to SETTINGS_CHANNEL. While the listener runs, a
+# cache that has been checked since the last invalidation is served without
+# asking Redis for the revision.
+_settings_listener = None
+_invalidations = 0
+_checked_invalidations = -1
+
+def _freeze(value):
+    """Recursively turn dicts into read-only proxies and lists into tuples."""
+    if isinstance(value, dict):
+        return MappingProxyType({key: _freeze(item) for key, item in value.items()})
+    if isinstance(value, list):
+        return tuple(_freeze(item) for item in value)
+    return value
+
+# Default system settings (read-only; use _fresh_defaults() for a mutable copy)
+DEFAULT_SETTINGS = _freeze({
     'attendance': {
         'qr_code_expiry_seconds': 60,
         'max_qr_code_expiry_seconds': 300,
@@ -91,7 +190,28 @@ DEFAULT_SETTINGS = {
         'webhook_enabled': False,
         'webhook_url': ''
     }
-}
+})
+
+class SettingsError(Exception):
+    """Settings could not be stored; the cause is logged, never returned."""
+
+@settings_bp.errorhandler(SettingsError)
+def handle_settings_error(e):
+    """Roll back, log the cause and answer with a fixed message."""
+    db.session.rollback()
+    current_app.logger.exception('Settings request failed')
+    return error_response(SETTINGS_ERROR_MESSAGE, 500)
+
+@settings_bp.errorhandler(HTTPException)
+def handle_settings_http_error(e):
+    """HTTP errors keep their status, with the body the app's handlers give them.
+    
+    Unhandled exceptions arrive here as InternalServerError (Flask has already
+    logged them), so server errors also roll back the session.
+    """
+    if e.code >= 500:
+        db.session.rollback()
+    return handle_error(e, e.code)
 
 @settings_bp.route('/health', methods=['GET'])
 def health_check():
@@ -101,97 +221,98 @@ def health_check():
 # =================== GENERAL SETTINGS ===================
 
 @settings_bp.route('/', methods=['GET'])
+@gzip_response()
 @jwt_required()
 @admin_required
 def get_all_settings():
     """Get all system settings."""
-    try:
-        current_user_id = get_jwt_identity()
-        user = User.query.get(current_user_id)
-        
-        # Get settings from cache or load defaults
-        all_settings = get_cached_settings()
-        
-        # Filter sensitive settings for non-super-admin users
-        if user.role != UserRole.SUPER_ADMIN:
-            # Remove sensitive settings
-            filtered_settings = all_settings.copy()
-            if 'security' in filtered_settings:
-                # Remove sensitive security settings
-                sensitive_keys = ['allowed_ip_ranges', 'jwt_expiry_hours']
-                for key in sensitive_keys:
-                    filtered_settings['security'].pop(key, None)
-            
-            if 'integration' in filtered_settings:
-                # Remove API keys and passwords
-                sensitive_keys = ['google_maps_api_key', 'telegram_bot_token', 'email_password']
-                for key in sensitive_keys:
-                    filtered_settings['integration'][key] = '***hidden***' if filtered_settings['integration'].get(key) else ''
-            
-            all_settings = filtered_settings
-        
-        return success_response(
-            data={
-                'settings': all_settings,
-                'last_updated': get_settings_last_updated(),
-                'can_edit': user.role in [UserRole.ADMIN, UserRole.SUPER_ADMIN]
-            },
-            message="System settings retrieved"
-        )
-        
-    except Exception as e:
-        return error_response(f"Error retrieving settings: {str(e)}", 500)
+    role = current_user_role()
+    
+    # Get settings from cache or load defaults
+    all_settings = get_cached_settings()
+    
+    # Filter sensitive settings for non-super-admin users
+    if role != UserRole.SUPER_ADMIN.value:
+        all_settings = filtered_settings_view(all_settings)
+    
+    return success_response(
+        data={
+            'settings': all_settings,
+            'last_updated': get_settings_last_updated(),
+            'can_edit': role in (UserRole.ADMIN.value, UserRole.SUPER_ADMIN.value)
+        },
+        message="System settings retrieved"
+    )
 
 @settings_bp.route('/', methods=['PUT'])
 @jwt_required()
 @admin_required
 def update_all_settings():
     """Update all system settings."""
-    try:
-        current_user_id = get_jwt_identity()
-        user = User.query.get(current_user_id)
-        
-        data = request.get_json()
-        if not data:
-            return error_response("Request body must be JSON", 400)
-        
-        # Validate settings structure
-        validation_result = validate_settings_structure(data)
-        if not validation_result['valid']:
-            return error_response(f"Invalid settings: {validation_result['error']}", 400)
-        
-        # Check permissions for sensitive settings
-        if user.role != UserRole.SUPER_ADMIN:
-            # Non-super-admin cannot modify sensitive settings
-            if 'security' in data:
-                protected_keys = ['jwt_expiry_hours', 'allowed_ip_ranges', 'two_factor_enabled']
-                for key in protected_keys:
-                    if key in data['security']:
-                        return error_response(f"Permission denied: Cannot modify {key}", 403)
-            
-            if 'integration' in data:
-                protected_keys = ['google_maps_api_key', 'telegram_bot_token']
-                for key in protected_keys:
-                    if key in data['integration']:
-                        return error_response(f"Permission denied: Cannot modify {key}", 403)
-        
-        # Merge with existing settings
-        current_settings = get_cached_settings()
-        updated_settings = merge_settings(current_settings, data)
-        
-        # Save settings
-        save_settings(updated_settings, current_user_id)
-        
-        # Log the change
-        log_settings_change(current_user_id, "UPDATE_ALL", updated_settings)
-        
-        return success_response(
-            data={'settings': updated_settings},
-            message="Settings updated successfully"
-        )
-        
-    except Exception as e:
-        return error_response(f"Error updating settings: {str(e)}", 500)
+    current_user_id = get_jwt_identity()
+    role = current_user_role()
+    
+    data = request.get_json()
+    if not data:
+        return error_response("Request body must be JSON", 400)
+    
+    # Validate settings structure
+    valid, error = validate_cached(validate_settings_structure, data)
+    if not valid:
+        return error_response(f"Invalid settings: {error}", 400)
+    
+    # Check permissions for sensitive settings
+    if role != UserRole.SUPER_ADMIN.value:
+        # Non-super-admin cannot modify sensitive settings
+        for category, protected_keys in PROTECTED_KEYS.items():
+            section = data.get(category)
+            denied = section.keys() & protected_keys if isinstance(section, dict) else None
+            if denied:
+                return error_response(f"Permission denied: Cannot modify {min(denied)}", 403)
+    
+    # Merge with existing settings
+    current_settings = get_cached_settings()
+    updated_settings = merge_settings(current_settings, data)
+    if updated_settings == current_settings:
+        return success_response(data={'settings': current_settings}, message="No changes")
+    
+    # Save settings
+    save_settings(updated_settings, current_user_id)
+    
+    # Log the change
+    log_settings_change(current_user_id, "UPDATE_ALL", updated_settings)
+    
+    return success_response(
+        data={'settings': updated_settings},
+        message="Settings updated successfully"
+    )
+
+@settings_bp.route('/bulk', methods=['GET'])
+@gzip_response()
+@jwt_required()
+@admin_required
+def get_bulk_settings():
+    """Get several categories in one conditional request (?cats=attendance,ui)."""
+    role = current_user_role()
+    all_settings = get_cached_settings()
+    
+    allowed = ALL_CATEGORIES if role == UserRole.SUPER_ADMIN.value else ADMIN_CATEGORIES
+    requested = request.args.get('cats', '')
+    cats = [cat for cat in requested.split(',') if cat in allowed] if requested else list(allowed)
+    
+    # The body depends on the settings revision, the role and the categories served
+    etag = f"{settings_version()}-{role}-{','.join(sorted(set(cats)))}"
+    if request.if_none_match.contains_weak(etag):
+        response = current_app.response_class(status=304)
+        response.set_etag(etag, weak=True)
+        return response
+    
+    response = success_response(
+        data={cat: all_settings.get(cat, {}) for cat in cats},
+        message="Settings retrieved"
+    )
+    response.set_etag(etag, weak=True)
+    return response
 
 # =================== CATEGORY-SPECIFIC SETTINGS ===================
 
@@ -200,266 +321,221 @@ def update_all_settings():
 @admin_required
 def get_attendance_settings():
     """Get attendance-related settings."""
-    try:
-        settings = get_cached_settings()
-        return success_response(
-            data=settings.get('attendance', {}),
-            message="Attendance settings retrieved"
-        )
-        
-    except Exception as e:
-        return error_response(f"Error retrieving attendance settings: {str(e)}", 500)
+    settings = get_cached_settings()
+    return success_response(
+        data=settings.get('attendance', {}),
+        message="Attendance settings retrieved"
+    )
 
 @settings_bp.route('/attendance', methods=['PUT'])
 @jwt_required()
 @admin_required
 def update_attendance_settings():
     """Update attendance-related settings."""
-    try:
-        current_user_id = get_jwt_identity()
-        data = request.get_json()
-        
-        if not data:
-            return error_response("Request body must be JSON", 400)
-        
-        # Validate attendance settings
-        validation_result = validate_attendance_settings(data)
-        if not validation_result['valid']:
-            return error_response(f"Invalid attendance settings: {validation_result['error']}", 400)
-        
-        # Update settings
-        current_settings = get_cached_settings()
-        current_settings['attendance'].update(data)
-        
-        save_settings(current_settings, current_user_id)
-        log_settings_change(current_user_id, "UPDATE_ATTENDANCE", data)
-        
-        return success_response(
-            data=current_settings['attendance'],
-            message="Attendance settings updated successfully"
-        )
-        
-    except Exception as e:
-        return error_response(f"Error updating attendance settings: {str(e)}", 500)
+    current_user_id = get_jwt_identity()
+    data = request.get_json()
+    
+    if not data:
+        return error_response("Request body must be JSON", 400)
+    
+    # Validate attendance settings
+    valid, error = validate_cached(validate_attendance_settings, data)
+    if not valid:
+        return error_response(f"Invalid attendance settings: {error}", 400)
+    
+    # Update settings (copy-on-write; the cached dict is never mutated)
+    updated_section, changed = update_section('attendance', data)
+    if not changed:
+        return success_response(data=updated_section, message="No changes")
+    
+    log_settings_change(current_user_id, "UPDATE_ATTENDANCE", data)
+    
+    return success_response(
+        data=updated_section,
+        message="Attendance settings updated successfully"
+    )
 
 @settings_bp.route('/security', methods=['GET'])
 @jwt_required()
 @super_admin_required
 def get_security_settings():
     """Get security settings (super admin only)."""
-    try:
-        settings = get_cached_settings()
-        return success_response(
-            data=settings.get('security', {}),
-            message="Security settings retrieved"
-        )
-        
-    except Exception as e:
-        return error_response(f"Error retrieving security settings: {str(e)}", 500)
+    settings = get_cached_settings()
+    return success_response(
+        data=settings.get('security', {}),
+        message="Security settings retrieved"
+    )
 
 @settings_bp.route('/security', methods=['PUT'])
 @jwt_required()
 @super_admin_required
 def update_security_settings():
     """Update security settings (super admin only)."""
-    try:
-        current_user_id = get_jwt_identity()
-        data = request.get_json()
-        
-        if not data:
-            return error_response("Request body must be JSON", 400)
-        
-        # Validate security settings
-        validation_result = validate_security_settings(data)
-        if not validation_result['valid']:
-            return error_response(f"Invalid security settings: {validation_result['error']}", 400)
-        
-        # Update settings
-        current_settings = get_cached_settings()
-        current_settings['security'].update(data)
-        
-        save_settings(current_settings, current_user_id)
-        log_settings_change(current_user_id, "UPDATE_SECURITY", data)
-        
-        return success_response(
-            data=current_settings['security'],
-            message="Security settings updated successfully"
-        )
-        
-    except Exception as e:
-        return error_response(f"Error updating security settings: {str(e)}", 500)
+    current_user_id = get_jwt_identity()
+    data = request.get_json()
+    
+    if not data:
+        return error_response("Request body must be JSON", 400)
+    
+    # Validate security settings
+    valid, error = validate_cached(validate_security_settings, data)
+    if not valid:
+        return error_response(f"Invalid security settings: {error}", 400)
+    
+    # Update settings (copy-on-write; the cached dict is never mutated)
+    updated_section, changed = update_section('security', data)
+    if not changed:
+        return success_response(data=updated_section, message="No changes")
+    
+    log_settings_change(current_user_id, "UPDATE_SECURITY", data)
+    
+    return success_response(
+        data=updated_section,
+        message="Security settings updated successfully"
+    )
 
 @settings_bp.route('/notifications', methods=['GET'])
 @jwt_required()
 @admin_required
 def get_notification_settings():
     """Get notification settings."""
-    try:
-        settings = get_cached_settings()
-        return success_response(
-            data=settings.get('notifications', {}),
-            message="Notification settings retrieved"
-        )
-        
-    except Exception as e:
-        return error_response(f"Error retrieving notification settings: {str(e)}", 500)
+    settings = get_cached_settings()
+    return success_response(
+        data=settings.get('notifications', {}),
+        message="Notification settings retrieved"
+    )
 
 @settings_bp.route('/notifications', methods=['PUT'])
 @jwt_required()
 @admin_required
 def update_notification_settings():
     """Update notification settings."""
-    try:
-        current_user_id = get_jwt_identity()
-        data = request.get_json()
-        
-        if not data:
-            return error_response("Request body must be JSON", 400)
-        
-        # Update settings
-        current_settings = get_cached_settings()
-        current_settings['notifications'].update(data)
-        
-        save_settings(current_settings, current_user_id)
-        log_settings_change(current_user_id, "UPDATE_NOTIFICATIONS", data)
-        
-        return success_response(
-            data=current_settings['notifications'],
-            message="Notification settings updated successfully"
-        )
-        
-    except Exception as e:
-        return error_response(f"Error updating notification settings: {str(e)}", 500)
+    current_user_id = get_jwt_identity()
+    data = request.get_json()
+    
+    if not data:
+        return error_response("Request body must be JSON", 400)
+    
+    # Update settings (copy-on-write; the cached dict is never mutated)
+    updated_section, changed = update_section('notifications', data)
+    if not changed:
+        return success_response(data=updated_section, message="No changes")
+    
+    log_settings_change(current_user_id, "UPDATE_NOTIFICATIONS", data)
+    
+    return success_response(
+        data=updated_section,
+        message="Notification settings updated successfully"
+    )
 
 @settings_bp.route('/system', methods=['GET'])
 @jwt_required()
 @admin_required
 def get_system_settings():
     """Get system settings."""
-    try:
-        settings = get_cached_settings()
-        return success_response(
-            data=settings.get('system', {}),
-            message="System settings retrieved"
-        )
-        
-    except Exception as e:
-        return error_response(f"Error retrieving system settings: {str(e)}", 500)
+    settings = get_cached_settings()
+    return success_response(
+        data=settings.get('system', {}),
+        message="System settings retrieved"
+    )
 
 @settings_bp.route('/system', methods=['PUT'])
 @jwt_required()
 @super_admin_required
 def update_system_settings():
     """Update system settings (super admin only)."""
-    try:
-        current_user_id = get_jwt_identity()
-        data = request.get_json()
-        
-        if not data:
-            return error_response("Request body must be JSON", 400)
-        
-        # Validate system settings
-        validation_result = validate_system_settings(data)
-        if not validation_result['valid']:
-            return error_response(f"Invalid system settings: {validation_result['error']}", 400)
-        
-        # Update settings
-        current_settings = get_cached_settings()
-        current_settings['system'].update(data)
-        
-        save_settings(current_settings, current_user_id)
-        log_settings_change(current_user_id, "UPDATE_SYSTEM", data)
-        
-        return success_response(
-            data=current_settings['system'],
-            message="System settings updated successfully"
-        )
-        
-    except Exception as e:
-        return error_response(f"Error updating system settings: {str(e)}", 500)
+    current_user_id = get_jwt_identity()
+    data = request.get_json()
+    
+    if not data:
+        return error_response("Request body must be JSON", 400)
+    
+    # Validate system settings
+    valid, error = validate_cached(validate_system_settings, data)
+    if not valid:
+        return error_response(f"Invalid system settings: {error}", 400)
+    
+    # Update settings (copy-on-write; the cached dict is never mutated)
+    updated_section, changed = update_section('system', data)
+    if not changed:
+        return success_response(data=updated_section, message="No changes")
+    
+    log_settings_change(current_user_id, "UPDATE_SYSTEM", data)
+    
+    return success_response(
+        data=updated_section,
+        message="System settings updated successfully"
+    )
 
 @settings_bp.route('/ui', methods=['GET'])
 @jwt_required()
 def get_ui_settings():
     """Get UI settings (available to all users)."""
-    try:
-        settings = get_cached_settings()
-        return success_response(
-            data=settings.get('ui', {}),
-            message="UI settings retrieved"
-        )
-        
-    except Exception as e:
-        return error_response(f"Error retrieving UI settings: {str(e)}", 500)
+    settings = get_cached_settings()
+    return success_response(
+        data=settings.get('ui', {}),
+        message="UI settings retrieved"
+    )
 
 @settings_bp.route('/ui', methods=['PUT'])
 @jwt_required()
 @admin_required
 def update_ui_settings():
     """Update UI settings."""
-    try:
-        current_user_id = get_jwt_identity()
-        data = request.get_json()
-        
-        if not data:
-            return error_response("Request body must be JSON", 400)
-        
-        # Update settings
-        current_settings = get_cached_settings()
-        current_settings['ui'].update(data)
-        
-        save_settings(current_settings, current_user_id)
-        log_settings_change(current_user_id, "UPDATE_UI", data)
-        
-        return success_response(
-            data=current_settings['ui'],
-            message="UI settings updated successfully"
-        )
-        
-    except Exception as e:
-        return error_response(f"Error updating UI settings: {str(e)}", 500)
+    current_user_id = get_jwt_identity()
+    data = request.get_json()
+    
+    if not data:
+        return error_response("Request body must be JSON", 400)
+    
+    # Update settings (copy-on-write; the cached dict is never mutated)
+    updated_section, changed = update_section('ui', data)
+    if not changed:
+        return success_response(data=updated_section, message="No changes")
+    
+    log_settings_change(current_user_id, "UPDATE_UI", data)
+    
+    return success_response(
+        data=updated_section,
+        message="UI settings updated successfully"
+    )
 
 @settings_bp.route('/integration', methods=['GET'])
 @jwt_required()
 @super_admin_required
 def get_integration_settings():
     """Get integration settings (super admin only)."""
-    try:
-        settings = get_cached_settings()
-        return success_response(
-            data=settings.get('integration', {}),
-            message="Integration settings retrieved"
-        )
-        
-    except Exception as e:
-        return error_response(f"Error retrieving integration settings: {str(e)}", 500)
+    settings = get_cached_settings()
+    return success_response(
+        data=settings.get('integration', {}),
+        message="Integration settings retrieved"
+    )
 
 @settings_bp.route('/integration', methods=['PUT'])
 @jwt_required()
 @super_admin_required
 def update_integration_settings():
     """Update integration settings (super admin only)."""
-    try:
-        current_user_id = get_jwt_identity()
-        data = request.get_json()
-        
-        if not data:
-            return error_response("Request body must be JSON", 400)
-        
-        # Update settings
-        current_settings = get_cached_settings()
-        current_settings['integration'].update(data)
-        
-        save_settings(current_settings, current_user_id)
-        log_settings_change(current_user_id, "UPDATE_INTEGRATION", data)
-        
-        return success_response(
-            data=current_settings['integration'],
-            message="Integration settings updated successfully"
-        )
-        
-    except Exception as e:
-        return error_response(f"Error updating integration settings: {str(e)}", 500)
+    current_user_id = get_jwt_identity()
+    data = request.get_json()
+    
+    if not data:
+        return error_response("Request body must be JSON", 400)
+    
+    # Update settings (copy-on-write; the cached dict is never mutated)
+    updated_section, changed = update_section('integration', data)
+    if not changed:
+        return success_response(data=updated_section, message="No changes")
+    
+    invalidate_connection_results(
+        service for service, key in PROBE_CREDENTIAL_KEYS.items() if key in data
+    )
+    log_settings_change(current_user_id, "UPDATE_INTEGRATION", data)
+    
+    return success_response(
+        data=updated_section,
+        message="Integration settings updated successfully"
+    )
 
 # =================== SETTINGS MANAGEMENT ===================
 
@@ -468,333 +544,578 @@ def update_integration_settings():
 @super_admin_required
 def reset_settings():
     """Reset settings to defaults."""
-    try:
-        current_user_id = get_jwt_identity()
-        data = request.get_json() or {}
-        category = data.get('category', 'all')
-        
-        current_settings = get_cached_settings()
-        
-        if category == 'all':
-            # Reset all settings to defaults
-            reset_settings = DEFAULT_SETTINGS.copy()
-        elif category in DEFAULT_SETTINGS:
-            # Reset specific category
-            reset_settings = current_settings.copy()
-            reset_settings[category] = DEFAULT_SETTINGS[category].copy()
-        else:
-            return error_response(f"Invalid category: {category}", 400)
-        
-        save_settings(reset_settings, current_user_id)
-        log_settings_change(current_user_id, f"RESET_{category.upper()}", reset_settings)
-        
-        return success_response(
-            data={'settings': reset_settings},
-            message=f"Settings reset to defaults ({category})"
-        )
-        
-    except Exception as e:
-        return error_response(f"Error resetting settings: {str(e)}", 500)
+    current_user_id = get_jwt_identity()
+    data = request.get_json() or {}
+    category = data.get('category', 'all')
+    
+    current_settings = get_cached_settings()
+    
+    if category == 'all':
+        # Reset all settings to defaults
+        reset_settings = _fresh_defaults()
+    elif category in DEFAULT_SETTINGS:
+        # Reset specific category
+        reset_settings = {**current_settings, category: _thaw(DEFAULT_SETTINGS[category])}
+    else:
+        return error_response(f"Invalid category: {category}", 400)
+    
+    save_settings(reset_settings, current_user_id)
+    log_settings_change(current_user_id, f"RESET_{category.upper()}", reset_settings)
+    
+    return success_response(
+        data={'settings': reset_settings},
+        message=f"Settings reset to defaults ({category})"
+    )
 
 @settings_bp.route('/export', methods=['GET'])
+@gzip_response()
 @jwt_required()
 @super_admin_required
 def export_settings():
     """Export current settings as JSON."""
-    try:
-        settings = get_cached_settings()
-        
-        # Create export data
-        export_data = {
-            'settings': settings,
-            'exported_at': datetime.utcnow().isoformat(),
-            'exported_by': get_jwt_identity(),
-            'version': '1.0'
-        }
-        
-        return success_response(
-            data=export_data,
-            message="Settings exported successfully"
-        )
-        
-    except Exception as e:
-        return error_response(f"Error exporting settings: {str(e)}", 500)
+    settings = get_cached_settings()
+    
+    # Create export data
+    export_data = {
+        'settings': settings,
+        'exported_at': datetime.utcnow().isoformat(),
+        'exported_by': get_jwt_identity(),
+        'version': '1.0'
+    }
+    
+    return json_response(
+        data=export_data,
+        message="Settings exported successfully"
+    )
 
 @settings_bp.route('/import', methods=['POST'])
 @jwt_required()
 @super_admin_required
 def import_settings():
     """Import settings from JSON."""
-    try:
-        current_user_id = get_jwt_identity()
-        data = request.get_json()
-        
-        if not data or 'settings' not in data:
-            return error_response("Invalid import data", 400)
-        
-        imported_settings = data['settings']
-        
-        # Validate imported settings
-        validation_result = validate_settings_structure(imported_settings)
-        if not validation_result['valid']:
-            return error_response(f"Invalid imported settings: {validation_result['error']}", 400)
-        
-        # Merge with defaults to ensure completeness
-        final_settings = merge_settings(DEFAULT_SETTINGS, imported_settings)
-        
-        save_settings(final_settings, current_user_id)
-        log_settings_change(current_user_id, "IMPORT_SETTINGS", final_settings)
-        
-        return success_response(
-            data={'settings': final_settings},
-            message="Settings imported successfully"
-        )
-        
-    except Exception as e:
-        return error_response(f"Error importing settings: {str(e)}", 500)
+    current_user_id = get_jwt_identity()
+    data = request.get_json()
+    
+    if not data or 'settings' not in data:
+        return error_response("Invalid import data", 400)
+    
+    imported_settings = data['settings']
+    
+    # Validate imported settings
+    valid, error = validate_cached(validate_settings_structure, imported_settings)
+    if not valid:
+        return error_response(f"Invalid imported settings: {error}", 400)
+    
+    # Merge with defaults to ensure completeness
+    final_settings = _fresh_defaults()
+    merge_into(final_settings, imported_settings)
+    
+    save_settings(final_settings, current_user_id)
+    log_settings_change(current_user_id, "IMPORT_SETTINGS", final_settings)
+    
+    return success_response(
+        data={'settings': final_settings},
+        message="Settings imported successfully"
+    )
 
 @settings_bp.route('/history', methods=['GET'])
 @jwt_required()
 @super_admin_required
 def get_settings_history():
     """Get settings change history."""
-    try:
-        # In production, this would come from a database table
-        # For now, return a simulated history
-        
-        history = [
-            {
-                'id': 1,
-                'changed_by': 'super@admin.com',
-                'change_type': 'UPDATE_ATTENDANCE',
-                'changed_at': (datetime.utcnow() - timedelta(hours=2)).isoformat(),
-                'summary': 'Updated QR code expiry time'
-            },
-            {
-                'id': 2,
-                'changed_by': 'admin@university.edu',
-                'change_type': 'UPDATE_UI',
-                'changed_at': (datetime.utcnow() - timedelta(hours=24)).isoformat(),
-                'summary': 'Changed theme to dark mode'
-            }
-        ]
-        
-        return success_response(
-            data={'history': history},
-            message="Settings history retrieved"
-        )
-        
-    except Exception as e:
-        return error_response(f"Error retrieving settings history: {str(e)}", 500)
+    # In production, this would come from a database table
+    # For now, return a simulated history from a fixed template
+    now = datetime.utcnow()
+    history = [
+        {
+            'id': entry_id,
+            'changed_by': changed_by,
+            'change_type': change_type,
+            'changed_at': (now - age).isoformat(),
+            'summary': summary
+        }
+        for entry_id, changed_by, change_type, age, summary in SETTINGS_HISTORY_TEMPLATE
+    ]
+    
+    return success_response(
+        data={'history': history},
+        message="Settings history retrieved"
+    )
 
 @settings_bp.route('/test-connection', methods=['POST'])
 @jwt_required()
 @admin_required
 def test_integration_connection():
     """Test external service connections."""
-    try:
-        data = request.get_json()
-        service = data.get('service')
-        
-        if not service:
-            return error_response("Service type required", 400)
-        
-        settings = get_cached_settings()
-        integration_settings = settings.get('integration', {})
-        
-        test_results = {}
-        
-        if service == 'email':
-            # Test email SMTP connection
-            test_results = test_email_connection(integration_settings)
-        elif service == 'telegram':
-            # Test Telegram bot connection
-            test_results = test_telegram_connection(integration_settings)
-        elif service == 'maps':
-            # Test Google Maps API
-            test_results = test_maps_api(integration_settings)
-        else:
-            return error_response(f"Unknown service: {service}", 400)
-        
-        return success_response(
-            data={'test_results': test_results},
-            message=f"Connection test completed for {service}"
-        )
-        
-    except Exception as e:
-        return error_response(f"Error testing connection: {str(e)}", 500)
+    data = request.get_json() or {}
+    service = data.get('service')
+    
+    if not service:
+        return error_response("Service type required", 400)
+    
+    # A single service name, a comma-separated string, a list or 'all'
+    if service == 'all':
+        services = list(CONNECTION_TESTERS)
+    else:
+        services = service.split(',') if isinstance(service, str) else list(service)
+    for name in services:
+        if name not in CONNECTION_TESTERS:
+            return error_response(f"Unknown service: {name}", 400)
+    
+    settings = get_cached_settings()
+    integration_settings = settings.get('integration', {})
+    
+    if len(services) == 1:
+        test_results = CONNECTION_TESTERS[services[0]](integration_settings)
+    else:
+        # Independent network checks: overlap their latency
+        timeout = integration_settings.get('external_api_timeout_seconds', 30)
+        futures = {
+            name: _connection_test_pool.submit(CONNECTION_TESTERS[name], integration_settings)
+            for name in services
+        }
+        # One deadline for the whole batch, not one per service
+        wait(futures.values(), timeout=timeout)
+        test_results = {name: connection_test_result(future, timeout) for name, future in futures.items()}
+    
+    return success_response(
+        data={'test_results': test_results},
+        message=f"Connection test completed for {', '.join(services)}"
+    )
 
 # =================== HELPER FUNCTIONS ===================
 
+def current_user_role() -> Optional[str]:
+    """Role value of the requesting user, as admin_required already loaded them."""
+    user = load_current_user()
+    return user.role.value if user else None
+
+def filtered_settings_view(all_settings: Dict) -> Dict:
+    """Settings as shown to admins below super admin, built once per settings dict.
+    
+    The cache is replaced, never mutated, on every save, so identity is a
+    reliable revision check.
+    """
+    global _filtered_view
+    
+    source, view = _filtered_view
+    if source is all_settings:
+        return view
+    
+    security = all_settings.get('security', {})
+    integration = all_settings.get('integration', {})
+    view = {
+        **all_settings,
+        # Remove sensitive security settings
+        'security': {
+            key: value for key, value in security.items()
+            if key not in HIDDEN_SECURITY_KEYS
+        },
+        # Mask API keys and passwords
+        'integration': {
+            **integration,
+            **{key: '***hidden***' if integration.get(key) else '' for key in MASKED_INTEGRATION_KEYS}
+        }
+    }
+    _filtered_view = (all_settings, view)
+    return view
+
 def get_cached_settings() -> Dict:
-    """Get settings from cache or load defaults."""
-    global settings_cache
+    """Get settings from cache, refreshing from Redis when its revision moved."""
+    global settings_cache, settings_rev, settings_updated_at
+    
+    global _checked_invalidations
     
-    if not settings_cache:
-        # Load from file or database
-        settings_cache = load_settings_from_storage()
+    client = get_redis()
+    if client is not None:
+        listening = settings_listener_running(client)
+        generation = _invalidations
+        if listening and generation == _checked_invalidations and settings_cache is not _MISSING:
+            return settings_cache
+        
+        try:
+            pipe = client.pipeline()
+            pipe.get(SETTINGS_REV_KEY)
+            pipe.get(SETTINGS_BLOB_KEY)
+            pipe.get(SETTINGS_UPDATED_KEY)
+            rev, blob, updated_at = pipe.execute()
+        except redis.RedisError as e:
+            current_app.logger.warning(f"Settings Redis read failed, using local cache: {e}")
+        else:
+            if blob is not None:
+                cached = settings_cache
+                if rev != settings_rev or cached is _MISSING:
+                    with _cache_lock:
+                        # Another thread may have refreshed while we waited
+                        if rev != settings_rev or settings_cache is _MISSING:
+                            # Merge with defaults to ensure completeness
+                            fresh_settings = _fresh_defaults()
+                            merge_into(fresh_settings, loads_settings(blob))
+                            settings_cache = fresh_settings
+                            settings_rev = rev
+                            settings_updated_at = updated_at
+                        cached = settings_cache
+                _checked_invalidations = generation
+                return cached
+    
+    cached = settings_cache
+    if cached is _MISSING:
+        with _cache_lock:
+            if settings_cache is _MISSING:
+                # Nothing published to Redis yet: load from file
+                settings_cache = load_settings_from_storage()
+            cached = settings_cache
     
-    return settings_cache
+    return cached
+
+def _on_settings_invalidated(message) -> None:
+    """Pub/sub handler: a worker saved new settings."""
+    global _invalidations
+    _invalidations += 1
+
+def _on_settings_listener_error(error, pubsub, thread) -> None:
+    """Messages may have been missed while disconnected; redis-py resubscribes on the next poll."""
+    global _invalidations
+    _invalidations += 1
+    time.sleep(1)
+
+def settings_listener_running(client) -> bool:
+    """Start the invalidation listener if needed; False if it is not running."""
+    global _settings_listener, _invalidations
+    
+    listener = _settings_listener
+    if listener is not None and listener.is_alive():
+        return True
+    
+    with _cache_lock:
+        if _settings_listener is None or not _settings_listener.is_alive():
+            try:
+                pubsub = client.pubsub(ignore_subscribe_messages=True)
+                pubsub.subscribe(**{SETTINGS_CHANNEL: _on_settings_invalidated})
+                _settings_listener = pubsub.run_in_thread(
+                    sleep_time=1,
+                    daemon=True,
+                    exception_handler=_on_settings_listener_error
+                )
+            except redis.RedisError as e:
+                current_app.logger.warning(f"Settings invalidation listener unavailable: {e}")
+                return False
+            # Changes made before the subscription went unseen
+            _invalidations += 1
+    return True
 
 def load_settings_from_storage() -> Dict:
-    """Load settings from storage (file or database)."""
+    """Load settings from the local settings file."""
     try:
-        # In production, load from database
-        # For now, check if settings file exists
-        settings_file = 'system_settings.json'
-        
-        if os.path.exists(settings_file):
-            with open(settings_file, 'r', encoding='utf-8') as f:
-                stored_settings = json.load(f)
+        if os.path.exists(SETTINGS_FILE):
+            with open(SETTINGS_FILE, 'rb') as f:
+                stored_settings = loads_settings(f.read())
             
             # Merge with defaults to ensure completeness
-            return merge_settings(DEFAULT_SETTINGS, stored_settings)
+            loaded_settings = _fresh_defaults()
+            merge_into(loaded_settings, stored_settings)
+            return loaded_settings
         else:
-            return DEFAULT_SETTINGS.copy()
+            return _fresh_defaults()
             
     except Exception:
-        return DEFAULT_SETTINGS.copy()
+        return _fresh_defaults()
 
 def save_settings(settings: Dict, user_id: int) -> None:
-    """Save settings to storage."""
+    """Persist settings, then update the cache."""
+    global settings_cache
+    
+    with _cache_lock:
+        persist_settings(settings)
+        settings_cache = settings.copy()
+
+def update_section(category: str, patch: Dict) -> tuple:
+    """Apply a patch to one category and swap in a new settings dict.
+    
+    Returns (section, changed); a patch that changes nothing is not persisted.
+    """
     global settings_cache
     
-    # Update cache
-    settings_cache = settings.copy()
+    with _cache_lock:
+        current_settings = get_cached_settings()
+        current_section = current_settings.get(category, {})
+        updated_section = {**current_section, **patch}
+        if updated_section == current_section:
+            return current_section, False
+        
+        updated_settings = {**current_settings, category: updated_section}
+        persist_settings(updated_settings)
+        settings_cache = updated_settings
+    return updated_section, True
+
+def persist_settings(settings: Dict) -> None:
+    """Write settings to Redis, or to the local file when Redis is unavailable.
+    
+    Raises SettingsError when neither store accepts the write.
+    """
+    global settings_rev, settings_updated_at
+    
+    client = get_redis()
+    if client is not None:
+        try:
+            updated_at = datetime.utcnow().isoformat()
+            # MULTI/EXEC: blob and revision change together
+            pipe = client.pipeline()
+            pipe.set(SETTINGS_BLOB_KEY, dumps_settings(settings))
+            pipe.set(SETTINGS_UPDATED_KEY, updated_at)
+            pipe.incr(SETTINGS_REV_KEY)
+            _, _, rev = pipe.execute()
+            # Redis hands the revision back as a string on reads
+            settings_rev = str(rev)
+            settings_updated_at = updated_at
+            # Tell other workers to re-check the revision on their next read
+            client.publish(SETTINGS_CHANNEL, settings_rev)
+            return
+        except redis.RedisError as e:
+            current_app.logger.warning(f"Settings Redis write failed, saving to file: {e}")
     
-    # Save to file (in production, save to database)
     try:
-        settings_file = 'system_settings.json'
-        with open(settings_file, 'w', encoding='utf-8') as f:
-            json.dump(settings, f, indent=2, ensure_ascii=False)
-    except Exception:
-        pass  # Log error in production
+        # Write a temp file and rename it over the old one, so a crash
+        # mid-write never leaves a truncated settings file behind
+        tmp_file = f"{SETTINGS_FILE}.{os.getpid()}.tmp"
+        with open(tmp_file, 'wb') as f:
+            f.write(dumps_settings(settings, indent=True))
+        os.replace(tmp_file, SETTINGS_FILE)
+        settings_updated_at = datetime.now().isoformat()
+    except Exception as e:
+        raise SettingsError('Settings could not be saved') from e
+
+def _thaw(value):
+    """Mutable deep copy of a frozen defaults subtree."""
+    if isinstance(value, MappingProxyType):
+        return {key: _thaw(item) for key, item in value.items()}
+    if isinstance(value, tuple):
+        return [_thaw(item) for item in value]
+    return value
+
+def _fresh_defaults() -> Dict:
+    """Return a mutable copy of DEFAULT_SETTINGS that callers may own."""
+    return _thaw(DEFAULT_SETTINGS)
+
+def dumps_settings(settings: Dict, indent: bool = False) -> bytes:
+    """Serialize settings to UTF-8 JSON, with orjson when it is installed."""
+    if orjson is not None:
+        return orjson.dumps(settings, option=orjson.OPT_INDENT_2 if indent else 0)
+    return json.dumps(settings, indent=2 if indent else None, ensure_ascii=False).encode('utf-8')
+
+def loads_settings(data) -> Dict:
+    """Parse a settings JSON document from bytes or str."""
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
 
 def merge_settings(defaults: Dict, updates: Dict) -> Dict:
-    """Merge settings dictionaries recursively."""
+    """Merge settings dictionaries into a new dict, copying only merged levels."""
     result = defaults.copy()
+    # Explicit stack instead of recursion: deep imports cannot hit the recursion limit
+    stack = [(result, updates)]
     
-    for key, value in updates.items():
-        if key in result and isinstance(result[key], dict) and isinstance(value, dict):
-            result[key] = merge_settings(result[key], value)
-        else:
-            result[key] = value
+    while stack:
+        dest, source = stack.pop()
+        for key, value in source.items():
+            existing = dest.get(key)
+            if type(existing) is dict and type(value) is dict:
+                dest[key] = existing = existing.copy()
+                stack.append((existing, value))
+            else:
+                dest[key] = value
     
     return result
 
+def merge_into(dest: Dict, source: Dict) -> None:
+    """Merge source into dest in place; dest must be owned by the caller."""
+    stack = [(dest, source)]
+    
+    while stack:
+        target, updates = stack.pop()
+        for key, value in updates.items():
+            existing = target.get(key)
+            if type(existing) is dict and type(value) is dict:
+                stack.append((existing, value))
+            else:
+                target[key] = value
+
+def settings_version() -> str:
+    """Opaque version of the current settings, used as the ETag base."""
+    return settings_rev or get_settings_last_updated()
+
 def get_settings_last_updated() -> str:
-    """Get last updated timestamp."""
+    """Get last updated timestamp; the file is only stat()ed on a cold cache."""
+    global settings_updated_at
+    
+    if settings_updated_at:
+        return settings_updated_at
+    
     try:
-        settings_file = 'system_settings.json'
-        if os.path.exists(settings_file):
-            mtime = os.path.getmtime(settings_file)
-            return datetime.fromtimestamp(mtime).isoformat()
+        if os.path.exists(SETTINGS_FILE):
+            mtime = os.path.getmtime(SETTINGS_FILE)
+            settings_updated_at = datetime.fromtimestamp(mtime).isoformat()
+            return settings_updated_at
         else:
             return datetime.utcnow().isoformat()
     except Exception:
         return datetime.utcnow().isoformat()
 
 def log_settings_change(user_id: int, change_type: str, data: Dict) -> None:
-    """Log settings change (in production, save to database)."""
-    try:
-        # In production, save to audit log table
-        log_entry = {
-            'user_id': user_id,
-            'change_type': change_type,
-            'timestamp': datetime.utcnow().isoformat(),
-            'data_summary': f"Changed {len(data)} settings"
-        }
-        # Save to log file or database
-    except Exception:
-        pass
+    """Queue a settings change for the audit writer; never blocks the request."""
+    start_audit_writer()
+    _audit_queue.put_nowait((user_id, change_type, time.time(), len(data)))
+
+def start_audit_writer() -> None:
+    """Start the background audit writer for this process if it is not running."""
+    global _audit_writer
+    
+    writer = _audit_writer
+    if writer is not None and writer.is_alive():
+        return
+    
+    with _audit_lock:
+        if _audit_writer is None or not _audit_writer.is_alive():
+            _audit_writer = threading.Thread(
+                target=drain_audit_queue,
+                args=(current_app.logger,),
+                name='settings-audit',
+                daemon=True
+            )
+            _audit_writer.start()
+
+def drain_audit_queue(logger) -> None:
+    """Write queued changes in batches of up to AUDIT_BATCH_SIZE or AUDIT_FLUSH_SECONDS.
+    
+    In production, each batch becomes one multi-row INSERT into an audit table.
+    """
+    while True:
+        batch = [_audit_queue.get()]
+        deadline = time.monotonic() + AUDIT_FLUSH_SECONDS
+        while len(batch) < AUDIT_BATCH_SIZE:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(_audit_queue.get(timeout=remaining))
+            except queue.Empty:
+                break
+        
+        try:
+            logger.info("Settings changes:\n" + "\n".join(
+                f"{datetime.utcfromtimestamp(timestamp).isoformat()} {change_type} "
+                f"by user {user_id}: changed {count} settings"
+                for user_id, change_type, timestamp, count in batch
+            ))
+        except Exception:
+            pass  # Never let a bad entry stop the writer
 
 # =================== VALIDATION FUNCTIONS ===================
 
-def validate_settings_structure(settings: Dict) -> Dict:
+# Validators return (valid, error) tuples
+VALID = (True, None)
+
+def validate_cached(validator, data: Dict) -> tuple:
+    """Run a validator, reusing the result for an identical payload.
+    
+    The key is the object actually validated, not the request body: import
+    validates data['settings'] and must not share entries with a PUT of the
+    same bytes.
+    """
+    try:
+        payload_hash = hashlib.blake2b(canonical_json(data), digest_size=16).digest()
+    except (TypeError, ValueError):  # not JSON-serializable: nothing to reuse
+        return validator(data)
+    key = (validator.__name__, payload_hash)
+    
+    result = _validation_cache.get(key)
+    if result is not None:
+        try:
+            _validation_cache.move_to_end(key)
+        except KeyError:  # evicted by a concurrent request
+            pass
+        return result
+    
+    result = validator(data)
+    _validation_cache[key] = result
+    if len(_validation_cache) > VALIDATION_CACHE_SIZE:
+        try:
+            _validation_cache.popitem(last=False)
+        except KeyError:
+            pass
+    return result
+
+def canonical_json(data) -> bytes:
+    """JSON bytes with sorted keys, so equal payloads hash alike."""
+    if orjson is not None:
+        return orjson.dumps(data, option=orjson.OPT_SORT_KEYS)
+    return json.dumps(data, sort_keys=True, ensure_ascii=False).encode('utf-8')
+
+def validate_settings_structure(settings: Dict) -> tuple:
     """Validate settings structure."""
     try:
         required_categories = ['attendance', 'security', 'notifications', 'system', 'ui', 'integration']
         
         for category in required_categories:
             if category not in settings:
-                return {'valid': False, 'error': f"Missing category: {category}"}
+                return (False, f"Missing category: {category}")
         
-        return {'valid': True, 'error': None}
+        return VALID
         
     except Exception as e:
-        return {'valid': False, 'error': str(e)}
+        return (False, str(e))
 
-def validate_attendance_settings(settings: Dict) -> Dict:
-    """Validate attendance settings."""
+# (key, accepted types, min, max, error) per category, checked in order
+VALIDATION_RULES = {
+    'attendance': (
+        ('qr_code_expiry_seconds', (int,), 30, 600,
+         'QR code expiry must be between 30 and 600 seconds'),
+        ('gps_accuracy_tolerance_meters', (int, float), 1, 100,
+         'GPS tolerance must be between 1 and 100 meters'),
+        ('face_recognition_threshold', (int, float), 0.5, 1.0,
+         'Face recognition threshold must be between 0.5 and 1.0'),
+    ),
+    'security': (
+        ('password_min_length', (int,), 4, 32,
+         'Password minimum length must be between 4 and 32'),
+        ('max_login_attempts', (int,), 1, 20,
+         'Max login attempts must be between 1 and 20'),
+        ('session_timeout_minutes', (int,), 15, 480,
+         'Session timeout must be between 15 and 480 minutes'),
+    ),
+    'system': (
+        ('max_page_size', (int,), 10, 1000,
+         'Max page size must be between 10 and 1000'),
+        ('file_upload_max_size_mb', (int, float), 1, 100,
+         'File upload max size must be between 1 and 100 MB'),
+    ),
+}
+
+def validate_category(category: str, settings: Dict) -> tuple:
+    """Validate the ranged settings of one category against VALIDATION_RULES."""
     try:
-        # Check QR code expiry
-        if 'qr_code_expiry_seconds' in settings:
-            expiry = settings['qr_code_expiry_seconds']
-            if not isinstance(expiry, int) or expiry < 30 or expiry > 600:
-                return {'valid': False, 'error': 'QR code expiry must be between 30 and 600 seconds'}
-        
-        # Check GPS tolerance
-        if 'gps_accuracy_tolerance_meters' in settings:
-            tolerance = settings['gps_accuracy_tolerance_meters']
-            if not isinstance(tolerance, (int, float)) or tolerance < 1 or tolerance > 100:
-                return {'valid': False, 'error': 'GPS tolerance must be between 1 and 100 meters'}
+        for key, types, low, high, error in VALIDATION_RULES[category]:
+            if key in settings:
+                value = settings[key]
+                if not isinstance(value, types) or value < low or value > high:
+                    return (False, error)
         
-        # Check face recognition threshold
-        if 'face_recognition_threshold' in settings:
-            threshold = settings['face_recognition_threshold']
-            if not isinstance(threshold, (int, float)) or threshold < 0.5 or threshold > 1.0:
-                return {'valid': False, 'error': 'Face recognition threshold must be between 0.5 and 1.0'}
-        
-        return {'valid': True, 'error': None}
+        return VALID
         
     except Exception as e:
-        return {'valid': False, 'error': str(e)}
+        return (False, str(e))
+
+def validate_attendance_settings(settings: Dict) -> tuple:
+    """Validate attendance settings."""
+    return validate_category('attendance', settings)
 
-def validate_security_settings(settings: Dict) -> Dict:
+def validate_security_settings(settings: Dict) -> tuple:
     """Validate security settings."""
-    try:
-        # Check password length
-        if 'password_min_length' in settings:
-            length = settings['password_min_length']
-            if not isinstance(length, int) or length < 4 or length > 32:
-                return {'valid': False, 'error': 'Password minimum length must be between 4 and 32'}
-        
-        # Check login attempts
-        if 'max_login_attempts' in settings:
-            attempts = settings['max_login_attempts']
-            if not isinstance(attempts, int) or attempts < 1 or attempts > 20:
-                return {'valid': False, 'error': 'Max login attempts must be between 1 and 20'}
-        
-        # Check session timeout
-        if 'session_timeout_minutes' in settings:
-            timeout = settings['session_timeout_minutes']
-            if not isinstance(timeout, int) or timeout < 15 or timeout > 480:
-                return {'valid': False, 'error': 'Session timeout must be between 15 and 480 minutes'}
-        
-        return {'valid': True, 'error': None}
-        
-    except Exception as e:
-        return {'valid': False, 'error': str(e)}
+    return validate_category('security', settings)
 
-def validate_system_settings(settings: Dict) -> Dict:
+def validate_system_settings(settings: Dict) -> tuple:
     """Validate system settings."""
-    try:
-        # Check page size limits
-        if 'max_page_size' in settings:
-            size = settings['max_page_size']
-            if not isinstance(size, int) or size < 10 or size > 1000:
-                return {'valid': False, 'error': 'Max page size must be between 10 and 1000'}
-        
-        # Check file upload size
-        if 'file_upload_max_size_mb' in settings:
-            size = settings['file_upload_max_size_mb']
-            if not isinstance(size, (int, float)) or size < 1 or size > 100:
-                return {'valid': False, 'error': 'File upload max size must be between 1 and 100 MB'}
-        
-        return {'valid': True, 'error': None}
-        
-    except Exception as e:
-        return {'valid': False, 'error': str(e)}
+    return validate_category('system', settings)
 
 # =================== CONNECTION TEST FUNCTIONS ===================
 
@@ -807,68 +1128,144 @@ def test_email_connection(settings: Dict) -> Dict:
         username = settings.get('email_username')
         
         if not all([smtp_server, smtp_port, username]):
-            return {
-                'success': False,
-                'message': 'Missing required email configuration'
-            }
+            return probe_result(False, 'Missing required email configuration')
         
         # Simulate successful connection
-        return {
-            'success': True,
-            'message': f'Successfully connected to {smtp_server}:{smtp_port}',
-            'tested_at': datetime.utcnow().isoformat()
-        }
+        return probe_result(True, f'Successfully connected to {smtp_server}:{smtp_port}')
         
     except Exception as e:
-        return {
-            'success': False,
-            'message': f'Email connection failed: {str(e)}'
-        }
+        return probe_result(False, f'Email connection failed: {e!s}')
 
-def test_telegram_connection(settings: Dict) -> Dict:
-    """Test Telegram bot connection."""
+def cached_probe(service: str):
+    """Reuse a probe's verdict for the same credential for a short TTL.
+
+    Concurrent callers that miss the cache share the one in-flight probe
+    instead of each making their own upstream call.
+    """
+    credential_key = PROBE_CREDENTIAL_KEYS[service]
+    
+    def decorator(probe):
+        @wraps(probe)
+        def wrapper(settings: Dict) -> Dict:
+            credential = settings.get(credential_key)
+            if not credential:
+                return probe(settings)
+            
+            key = (service, hashlib.sha256(credential.encode()).hexdigest())
+            with _connection_results_lock:
+                hit = _connection_results.get(key)
+                if hit is not None and hit[0] > time.monotonic():
+                    return hit[1]
+                pending = _inflight_probes.get(key)
+                leader = pending is None
+                if leader:
+                    pending = _inflight_probes[key] = Future()
+            
+            if not leader:
+                return pending.result()
+            
+            try:
+                result = probe(settings)
+            except BaseException as e:
+                with _connection_results_lock:
+                    del _inflight_probes[key]
+                pending.set_exception(e)
+                raise
+            
+            ttl = CONNECTION_RESULT_TTL if result.get('success') else CONNECTION_FAILURE_TTL
+            with _connection_results_lock:
+                if len(_connection_results) >= CONNECTION_RESULT_CACHE_MAX:
+                    _connection_results.clear()
+                _connection_results[key] = (time.monotonic() + ttl, result)
+                del _inflight_probes[key]
+            pending.set_result(result)
+            return result
+        return wrapper
+    return decorator
+
+def invalidate_connection_results(services):
+    """Forget cached probe verdicts for the given services."""
+    services = set(services)
+    if not services:
+        return
+    with _connection_results_lock:
+        for key in [key for key in _connection_results if key[0] in services]:
+            del _connection_results[key]
+
+def probe_result(success: bool, message: str) -> Dict:
+    """Connection test envelope; only successful tests carry tested_at."""
+    if success:
+        return {'success': True, 'message': message, 'tested_at': probe_timestamp()}
+    return {'success': False, 'message': message}
+
+def run_probe(settings: Dict, service: str, label: str, missing_message: str, check) -> Dict:
+    """Run check(credential) -> (success, message) for one integration."""
+    credential = settings.get(PROBE_CREDENTIAL_KEYS[service])
+    if not credential:
+        return probe_result(False, missing_message)
+    
     try:
-        bot_token = settings.get('telegram_bot_token')
-        
-        if not bot_token:
-            return {
-                'success': False,
-                'message': 'Telegram bot token not configured'
-            }
-        
-        # Simulate successful connection (implement actual API test in production)
-        return {
-            'success': True,
-            'message': 'Telegram bot connection successful',
-            'tested_at': datetime.utcnow().isoformat()
-        }
-        
+        return probe_result(*check(credential))
+    except TimeoutError:
+        return probe_result(False, f'{label} connection timed out after {CONNECTION_TEST_TIMEOUT} seconds')
     except Exception as e:
-        return {
-            'success': False,
-            'message': f'Telegram connection failed: {str(e)}'
-        }
+        return probe_result(False, f'{label} connection failed: {e!s}')
+
+def check_telegram_bot(bot_token: str) -> tuple:
+    """Ask Telegram who the bot is; an invalid token is rejected with 401."""
+    status, body = get_json(f"{TELEGRAM_API_URL}/bot{bot_token}/getMe", timeout=CONNECTION_TEST_TIMEOUT)
+    if status != 200 or not body.get('ok'):
+        return False, f"Telegram bot connection failed: {body.get('description', f'HTTP {status}')}"
+    return True, f"Telegram bot @{body.get('result', {}).get('username', '')} connection successful"
+
+def check_maps_key(api_key: str) -> tuple:
+    """Geocode a placeholder address; ZERO_RESULTS still proves the key was accepted."""
+    status, body = get_json(
+        MAPS_GEOCODE_URL,
+        params={'address': 'test', 'key': api_key},
+        timeout=CONNECTION_TEST_TIMEOUT
+    )
+    if status != 200 or body.get('status') not in ('OK', 'ZERO_RESULTS'):
+        reason = body.get('error_message') or body.get('status') or f'HTTP {status}'
+        return False, f"Google Maps API connection failed: {reason}"
+    return True, 'Google Maps API connection successful'
+
+@cached_probe('telegram')
+def test_telegram_connection(settings: Dict) -> Dict:
+    """Test Telegram bot connection."""
+    return run_probe(settings, 'telegram', 'Telegram', 'Telegram bot token not configured', check_telegram_bot)
 
+@cached_probe('maps')
 def test_maps_api(settings: Dict) -> Dict:
     """Test Google Maps API connection."""
-    try:
-        api_key = settings.get('google_maps_api_key')
-        
-        if not api_key:
-            return {
-                'success': False,
-                'message': 'Google Maps API key not configured'
-            }
-        
-        # Simulate successful connection (implement actual API test in production)
-        return {
-            'success': True,
-            'message': 'Google Maps API connection successful',
-            'tested_at': datetime.utcnow().isoformat()
-        }
-        
-    except Exception as e:
+    return run_probe(settings, 'maps', 'Google Maps API', 'Google Maps API key not configured', check_maps_key)
+
+# (epoch second, iso string) for the most recent probe; replaced as one tuple
+# so concurrent probes never see a mismatched pair
+_tested_at_cache = (None, '')
+
+def probe_timestamp() -> str:
+    """UTC ISO timestamp truncated to the second, formatted once per second."""
+    global _tested_at_cache
+    second = int(time.time())
+    cached = _tested_at_cache
+    if cached[0] != second:
+        cached = (second, datetime.fromtimestamp(second, timezone.utc).isoformat())
+        _tested_at_cache = cached
+    return cached[1]
+
+def connection_test_result(future, timeout: float) -> Dict:
+    """Result of a submitted connection test; one still running counts as timed out."""
+    if not future.done():
+        future.cancel()
         return {
             'success': False,
-            'message': f'Google Maps API connection failed: {str(e)}'
-        }
\ No newline at end of file
+            'message': f'Connection test timed out after {timeout} seconds'
+        }
+    return future.result()
+
+CONNECTION_TESTERS = {
+    'email': test_email_connection,
+    'telegram': test_telegram_connection,
+    'maps': test_maps_api
+}
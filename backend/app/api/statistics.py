@@ -1,6 +1,6 @@
 # File: backend/app/api/statistics.py
 """Comprehensive Statistics API for system analytics and insights."""
-from flask import Blueprint, request, jsonify
+from flask import Blueprint, request, jsonify, current_app, has_app_context
 from flask_jwt_extended import jwt_required, get_jwt_identity
 from app import db
 from app.models.user import User, UserRole
@@ -9,15 +9,163 @@ from app.models.lecture import Lecture
 from app.models.attendance import AttendanceRecord
 from app.models.schedule import Schedule, WeekDay
 from app.models.room import Room
-from app.utils.helpers import success_response, error_response
-from app.utils.decorators import admin_required, teacher_required
+from app.utils.helpers import success_response, error_response, estimated_row_count, get_redis
+from app.utils.decorators import admin_required, teacher_required, load_current_user
 from datetime import datetime, timedelta, date
-from sqlalchemy import func, and_, or_, distinct, text
+from sqlalchemy import func, and_, or_, distinct, text, inspect, table, column, event, select, bindparam
+from sqlalchemy.orm import Session, joinedload
+from functools import wraps
+from concurrent.futures import ThreadPoolExecutor
+from itertools import chain
 from typing import Dict, List, Any, Optional
 import json
+import threading
+import time
+import redis
 
 statistics_bp = Blueprint('statistics', __name__)
 
+# Rollups maintained on PostgreSQL (see create_statistics_views in the
+# upgrade script); without them the live tables are aggregated instead
+ATTENDANCE_DAILY_VIEW = table(
+    'mv_attendance_daily',
+    column('day'), column('teacher_id'), column('section', db.Enum(Section)), column('study_year'),
+    column('verification_method'), column('total'), column('present'), column('exceptional')
+)
+STUDENT_ATTENDANCE_VIEW = table(
+    'mv_student_attendance',
+    column('student_id'), column('university_id'), column('full_name'), column('section', db.Enum(Section)),
+    column('study_year'), column('total_lectures'), column('present_count'), column('attendance_rate')
+)
+STATISTICS_VIEWS = ('mv_attendance_daily', 'mv_student_attendance')
+STATISTICS_VIEW_REFRESH_SECONDS = 300
+
+# Attendance statistics statements, built once per filter shape
+# (teacher, section, study year) with the request values as bind parameters
+_attendance_statements = {}
+
+# Enum member -> serialized value, looked up per result row
+SECTION_VALUES = {member: member.value for member in Section}
+STUDY_TYPE_VALUES = {member: member.value for member in StudyType}
+ROLE_VALUES = {member: member.value for member in UserRole}
+
+# Request value (member name, any case) -> Section, for filter parameters
+SECTIONS_BY_NAME = {member.name: member for member in Section}
+
+# Students need this many records before they are ranked by attendance
+MIN_RANKED_LECTURES = 5
+LOW_ATTENDANCE_RATE = 70
+
+_views_available = None  # names of the statistics views this database has
+
+# Admin dashboard responses are cached briefly. Any commit touching the
+# tables they aggregate moves the cache to a new generation.
+STATISTICS_CACHE_TTL = 30  # seconds
+REALTIME_STATISTICS_CACHE_TTL = 5  # seconds; live figures also age with the clock
+STATISTICS_CACHE_MAX = 256
+STATISTICS_GENERATION_KEY = 'statistics:generation'
+STATISTICS_SOURCE_MODELS = (AttendanceRecord, Lecture, Student, User, Room, Schedule)
+# Login bookkeeping on existing users, which no statistic reads
+STATISTICS_IGNORED_USER_FIELDS = frozenset({'last_login', 'failed_login_attempts', 'locked_until', 'updated_at'})
+_statistics_generation = 0
+_statistics_responses = {}  # key -> (expires_at, body) when Redis is unavailable
+_views_refreshed_at = 0.0
+_views_refresh_lock = threading.Lock()
+
+# Shared workers for running independent statistics queries at once; each
+# query block gets its own app context, session and pooled connection
+STATISTICS_QUERY_WORKERS = 4
+_statistics_query_pool = ThreadPoolExecutor(max_workers=STATISTICS_QUERY_WORKERS,
+                                            thread_name_prefix='statistics-query')
+
+def cached_statistics_for(ttl: int):
+    """Serve an admin statistics response from cache for ttl seconds.
+
+    Responses are shared by every admin and keyed on the query string;
+    only successful responses are cached.
+    """
+    def decorator(f):
+        @wraps(f)
+        def wrapper(*args, **kwargs):
+            generation = _statistics_generation
+            redis_client = get_redis()
+            if redis_client:
+                try:
+                    generation = redis_client.get(STATISTICS_GENERATION_KEY) or 0
+                except redis.RedisError:
+                    redis_client = None
+            key = f"statistics:{f.__name__}:{generation}:{request.query_string.decode()}"
+            
+            body = None
+            if redis_client:
+                try:
+                    body = redis_client.get(key)
+                except redis.RedisError:
+                    redis_client = None
+            else:
+                hit = _statistics_responses.get(key)
+                if hit is not None and hit[0] > time.monotonic():
+                    body = hit[1]
+            if body is not None:
+                return current_app.response_class(body, mimetype='application/json')
+            
+            response = current_app.make_response(f(*args, **kwargs))
+            if response.status_code == 200:
+                body = response.get_data(as_text=True)
+                if redis_client:
+                    try:
+                        redis_client.setex(key, ttl, body)
+                    except redis.RedisError:
+                        pass
+                else:
+                    if len(_statistics_responses) >= STATISTICS_CACHE_MAX:
+                        _statistics_responses.clear()
+                    _statistics_responses[key] = (time.monotonic() + ttl, body)
+            return response
+        return wrapper
+    return decorator
+
+cached_statistics = cached_statistics_for(STATISTICS_CACHE_TTL)
+
+@event.listens_for(Session, 'after_flush')
+def _mark_statistics_stale(session, flush_context):
+    """Remember that this transaction wrote rows the statistics aggregate."""
+    changed = chain(session.new, session.deleted, (
+        instance for instance in session.dirty
+        # Every login writes to users; only other user changes count
+        if not isinstance(instance, User) or any(
+            attr.history.has_changes() for attr in inspect(instance).attrs
+            if attr.key not in STATISTICS_IGNORED_USER_FIELDS
+        )
+    ))
+    if any(isinstance(instance, STATISTICS_SOURCE_MODELS) for instance in changed):
+        session.info['statistics_stale'] = True
+
+@event.listens_for(Session, 'after_commit')
+def _invalidate_statistics_on_commit(session):
+    """Start a new cache generation once those writes are committed."""
+    if session.info.pop('statistics_stale', False):
+        invalidate_statistics_cache()
+
+@event.listens_for(Session, 'after_rollback')
+def _forget_statistics_writes(session):
+    """Rolled back writes leave the cached statistics valid."""
+    session.info.pop('statistics_stale', None)
+
+def invalidate_statistics_cache():
+    """Move cached statistics responses to a new generation."""
+    global _statistics_generation
+    _statistics_generation += 1
+    _statistics_responses.clear()
+    if not has_app_context():
+        return
+    redis_client = get_redis()
+    if redis_client:
+        try:
+            redis_client.incr(STATISTICS_GENERATION_KEY)
+        except redis.RedisError:
+            pass
+
 @statistics_bp.route('/health', methods=['GET'])
 def health_check():
     """Health check endpoint."""
@@ -28,6 +176,7 @@ def health_check():
 @statistics_bp.route('/overview', methods=['GET'])
 @jwt_required()
 @admin_required
+@cached_statistics
 def system_overview():
     """Get comprehensive system overview statistics."""
     try:
@@ -36,38 +185,82 @@ def system_overview():
         end_date = datetime.utcnow()
         start_date = end_date - timedelta(days=period_days)
         
-        # Basic counts
-        total_students = Student.query.filter_by(status=StudentStatus.ACTIVE).count()
-        total_teachers = User.query.filter(User.role.in_([UserRole.TEACHER, UserRole.COORDINATOR])).count()
-        total_rooms = Room.query.filter_by(is_active=True).count()
-        total_lectures = Lecture.query.filter_by(is_active=True).count()
-        
-        # Active lectures (today)
-        today = date.today()
-        today_lectures = Lecture.query.filter(
-            func.date(Lecture.start_time) == today,
-            Lecture.is_active == True
-        ).count()
-        
-        # Current active lecture (right now)
+        today_start, today_end = day_range(date.today())
         now = datetime.utcnow()
-        active_now = Lecture.query.filter(
-            Lecture.start_time <= now,
-            Lecture.end_time >= now,
-            Lecture.is_active == True
-        ).count()
-        
-        # Attendance statistics for the period
-        period_attendance = db.session.query(
-            func.count(AttendanceRecord.id).label('total_records'),
-            func.sum(db.case([(AttendanceRecord.is_present == True, 1)], else_=0)).label('present_count'),
-            func.count(distinct(AttendanceRecord.student_id)).label('unique_students'),
-            func.count(distinct(AttendanceRecord.lecture_id)).label('unique_lectures')
-        ).join(Lecture).filter(
-            Lecture.start_time >= start_date,
-            Lecture.start_time <= end_date
-        ).first()
+        yesterday = now - timedelta(hours=24)
+        
+        # Basic counts, one round trip
+        def basic_counts():
+            return db.session.query(
+                Student.query.filter_by(status=StudentStatus.ACTIVE).with_entities(func.count(Student.id)).scalar_subquery(),
+                User.query.filter(User.role.in_([UserRole.TEACHER, UserRole.COORDINATOR])).with_entities(func.count(User.id)).scalar_subquery(),
+                Room.query.filter_by(is_active=True).with_entities(func.count(Room.id)).scalar_subquery(),
+                Lecture.query.filter_by(is_active=True).with_entities(func.count(Lecture.id)).scalar_subquery(),
+                # Current active lecture (right now)
+                Lecture.query.filter(
+                    Lecture.start_time <= now,
+                    Lecture.end_time >= now,
+                    Lecture.is_active == True
+                ).with_entities(func.count(Lecture.id)).scalar_subquery()
+            ).one()
+        
+        # Attendance statistics for the period and today's lecture count,
+        # sharing one scan of the lectures in either window
+        def period_totals():
+            window_lectures = db.session.query(
+                Lecture.id, Lecture.start_time, Lecture.is_active
+            ).filter(or_(
+                Lecture.start_time.between(start_date, end_date),
+                and_(Lecture.start_time >= today_start, Lecture.start_time < today_end)
+            )).cte('window_lectures')
+            
+            # Active lectures (today)
+            today_count = db.session.query(func.count()).select_from(window_lectures).filter(
+                window_lectures.c.start_time >= today_start,
+                window_lectures.c.start_time < today_end,
+                window_lectures.c.is_active == True
+            ).scalar_subquery()
+            
+            period = db.session.query(
+                func.count(AttendanceRecord.id).label('total_records'),
+                count_present().label('present_count'),
+                func.count(distinct(AttendanceRecord.student_id)).label('unique_students'),
+                func.count(distinct(AttendanceRecord.lecture_id)).label('unique_lectures')
+            ).join(
+                window_lectures, AttendanceRecord.lecture_id == window_lectures.c.id
+            ).filter(
+                window_lectures.c.start_time.between(start_date, end_date)
+            ).subquery()
+            
+            return db.session.query(
+                today_count.label('today_lectures'), period
+            ).select_from(period).one()
+        
+        # Trends (daily attendance for the last 7 days), one grouped query
+        def trend_totals():
+            return daily_attendance_series(end_date.date() - timedelta(days=6), end_date.date())
+        
+        # Recent activity (last 24 hours), one round trip
+        def recent_counts():
+            return db.session.query(
+                AttendanceRecord.query.filter(
+                    AttendanceRecord.created_at >= yesterday
+                ).with_entities(func.count(AttendanceRecord.id)).scalar_subquery(),
+                Lecture.query.filter(
+                    Lecture.created_at >= yesterday
+                ).with_entities(func.count(Lecture.id)).scalar_subquery(),
+                Student.query.filter(
+                    Student.created_at >= yesterday
+                ).with_entities(func.count(Student.id)).scalar_subquery()
+            ).one()
+        
+        # The blocks are independent, so they run side by side
+        counts, period_attendance, trend_rows, performance_metrics, recent = run_concurrently(
+            basic_counts, period_totals, trend_totals, calculate_system_performance_metrics, recent_counts
+        )
+        total_students, total_teachers, total_rooms, total_lectures, active_now = counts
         
+        today_lectures = period_attendance.today_lectures
         total_records = period_attendance.total_records or 0
         present_count = period_attendance.present_count or 0
         unique_students = period_attendance.unique_students or 0
@@ -75,45 +268,19 @@ def system_overview():
         
         overall_attendance_rate = (present_count / total_records * 100) if total_records > 0 else 0
         
-        # Trends (daily attendance for the last 7 days)
-        daily_trends = []
-        for i in range(6, -1, -1):  # Last 7 days
-            day = (datetime.utcnow() - timedelta(days=i)).date()
-            
-            day_stats = db.session.query(
-                func.count(AttendanceRecord.id).label('total'),
-                func.sum(db.case([(AttendanceRecord.is_present == True, 1)], else_=0)).label('present')
-            ).join(Lecture).filter(
-                func.date(Lecture.start_time) == day
-            ).first()
-            
-            day_total = day_stats.total or 0
-            day_present = day_stats.present or 0
-            day_rate = (day_present / day_total * 100) if day_total > 0 else 0
-            
-            daily_trends.append({
-                'date': day.isoformat(),
-                'day_name': day.strftime('%A'),
-                'total_students': day_total,
-                'present_students': day_present,
-                'attendance_rate': round(day_rate, 2)
-            })
+        daily_trends = [{
+            'date': day.isoformat(),
+            'day_name': day.strftime('%A'),
+            'total_students': day_total,
+            'present_students': day_present,
+            'attendance_rate': round(day_present / day_total * 100, 2) if day_total > 0 else 0
+        } for day, day_total, day_present in trend_rows]
         
-        # System performance metrics
-        performance_metrics = calculate_system_performance_metrics()
-        
-        # Recent activity (last 24 hours)
-        yesterday = datetime.utcnow() - timedelta(hours=24)
+        new_attendance_records, new_lectures, new_students = recent
         recent_activity = {
-            'new_attendance_records': AttendanceRecord.query.filter(
-                AttendanceRecord.created_at >= yesterday
-            ).count(),
-            'new_lectures': Lecture.query.filter(
-                Lecture.created_at >= yesterday
-            ).count(),
-            'new_students': Student.query.filter(
-                Student.created_at >= yesterday
-            ).count()
+            'new_attendance_records': new_attendance_records,
+            'new_lectures': new_lectures,
+            'new_students': new_students
         }
         
         return success_response(
@@ -176,155 +343,78 @@ def attendance_statistics():
         
         # Apply user role restrictions
         current_user_id = get_jwt_identity()
-        current_user = User.query.get(current_user_id)
-        
-        # Base query
-        base_query = db.session.query(AttendanceRecord).join(Lecture).filter(
-            Lecture.start_time >= start_date,
-            Lecture.start_time <= end_date
-        )
-        
-        # Apply filters
-        if current_user.role == UserRole.TEACHER:
-            base_query = base_query.filter(Lecture.teacher_id == current_user_id)
-        elif teacher_id:
-            base_query = base_query.filter(Lecture.teacher_id == teacher_id)
-        
-        if section:
-            base_query = base_query.join(Student, AttendanceRecord.student_id == Student.user_id)
-            base_query = base_query.filter(Student.section == Section[section.upper()])
-        
-        if study_year:
-            if not section:  # Join Student if not already joined
-                base_query = base_query.join(Student, AttendanceRecord.student_id == Student.user_id)
-            base_query = base_query.filter(Student.study_year == study_year)
+        current_user = load_current_user()  # already loaded by teacher_required
+        
+        # Filter values are bound into statements cached per filter shape
+        filter_teacher_id = current_user_id if current_user.role == UserRole.TEACHER else teacher_id
+        section_enum = SECTIONS_BY_NAME.get(section.upper()) if section else None
+        if section and section_enum is None:
+            return error_response(f"Invalid section: {section}", 400)
+        statements = attendance_statements(bool(filter_teacher_id), bool(section), bool(study_year))
+        params = {
+            'start_date': start_date,
+            'end_date': end_date,
+            'teacher_id': filter_teacher_id,
+            'section': section_enum,
+            'study_year': study_year
+        }
         
         # Overall statistics
-        total_records = base_query.count()
-        present_records = base_query.filter(AttendanceRecord.is_present == True).count()
+        overall = db.session.execute(statements['overall'], params).one()
+        total_records = overall[0]
+        present_records = overall[1] or 0
         absent_records = total_records - present_records
-        exceptional_records = base_query.filter(AttendanceRecord.is_exceptional == True).count()
+        exceptional_records = overall[2] or 0
         
         overall_rate = (present_records / total_records * 100) if total_records > 0 else 0
         
         # By verification method
-        verification_methods = db.session.query(
-            AttendanceRecord.verification_method,
-            func.count(AttendanceRecord.id).label('count'),
-            func.sum(db.case([(AttendanceRecord.is_present == True, 1)], else_=0)).label('present_count')
-        ).filter(
-            AttendanceRecord.id.in_([r.id for r in base_query.all()])
-        ).group_by(AttendanceRecord.verification_method).all()
-        
-        verification_stats = []
-        for method, count, present_count in verification_methods:
-            verification_stats.append({
-                'method': method or 'unknown',
-                'total_count': count,
-                'present_count': present_count or 0,
-                'success_rate': round((present_count or 0) / count * 100, 2) if count > 0 else 0
-            })
+        verification_methods = db.session.execute(statements['verification'], params).all()
+        
+        verification_stats = [{
+            'method': method or 'unknown',
+            'total_count': count,
+            'present_count': present_count or 0,
+            'success_rate': round((present_count or 0) / count * 100, 2) if count > 0 else 0
+        } for method, count, present_count in verification_methods]
         
         # By section (if not already filtered)
         if not section:
-            section_stats = db.session.query(
-                Student.section,
-                func.count(AttendanceRecord.id).label('total'),
-                func.sum(db.case([(AttendanceRecord.is_present == True, 1)], else_=0)).label('present')
-            ).select_from(AttendanceRecord).join(
-                Student, AttendanceRecord.student_id == Student.user_id
-            ).join(
-                Lecture, AttendanceRecord.lecture_id == Lecture.id
-            ).filter(
-                Lecture.start_time >= start_date,
-                Lecture.start_time <= end_date
-            )
-            
-            if current_user.role == UserRole.TEACHER:
-                section_stats = section_stats.filter(Lecture.teacher_id == current_user_id)
-            elif teacher_id:
-                section_stats = section_stats.filter(Lecture.teacher_id == teacher_id)
+            section_stats = db.session.execute(statements['section'], params).all()
             
-            section_stats = section_stats.group_by(Student.section).all()
-            
-            section_breakdown = []
-            for section_enum, total, present in section_stats:
-                section_breakdown.append({
-                    'section': section_enum.value if section_enum else 'Unknown',
-                    'total_records': total,
-                    'present_count': present or 0,
-                    'attendance_rate': round((present or 0) / total * 100, 2) if total > 0 else 0
-                })
-        else:
-            section_breakdown = []
-        
-        # Daily breakdown for the period
-        daily_breakdown = db.session.query(
-            func.date(Lecture.start_time).label('date'),
-            func.count(AttendanceRecord.id).label('total'),
-            func.sum(db.case([(AttendanceRecord.is_present == True, 1)], else_=0)).label('present')
-        ).select_from(AttendanceRecord).join(
-            Lecture, AttendanceRecord.lecture_id == Lecture.id
-        ).filter(
-            Lecture.start_time >= start_date,
-            Lecture.start_time <= end_date
-        )
-        
-        if current_user.role == UserRole.TEACHER:
-            daily_breakdown = daily_breakdown.filter(Lecture.teacher_id == current_user_id)
-        elif teacher_id:
-            daily_breakdown = daily_breakdown.filter(Lecture.teacher_id == teacher_id)
-        
-        if section:
-            daily_breakdown = daily_breakdown.join(Student, AttendanceRecord.student_id == Student.user_id)
-            daily_breakdown = daily_breakdown.filter(Student.section == Section[section.upper()])
-        
-        daily_breakdown = daily_breakdown.group_by(func.date(Lecture.start_time)).order_by(func.date(Lecture.start_time)).all()
-        
-        daily_stats = []
-        for date_obj, total, present in daily_breakdown:
-            daily_stats.append({
-                'date': date_obj.isoformat(),
-                'day_name': date_obj.strftime('%A'),
+            section_breakdown = [{
+                'section': SECTION_VALUES.get(row_section, 'Unknown'),
                 'total_records': total,
                 'present_count': present or 0,
                 'attendance_rate': round((present or 0) / total * 100, 2) if total > 0 else 0
-            })
+            } for row_section, total, present in section_stats]
+        else:
+            section_breakdown = []
         
-        # Top performing days
-        day_performance = db.session.query(
-            func.extract('dow', Lecture.start_time).label('day_of_week'),
-            func.count(AttendanceRecord.id).label('total'),
-            func.sum(db.case([(AttendanceRecord.is_present == True, 1)], else_=0)).label('present')
-        ).select_from(AttendanceRecord).join(
-            Lecture, AttendanceRecord.lecture_id == Lecture.id
-        ).filter(
-            Lecture.start_time >= start_date,
-            Lecture.start_time <= end_date
-        )
+        # Daily breakdown for the period
+        daily_totals = daily_attendance_totals(start_date, end_date, teacher_id=filter_teacher_id, section=section_enum)
         
-        if current_user.role == UserRole.TEACHER:
-            day_performance = day_performance.filter(Lecture.teacher_id == current_user_id)
-        elif teacher_id:
-            day_performance = day_performance.filter(Lecture.teacher_id == teacher_id)
+        daily_stats = [{
+            'date': day,
+            'day_name': date.fromisoformat(day).strftime('%A'),
+            'total_records': total,
+            'present_count': present or 0,
+            'attendance_rate': round((present or 0) / total * 100, 2) if total > 0 else 0
+        } for day, (total, present) in sorted(daily_totals.items())]
         
-        day_performance = day_performance.group_by(func.extract('dow', Lecture.start_time)).all()
+        # Top performing days, best attendance rate first
+        day_performance = db.session.execute(statements['day_of_week'], params).all()
         
         # Map day numbers to names
         day_names = {0: 'Sunday', 1: 'Monday', 2: 'Tuesday', 3: 'Wednesday', 
                     4: 'Thursday', 5: 'Friday', 6: 'Saturday'}
         
-        day_stats = []
-        for day_num, total, present in day_performance:
-            day_stats.append({
-                'day_name': day_names.get(int(day_num), 'Unknown'),
-                'total_records': total,
-                'present_count': present or 0,
-                'attendance_rate': round((present or 0) / total * 100, 2) if total > 0 else 0
-            })
-        
-        # Sort by attendance rate
-        day_stats.sort(key=lambda x: x['attendance_rate'], reverse=True)
+        day_stats = [{
+            'day_name': day_names.get(int(day_num), 'Unknown'),
+            'total_records': total,
+            'present_count': present or 0,
+            'attendance_rate': round((present or 0) / total * 100, 2) if total > 0 else 0
+        } for day_num, total, present in day_performance]
         
         return success_response(
             data={
@@ -357,12 +447,24 @@ def attendance_statistics():
 @statistics_bp.route('/students', methods=['GET'])
 @jwt_required()
 @admin_required
+@cached_statistics
 def students_statistics():
     """Get comprehensive student statistics."""
     try:
-        # Basic student counts
-        total_students = Student.query.count()
-        active_students = Student.query.filter_by(status=StudentStatus.ACTIVE).count()
+        # Basic student counts, one pass over students
+        thirty_days_ago = datetime.utcnow() - timedelta(days=30)
+        is_active = Student.status == StudentStatus.ACTIVE
+        counts = db.session.query(
+            func.count(Student.id),
+            func.count().filter(is_active),
+            func.count().filter(and_(is_active, Student.is_repeater == True)),
+            func.count().filter(and_(is_active, Student.face_registered == True)),
+            func.count().filter(Student.created_at >= thirty_days_ago)
+        ).one()
+        total_students = counts[0]
+        active_students, repeaters_count, face_registered, recent_enrollments = (
+            count or 0 for count in counts[1:]
+        )
         inactive_students = total_students - active_students
         
         # By section
@@ -371,13 +473,10 @@ def students_statistics():
             func.count(Student.id).label('count')
         ).filter_by(status=StudentStatus.ACTIVE).group_by(Student.section).all()
         
-        section_breakdown = []
-        for section, count in section_stats:
-            if section:
-                section_breakdown.append({
-                    'section': section.value,
-                    'student_count': count
-                })
+        section_breakdown = [{
+            'section': SECTION_VALUES[section],
+            'student_count': count
+        } for section, count in section_stats if section]
         
         # By study year
         year_stats = db.session.query(
@@ -385,12 +484,10 @@ def students_statistics():
             func.count(Student.id).label('count')
         ).filter_by(status=StudentStatus.ACTIVE).group_by(Student.study_year).all()
         
-        year_breakdown = []
-        for year, count in year_stats:
-            year_breakdown.append({
-                'study_year': year,
-                'student_count': count
-            })
+        year_breakdown = [{
+            'study_year': year,
+            'student_count': count
+        } for year, count in year_stats]
         
         # By study type
         type_stats = db.session.query(
@@ -398,107 +495,20 @@ def students_statistics():
             func.count(Student.id).label('count')
         ).filter_by(status=StudentStatus.ACTIVE).group_by(Student.study_type).all()
         
-        type_breakdown = []
-        for study_type, count in type_stats:
-            if study_type:
-                type_breakdown.append({
-                    'study_type': study_type.value,
-                    'student_count': count
-                })
+        type_breakdown = [{
+            'study_type': STUDY_TYPE_VALUES[study_type],
+            'student_count': count
+        } for study_type, count in type_stats if study_type]
         
         # Repeaters statistics
-        repeaters_count = Student.query.filter_by(
-            status=StudentStatus.ACTIVE,
-            is_repeater=True
-        ).count()
-        
         repeaters_rate = (repeaters_count / active_students * 100) if active_students > 0 else 0
         
         # Face registration statistics
-        face_registered = Student.query.filter_by(
-            status=StudentStatus.ACTIVE,
-            face_registered=True
-        ).count()
-        
         face_registration_rate = (face_registered / active_students * 100) if active_students > 0 else 0
         
-        # Recent enrollments (last 30 days)
-        thirty_days_ago = datetime.utcnow() - timedelta(days=30)
-        recent_enrollments = Student.query.filter(
-            Student.created_at >= thirty_days_ago
-        ).count()
-        
-        # Top performing students (by attendance rate)
-        top_students = db.session.query(
-            Student.university_id,
-            Student.full_name,
-            Student.section,
-            Student.study_year,
-            func.count(AttendanceRecord.id).label('total_lectures'),
-            func.sum(db.case([(AttendanceRecord.is_present == True, 1)], else_=0)).label('present_count'),
-            (func.sum(db.case([(AttendanceRecord.is_present == True, 1)], else_=0)) * 100.0 / 
-             func.count(AttendanceRecord.id)).label('attendance_rate')
-        ).join(
-            AttendanceRecord, Student.user_id == AttendanceRecord.student_id
-        ).filter(
-            Student.status == StudentStatus.ACTIVE
-        ).group_by(
-            Student.id, Student.university_id, Student.full_name, Student.section, Student.study_year
-        ).having(
-            func.count(AttendanceRecord.id) >= 5  # At least 5 lectures
-        ).order_by(
-            text('attendance_rate DESC')
-        ).limit(10).all()
-        
-        top_performers = []
-        for student in top_students:
-            top_performers.append({
-                'university_id': student.university_id,
-                'full_name': student.full_name,
-                'section': student.section.value if student.section else None,
-                'study_year': student.study_year,
-                'total_lectures': student.total_lectures,
-                'present_count': student.present_count,
-                'attendance_rate': round(float(student.attendance_rate), 2)
-            })
-        
-        # Students needing attention (low attendance)
-        low_attendance_students = db.session.query(
-            Student.university_id,
-            Student.full_name,
-            Student.section,
-            Student.study_year,
-            func.count(AttendanceRecord.id).label('total_lectures'),
-            func.sum(db.case([(AttendanceRecord.is_present == True, 1)], else_=0)).label('present_count'),
-            (func.sum(db.case([(AttendanceRecord.is_present == True, 1)], else_=0)) * 100.0 / 
-             func.count(AttendanceRecord.id)).label('attendance_rate')
-        ).join(
-            AttendanceRecord, Student.user_id == AttendanceRecord.student_id
-        ).filter(
-            Student.status == StudentStatus.ACTIVE
-        ).group_by(
-            Student.id, Student.university_id, Student.full_name, Student.section, Student.study_year
-        ).having(
-            and_(
-                func.count(AttendanceRecord.id) >= 5,  # At least 5 lectures
-                (func.sum(db.case([(AttendanceRecord.is_present == True, 1)], else_=0)) * 100.0 / 
-                 func.count(AttendanceRecord.id)) < 70  # Less than 70% attendance
-            )
-        ).order_by(
-            text('attendance_rate ASC')
-        ).limit(10).all()
-        
-        attention_needed = []
-        for student in low_attendance_students:
-            attention_needed.append({
-                'university_id': student.university_id,
-                'full_name': student.full_name,
-                'section': student.section.value if student.section else None,
-                'study_year': student.study_year,
-                'total_lectures': student.total_lectures,
-                'present_count': student.present_count,
-                'attendance_rate': round(float(student.attendance_rate), 2)
-            })
+        # Top performing students and students needing attention (low attendance)
+        top_performers = ranked_students(descending=True)
+        attention_needed = ranked_students(descending=False, below_rate=LOW_ATTENDANCE_RATE)
         
         return success_response(
             data={
@@ -533,15 +543,16 @@ def students_statistics():
 @statistics_bp.route('/teachers', methods=['GET'])
 @jwt_required()
 @admin_required
+@cached_statistics
 def teachers_statistics():
     """Get comprehensive teacher statistics."""
     try:
         # Basic teacher counts
-        total_teachers = User.query.filter(User.role.in_([UserRole.TEACHER, UserRole.COORDINATOR])).count()
-        active_teachers = User.query.filter(
-            User.role.in_([UserRole.TEACHER, UserRole.COORDINATOR]),
-            User.is_active == True
-        ).count()
+        total_teachers, active_teachers = db.session.query(
+            func.count(User.id),
+            func.count().filter(User.is_active == True)
+        ).filter(User.role.in_([UserRole.TEACHER, UserRole.COORDINATOR])).one()
+        active_teachers = active_teachers or 0
         
         # Teachers by role
         role_stats = db.session.query(
@@ -552,43 +563,46 @@ def teachers_statistics():
             User.is_active == True
         ).group_by(User.role).all()
         
-        role_breakdown = []
-        for role, count in role_stats:
-            role_breakdown.append({
-                'role': role.value,
-                'teacher_count': count
-            })
+        role_breakdown = [{
+            'role': ROLE_VALUES[role],
+            'teacher_count': count
+        } for role, count in role_stats]
         
-        # Teaching load statistics
+        # Teaching load statistics, busiest ten teachers; the window total
+        # covers every teacher for the average. Lectures and schedules are
+        # counted separately, joining both at once multiplies the rows
+        teacher_lectures = func.count(Lecture.id)
         teaching_stats = db.session.query(
             User.id,
             User.name,
-            func.count(distinct(Lecture.id)).label('total_lectures'),
-            func.count(distinct(Schedule.id)).label('scheduled_subjects'),
-            func.count(distinct(func.date(Lecture.start_time))).label('teaching_days')
+            teacher_lectures.label('total_lectures'),
+            func.count(distinct(func.date(Lecture.start_time))).label('teaching_days'),
+            func.sum(teacher_lectures).over().label('all_lectures')
         ).outerjoin(
             Lecture, and_(Lecture.teacher_id == User.id, Lecture.is_active == True)
-        ).outerjoin(
-            Schedule, and_(Schedule.teacher_id == User.id, Schedule.is_active == True)
         ).filter(
             User.role.in_([UserRole.TEACHER, UserRole.COORDINATOR]),
             User.is_active == True
-        ).group_by(User.id, User.name).all()
-        
-        teacher_workload = []
-        total_lectures_all = 0
-        for teacher_stat in teaching_stats:
-            total_lectures_all += teacher_stat.total_lectures
-            teacher_workload.append({
-                'teacher_id': teacher_stat.id,
-                'teacher_name': teacher_stat.name,
-                'total_lectures': teacher_stat.total_lectures,
-                'scheduled_subjects': teacher_stat.scheduled_subjects,
-                'teaching_days': teacher_stat.teaching_days
-            })
+        ).group_by(User.id, User.name).order_by(
+            teacher_lectures.desc(), User.id
+        ).limit(10).all()
         
-        # Sort by total lectures
-        teacher_workload.sort(key=lambda x: x['total_lectures'], reverse=True)
+        scheduled_subjects = dict(db.session.query(
+            Schedule.teacher_id,
+            func.count(Schedule.id)
+        ).filter(
+            Schedule.teacher_id.in_([row.id for row in teaching_stats]),
+            Schedule.is_active == True
+        ).group_by(Schedule.teacher_id).all()) if teaching_stats else {}
+        
+        total_lectures_all = int(teaching_stats[0].all_lectures) if teaching_stats else 0
+        teacher_workload = [{
+            'teacher_id': teacher_id,
+            'teacher_name': teacher_name,
+            'total_lectures': total_lectures,
+            'scheduled_subjects': scheduled_subjects.get(teacher_id, 0),
+            'teaching_days': teaching_days
+        } for teacher_id, teacher_name, total_lectures, teaching_days, _ in teaching_stats]
         
         # Average workload
         avg_lectures_per_teacher = total_lectures_all / active_teachers if active_teachers > 0 else 0
@@ -598,8 +612,8 @@ def teachers_statistics():
             User.id,
             User.name,
             func.count(AttendanceRecord.id).label('total_attendance_records'),
-            func.sum(db.case([(AttendanceRecord.is_present == True, 1)], else_=0)).label('present_records'),
-            (func.sum(db.case([(AttendanceRecord.is_present == True, 1)], else_=0)) * 100.0 / 
+            count_present().label('present_records'),
+            (count_present() * 100.0 / 
              func.count(AttendanceRecord.id)).label('average_attendance_rate')
         ).join(
             Lecture, Lecture.teacher_id == User.id
@@ -617,15 +631,13 @@ def teachers_statistics():
             text('average_attendance_rate DESC')
         ).all()
         
-        performance_data = []
-        for perf in teacher_performance:
-            performance_data.append({
-                'teacher_id': perf.id,
-                'teacher_name': perf.name,
-                'total_records': perf.total_attendance_records,
-                'present_records': perf.present_records,
-                'average_attendance_rate': round(float(perf.average_attendance_rate), 2)
-            })
+        performance_data = [{
+            'teacher_id': teacher_id,
+            'teacher_name': teacher_name,
+            'total_records': total_records,
+            'present_records': present_records,
+            'average_attendance_rate': round(float(average_rate), 2)
+        } for teacher_id, teacher_name, total_records, present_records, average_rate in teacher_performance]
         
         # Recent activity (last 30 days)
         thirty_days_ago = datetime.utcnow() - timedelta(days=30)
@@ -639,12 +651,10 @@ def teachers_statistics():
             Lecture.is_active == True
         ).group_by(User.id, User.name).order_by(func.count(Lecture.id).desc()).limit(5).all()
         
-        most_active_teachers = []
-        for teacher, count in recent_lectures:
-            most_active_teachers.append({
-                'teacher_name': teacher,
-                'lectures_created': count
-            })
+        most_active_teachers = [{
+            'teacher_name': teacher,
+            'lectures_created': count
+        } for teacher, count in recent_lectures]
         
         return success_response(
             data={
@@ -655,7 +665,7 @@ def teachers_statistics():
                 },
                 'role_breakdown': role_breakdown,
                 'workload_analysis': {
-                    'top_teachers_by_workload': teacher_workload[:10],
+                    'top_teachers_by_workload': teacher_workload,
                     'average_workload': {
                         'lectures_per_teacher': round(avg_lectures_per_teacher, 2)
                     }
@@ -676,6 +686,7 @@ def teachers_statistics():
 @statistics_bp.route('/rooms', methods=['GET'])
 @jwt_required()
 @admin_required
+@cached_statistics
 def rooms_statistics():
     """Get comprehensive room utilization statistics."""
     try:
@@ -723,18 +734,23 @@ def rooms_statistics():
         # Room utilization (last 30 days)
         thirty_days_ago = datetime.utcnow() - timedelta(days=30)
         
+        # Hours used, both rankings and the average come from the one query
+        hours_used = func.coalesce(func.sum(Lecture.duration_hours), 0)
+        lectures_count = func.count(Lecture.id)
         utilization_stats = db.session.query(
             Room.id,
             Room.name,
             Room.building,
             Room.capacity,
-            func.count(Lecture.id).label('lectures_count'),
-            func.sum(
-                func.extract('epoch', Lecture.end_time - Lecture.start_time) / 3600
-            ).label('total_hours_used')
+            lectures_count.label('lectures_count'),
+            hours_used.label('total_hours_used'),
+            func.row_number().over(order_by=(hours_used.desc(), lectures_count.desc(), Room.id)).label('most_rank'),
+            func.row_number().over(order_by=(hours_used.asc(), lectures_count.desc(), Room.id)).label('least_rank'),
+            func.avg(hours_used).over().label('average_hours_used')
         ).outerjoin(
+            # Lectures name their room rather than referencing it by id
             Lecture, and_(
-                Lecture.room_id == Room.id,
+                Lecture.room == Room.name,
                 Lecture.start_time >= thirty_days_ago,
                 Lecture.is_active == True
             )
@@ -743,7 +759,7 @@ def rooms_statistics():
         ).group_by(
             Room.id, Room.name, Room.building, Room.capacity
         ).order_by(
-            func.count(Lecture.id).desc()
+            lectures_count.desc()
         ).all()
         
         # Calculate utilization rates
@@ -751,12 +767,17 @@ def rooms_statistics():
         days_in_period = 30
         total_available_hours = available_hours_per_day * days_in_period
         
+        # Most and least utilized rooms, placed by their SQL rank
+        top_count = min(5, len(utilization_stats))
+        most_utilized = [None] * top_count
+        least_utilized = [None] * top_count
+        
         room_utilization = []
         for room_stat in utilization_stats:
             hours_used = float(room_stat.total_hours_used or 0)
             utilization_rate = (hours_used / total_available_hours * 100) if total_available_hours > 0 else 0
             
-            room_utilization.append({
+            room_entry = {
                 'room_id': room_stat.id,
                 'room_name': room_stat.name,
                 'building': room_stat.building,
@@ -764,15 +785,16 @@ def rooms_statistics():
                 'lectures_count': room_stat.lectures_count,
                 'hours_used': round(hours_used, 2),
                 'utilization_rate': round(utilization_rate, 2)
-            })
-        
-        # Most and least utilized rooms
-        most_utilized = sorted(room_utilization, key=lambda x: x['utilization_rate'], reverse=True)[:5]
-        least_utilized = sorted(room_utilization, key=lambda x: x['utilization_rate'])[:5]
+            }
+            room_utilization.append(room_entry)
+            if room_stat.most_rank <= top_count:
+                most_utilized[room_stat.most_rank - 1] = room_entry
+            if room_stat.least_rank <= top_count:
+                least_utilized[room_stat.least_rank - 1] = room_entry
         
         # Average utilization
-        total_utilization = sum([r['utilization_rate'] for r in room_utilization])
-        avg_utilization = total_utilization / len(room_utilization) if room_utilization else 0
+        average_hours = float(utilization_stats[0].average_hours_used or 0) if utilization_stats else 0
+        avg_utilization = (average_hours / total_available_hours * 100) if total_available_hours > 0 else 0
         
         # Peak usage times analysis
         peak_times = db.session.query(
@@ -830,87 +852,106 @@ def rooms_statistics():
 @statistics_bp.route('/system', methods=['GET'])
 @jwt_required()
 @admin_required
+@cached_statistics
 def system_statistics():
     """Get system performance and technical statistics."""
     try:
+        yesterday = datetime.utcnow() - timedelta(hours=24)
+        
+        # Table sizes plus new lectures and users, one round trip
+        (total_users, total_students, total_lectures, total_attendance_records, total_schedules,
+         total_rooms, new_lectures, new_users) = db.session.query(
+            User.query.with_entities(func.count(User.id)).scalar_subquery(),
+            Student.query.with_entities(func.count(Student.id)).scalar_subquery(),
+            Lecture.query.with_entities(func.count(Lecture.id)).scalar_subquery(),
+            AttendanceRecord.query.with_entities(func.count(AttendanceRecord.id)).scalar_subquery(),
+            Schedule.query.with_entities(func.count(Schedule.id)).scalar_subquery(),
+            Room.query.with_entities(func.count(Room.id)).scalar_subquery(),
+            Lecture.query.filter(
+                Lecture.created_at >= yesterday
+            ).with_entities(func.count(Lecture.id)).scalar_subquery(),
+            User.query.filter(
+                User.created_at >= yesterday
+            ).with_entities(func.count(User.id)).scalar_subquery()
+        ).one()
+        
+        # Every attendance figure below, one pass over attendance_records
+        (new_attendance_records, records_with_location, total_exceptional, approved_exceptional,
+         qr_verified_records, failed_verifications, pending_approvals) = db.session.query(
+            func.count().filter(AttendanceRecord.created_at >= yesterday),
+            func.count().filter(and_(
+                AttendanceRecord.latitude.isnot(None),
+                AttendanceRecord.longitude.isnot(None)
+            )),
+            func.count().filter(AttendanceRecord.is_exceptional == True),
+            func.count().filter(and_(
+                AttendanceRecord.is_exceptional == True,
+                AttendanceRecord.approved_by.isnot(None)
+            )),
+            func.count().filter(AttendanceRecord.verification_method == 'qr'),
+            func.count().filter(and_(
+                AttendanceRecord.is_present == False,
+                AttendanceRecord.is_exceptional == False
+            )),
+            func.count().filter(and_(
+                AttendanceRecord.is_exceptional == True,
+                AttendanceRecord.approved_by.is_(None)
+            ))
+        ).select_from(AttendanceRecord).one()
+        
         # Database statistics
         db_stats = {
-            'total_users': User.query.count(),
-            'total_students': Student.query.count(),
-            'total_lectures': Lecture.query.count(),
-            'total_attendance_records': AttendanceRecord.query.count(),
-            'total_schedules': Schedule.query.count(),
-            'total_rooms': Room.query.count()
+            'total_users': total_users,
+            'total_students': total_students,
+            'total_lectures': total_lectures,
+            'total_attendance_records': total_attendance_records,
+            'total_schedules': total_schedules,
+            'total_rooms': total_rooms
         }
         
         # Recent activity (last 24 hours)
-        yesterday = datetime.utcnow() - timedelta(hours=24)
         recent_activity = {
-            'new_attendance_records': AttendanceRecord.query.filter(
-                AttendanceRecord.created_at >= yesterday
-            ).count(),
-            'new_lectures': Lecture.query.filter(
-                Lecture.created_at >= yesterday
-            ).count(),
-            'new_users': User.query.filter(
-                User.created_at >= yesterday
-            ).count()
+            'new_attendance_records': new_attendance_records,
+            'new_lectures': new_lectures,
+            'new_users': new_users
         }
         
         # System health metrics
         health_metrics = calculate_system_performance_metrics()
         
         # Feature usage statistics
+        face_registered, active_students = db.session.query(
+            func.count().filter(Student.face_registered == True),
+            func.count().filter(Student.status == StudentStatus.ACTIVE)
+        ).select_from(Student).one()
         feature_usage = {
             'face_recognition': {
-                'students_registered': Student.query.filter_by(face_registered=True).count(),
-                'usage_rate': round(
-                    Student.query.filter_by(face_registered=True).count() / 
-                    Student.query.filter_by(status=StudentStatus.ACTIVE).count() * 100, 2
-                ) if Student.query.filter_by(status=StudentStatus.ACTIVE).count() > 0 else 0
+                'students_registered': face_registered,
+                'usage_rate': round(face_registered / active_students * 100, 2) if active_students > 0 else 0
             },
             'gps_verification': {
-                'records_with_location': AttendanceRecord.query.filter(
-                    AttendanceRecord.latitude.isnot(None),
-                    AttendanceRecord.longitude.isnot(None)
-                ).count()
+                'records_with_location': records_with_location
             },
             'exceptional_attendance': {
-                'total_exceptional': AttendanceRecord.query.filter_by(is_exceptional=True).count(),
-                'approved_exceptional': AttendanceRecord.query.filter(
-                    AttendanceRecord.is_exceptional == True,
-                    AttendanceRecord.approved_by.isnot(None)
-                ).count()
+                'total_exceptional': total_exceptional,
+                'approved_exceptional': approved_exceptional
             },
             'qr_verification': {
-                'qr_verified_records': AttendanceRecord.query.filter_by(verification_method='qr').count()
+                'qr_verified_records': qr_verified_records
             }
         }
         
-        # Performance trends (last 7 days)
-        performance_trends = []
-        for i in range(6, -1, -1):
-            day = (datetime.utcnow() - timedelta(days=i)).date()
-            
-            day_records = AttendanceRecord.query.join(Lecture).filter(
-                func.date(Lecture.start_time) == day
-            ).count()
-            
-            performance_trends.append({
-                'date': day.isoformat(),
-                'attendance_records': day_records
-            })
+        # Performance trends (last 7 days), one grouped query
+        today = datetime.utcnow().date()
+        performance_trends = [{
+            'date': day.isoformat(),
+            'attendance_records': day_records
+        } for day, day_records, _ in daily_attendance_series(today - timedelta(days=6), today)]
         
         # Error rates and system issues
         error_stats = {
-            'failed_verifications': AttendanceRecord.query.filter(
-                AttendanceRecord.is_present == False,
-                AttendanceRecord.is_exceptional == False
-            ).count(),
-            'pending_approvals': AttendanceRecord.query.filter(
-                AttendanceRecord.is_exceptional == True,
-                AttendanceRecord.approved_by.is_(None)
-            ).count()
+            'failed_verifications': failed_verifications,
+            'pending_approvals': pending_approvals
         }
         
         return success_response(
@@ -933,14 +974,15 @@ def system_statistics():
 @statistics_bp.route('/realtime', methods=['GET'])
 @jwt_required()
 @admin_required
+@cached_statistics_for(REALTIME_STATISTICS_CACHE_TTL)
 def realtime_statistics():
     """Get real-time system statistics."""
     try:
         now = datetime.utcnow()
-        today = now.date()
+        today_start, today_end = day_range(now.date())
         
-        # Current active lectures
-        active_lectures = Lecture.query.filter(
+        # Current active lectures, with their teachers
+        active_lectures = Lecture.query.options(joinedload(Lecture.teacher)).filter(
             Lecture.start_time <= now,
             Lecture.end_time >= now,
             Lecture.is_active == True
@@ -949,31 +991,32 @@ def realtime_statistics():
         # Today's statistics
         today_stats = {
             'scheduled_lectures': Lecture.query.filter(
-                func.date(Lecture.start_time) == today,
+                Lecture.start_time >= today_start,
+                Lecture.start_time < today_end,
                 Lecture.is_active == True
             ).count(),
             'completed_lectures': Lecture.query.filter(
-                func.date(Lecture.start_time) == today,
+                Lecture.start_time >= today_start,
+                Lecture.start_time < today_end,
                 Lecture.end_time < now,
                 Lecture.is_active == True
             ).count(),
             'attendance_records_today': AttendanceRecord.query.join(Lecture).filter(
-                func.date(Lecture.start_time) == today
+                Lecture.start_time >= today_start,
+                Lecture.start_time < today_end
             ).count(),
             'present_today': AttendanceRecord.query.join(Lecture).filter(
-                func.date(Lecture.start_time) == today,
+                Lecture.start_time >= today_start,
+                Lecture.start_time < today_end,
                 AttendanceRecord.is_present == True
             ).count()
         }
         
-        # Active lecture details
+        # Active lecture details, attendance counted for all of them at once
+        attendance_by_lecture = lecture_attendance_counts([lecture.id for lecture in active_lectures])
         active_lecture_details = []
         for lecture in active_lectures:
-            attendance_count = AttendanceRecord.query.filter_by(lecture_id=lecture.id).count()
-            present_count = AttendanceRecord.query.filter_by(
-                lecture_id=lecture.id,
-                is_present=True
-            ).count()
+            attendance_count, present_count = attendance_by_lecture.get(lecture.id, (0, 0))
             
             active_lecture_details.append({
                 'lecture_id': lecture.id,
@@ -989,7 +1032,7 @@ def realtime_statistics():
         
         # Upcoming lectures (next 2 hours)
         next_two_hours = now + timedelta(hours=2)
-        upcoming_lectures = Lecture.query.filter(
+        upcoming_lectures = Lecture.query.options(joinedload(Lecture.teacher)).filter(
             Lecture.start_time > now,
             Lecture.start_time <= next_two_hours,
             Lecture.is_active == True
@@ -1035,25 +1078,319 @@ def realtime_statistics():
 
 # =================== HELPER FUNCTIONS ===================
 
+def count_present():
+    """COUNT(*) FILTER (WHERE is_present) over the attendance rows in scope."""
+    return func.count().filter(AttendanceRecord.is_present == True)
+
+def run_concurrently(*blocks) -> List[Any]:
+    """Call each block in its own app context on the shared workers; results in order.
+
+    SQLite serializes access to its database anyway (and an in-memory
+    database is a single shared connection), so there the blocks run inline.
+    """
+    if db.engine.dialect.name == 'sqlite':
+        return [block() for block in blocks]
+    
+    app = current_app._get_current_object()
+    
+    def run(block):
+        with app.app_context():
+            return block()
+    
+    futures = [_statistics_query_pool.submit(run, block) for block in blocks]
+    return [future.result() for future in futures]
+
+def attendance_statements(by_teacher: bool, by_section: bool, by_year: bool) -> Dict[str, Any]:
+    """The attendance statistics statements for one filter shape, built on first use.
+
+    Bind start_date, end_date and whichever of teacher_id, section and
+    study_year the shape filters on.
+    """
+    shape = (by_teacher, by_section, by_year)
+    statements = _attendance_statements.get(shape)
+    if statements is None:
+        statements = _attendance_statements[shape] = build_attendance_statements(*shape)
+    return statements
+
+def build_attendance_statements(by_teacher: bool, by_section: bool, by_year: bool) -> Dict[str, Any]:
+    """Build the overall, verification, section and day-of-week statements."""
+    lecture_filters = [
+        Lecture.start_time >= bindparam('start_date'),
+        Lecture.start_time <= bindparam('end_date')
+    ]
+    if by_teacher:
+        lecture_filters.append(Lecture.teacher_id == bindparam('teacher_id'))
+    student_filters = []
+    if by_section:
+        student_filters.append(Student.section == bindparam('section'))
+    if by_year:
+        student_filters.append(Student.study_year == bindparam('study_year'))
+    
+    def over_attendance(*columns, join_students=False):
+        statement = select(*columns).select_from(AttendanceRecord).join(
+            Lecture, AttendanceRecord.lecture_id == Lecture.id
+        )
+        if join_students:
+            statement = statement.join(Student, AttendanceRecord.student_id == Student.user_id)
+        return statement.where(*lecture_filters)
+    
+    # Overall and per-method figures honour every filter; the section and
+    # day-of-week breakdowns only the period and teacher
+    def filtered(*columns):
+        return over_attendance(*columns, join_students=bool(student_filters)).where(*student_filters)
+    
+    day_total = func.count(AttendanceRecord.id)
+    day_present = count_present()
+    return {
+        'overall': filtered(
+            func.count(AttendanceRecord.id),
+            count_present(),
+            func.count().filter(AttendanceRecord.is_exceptional == True)
+        ),
+        'verification': filtered(
+            AttendanceRecord.verification_method,
+            func.count(AttendanceRecord.id),
+            count_present()
+        ).group_by(AttendanceRecord.verification_method),
+        'section': over_attendance(
+            Student.section,
+            func.count(AttendanceRecord.id),
+            count_present(),
+            join_students=True
+        ).group_by(Student.section),
+        'day_of_week': over_attendance(
+            Lecture.day_of_week, day_total, day_present
+        ).group_by(Lecture.day_of_week).order_by(
+            (day_present * 1.0 / func.nullif(day_total, 0)).desc().nulls_last(),
+            Lecture.day_of_week
+        )
+    }
+
+def lecture_attendance_counts(lecture_ids: List[int]) -> Dict[int, tuple]:
+    """(total, present) attendance per lecture id, for lectures that have any."""
+    if not lecture_ids:
+        return {}
+    rows = db.session.query(
+        AttendanceRecord.lecture_id,
+        func.count(AttendanceRecord.id),
+        count_present()
+    ).filter(
+        AttendanceRecord.lecture_id.in_(lecture_ids)
+    ).group_by(AttendanceRecord.lecture_id).all()
+    return {lecture_id: (total, present) for lecture_id, total, present in rows}
+
+def daily_attendance_totals(start: datetime, end: datetime, teacher_id: Optional[int] = None,
+                            section: Optional[Section] = None) -> Dict[str, tuple]:
+    """(total, present) attendance per lecture day in [start, end), keyed by ISO date."""
+    rows = daily_attendance_query(start, end, teacher_id, section).all()
+    
+    # PostgreSQL returns dates and SQLite strings; key both by ISO string
+    return {str(day): (int(total or 0), int(present or 0)) for day, total, present in rows}
+
+def daily_attendance_query(start: datetime, end: datetime, teacher_id: Optional[int] = None,
+                           section: Optional[Section] = None):
+    """Query of (day, total, present) per lecture day in [start, end).
+
+    When the mv_attendance_daily rollup exists it serves the whole days
+    before today; the partial days at either end of the range and today
+    are aggregated from the live tables. Past days read from the rollup
+    can trail recent writes by up to STATISTICS_VIEW_REFRESH_SECONDS.
+    """
+    view = statistics_view(ATTENDANCE_DAILY_VIEW)
+    first_day = start.date() if start.time() == datetime.min.time() else start.date() + timedelta(days=1)
+    last_day = min(end.date(), datetime.utcnow().date())  # exclusive
+    if view is None or first_day >= last_day:
+        return live_daily_attendance_query([(start, end)], teacher_id, section)
+    
+    query = db.session.query(
+        view.c.day.label('day'),
+        func.sum(view.c.total).label('total'),
+        func.sum(view.c.present).label('present')
+    ).filter(
+        view.c.day >= first_day,
+        view.c.day < last_day
+    )
+    if teacher_id:
+        query = query.filter(view.c.teacher_id == teacher_id)
+    if section:
+        query = query.filter(view.c.section == section)
+    
+    live = live_daily_attendance_query([
+        (start, day_range(first_day)[0]),
+        (day_range(last_day)[0], end)
+    ], teacher_id, section)
+    return query.group_by(view.c.day).union_all(live)
+
+def live_daily_attendance_query(ranges: List[tuple], teacher_id: Optional[int] = None,
+                                section: Optional[Section] = None):
+    """Query of (day, total, present) per lecture day, aggregated from the
+    live tables for lectures starting in any of the [start, end) ranges."""
+    lecture_day = func.date(Lecture.start_time)
+    query = db.session.query(
+        lecture_day.label('day'),
+        func.count(AttendanceRecord.id).label('total'),
+        count_present().label('present')
+    ).select_from(AttendanceRecord).join(
+        Lecture, AttendanceRecord.lecture_id == Lecture.id
+    ).filter(or_(*(
+        and_(Lecture.start_time >= start, Lecture.start_time < end)
+        for start, end in ranges
+    )))
+    if teacher_id:
+        query = query.filter(Lecture.teacher_id == teacher_id)
+    if section:
+        query = query.join(Student, AttendanceRecord.student_id == Student.user_id)
+        query = query.filter(Student.section == section)
+    return query.group_by(lecture_day)
+
+def daily_attendance_series(first_day: date, last_day: date) -> List[tuple]:
+    """(day, total, present) for every day from first_day to last_day, zero-filled.
+
+    PostgreSQL fills the empty days itself by joining the totals onto
+    generate_series; elsewhere they are filled in here.
+    """
+    start, end = day_range(first_day)[0], day_range(last_day)[1]
+    
+    if db.engine.dialect.name == 'postgresql':
+        totals = daily_attendance_query(start, end).subquery()
+        series = func.generate_series(first_day, last_day, text("interval '1 day'")).table_valued('day')
+        series_day = db.cast(series.c.day, db.Date)
+        rows = db.session.query(
+            series_day,
+            func.coalesce(totals.c.total, 0),
+            func.coalesce(totals.c.present, 0)
+        ).select_from(series).outerjoin(
+            totals, totals.c.day == series_day
+        ).order_by(series_day).all()
+        return [(day, int(total), int(present)) for day, total, present in rows]
+    
+    totals = daily_attendance_totals(start, end)
+    days = [first_day + timedelta(days=i) for i in range((last_day - first_day).days + 1)]
+    return [(day, *totals.get(day.isoformat(), (0, 0))) for day in days]
+
+def day_range(day: date) -> tuple:
+    """Half-open [start, end) datetimes covering day.
+
+    Filtering start_time on this range, rather than comparing date(start_time),
+    lets the database use the start_time indexes.
+    """
+    start = datetime.combine(day, datetime.min.time())
+    return start, start + timedelta(days=1)
+
+def ranked_students(descending: bool, below_rate: Optional[float] = None, limit: int = 10) -> List[Dict]:
+    """Active students with at least MIN_RANKED_LECTURES records, ranked by attendance rate.
+
+    Reads the mv_student_attendance rollup when it exists, otherwise
+    aggregates the live tables.
+    """
+    view = statistics_view(STUDENT_ATTENDANCE_VIEW)
+    if view is not None:
+        rate = view.c.attendance_rate
+        query = db.session.query(
+            view.c.university_id, view.c.full_name, view.c.section, view.c.study_year,
+            view.c.total_lectures, view.c.present_count, rate
+        ).filter(view.c.total_lectures >= MIN_RANKED_LECTURES)
+        if below_rate is not None:
+            query = query.filter(rate < below_rate)
+    else:
+        total = func.count(AttendanceRecord.id)
+        present = count_present()
+        rate = present * 100.0 / total
+        query = db.session.query(
+            Student.university_id, Student.full_name, Student.section, Student.study_year,
+            total, present, rate
+        ).join(
+            AttendanceRecord, Student.user_id == AttendanceRecord.student_id
+        ).filter(
+            Student.status == StudentStatus.ACTIVE
+        ).group_by(
+            Student.id, Student.university_id, Student.full_name, Student.section, Student.study_year
+        ).having(total >= MIN_RANKED_LECTURES)
+        if below_rate is not None:
+            query = query.having(rate < below_rate)
+    
+    rows = query.order_by(rate.desc() if descending else rate.asc()).limit(limit).all()
+    return [{
+        'university_id': university_id,
+        'full_name': full_name,
+        'section': SECTION_VALUES.get(section),
+        'study_year': study_year,
+        'total_lectures': total_lectures,
+        'present_count': present_count,
+        'attendance_rate': round(float(attendance_rate), 2)
+    } for university_id, full_name, section, study_year, total_lectures, present_count, attendance_rate in rows]
+
+def statistics_view(view):
+    """view if this database has it, else None.
+
+    Kicks off a background refresh when the views are older than
+    STATISTICS_VIEW_REFRESH_SECONDS.
+    """
+    global _views_available
+    if _views_available is None:
+        names = set()
+        if db.engine.dialect.name == 'postgresql':
+            names = set(inspect(db.engine).get_materialized_view_names())
+        _views_available = frozenset(names.intersection(STATISTICS_VIEWS))
+    if view.name not in _views_available:
+        return None
+    refresh_statistics_views()
+    return view
+
+def refresh_statistics_views():
+    """Refresh the statistics views in a background thread once they go stale."""
+    global _views_refreshed_at
+    if time.monotonic() - _views_refreshed_at < STATISTICS_VIEW_REFRESH_SECONDS:
+        return
+    if not _views_refresh_lock.acquire(blocking=False):
+        return  # a refresh is already running
+    _views_refreshed_at = time.monotonic()
+    app = current_app._get_current_object()
+    threading.Thread(target=_refresh_views, args=(app,), name='statistics-view-refresh', daemon=True).start()
+
+def _refresh_views(app):
+    """REFRESH every statistics view without blocking readers."""
+    try:
+        with app.app_context():
+            with db.engine.begin() as connection:
+                for view in _views_available:
+                    connection.execute(text(f'REFRESH MATERIALIZED VIEW CONCURRENTLY {view}'))
+    except Exception:
+        app.logger.exception('Refreshing statistics views failed')
+    finally:
+        _views_refresh_lock.release()
+
 def calculate_system_performance_metrics() -> Dict:
     """Calculate system performance metrics."""
     try:
         # Response time simulation (in production, track actual response times)
         avg_response_time = 250  # milliseconds
         
-        # Database query performance
-        total_records = AttendanceRecord.query.count()
+        # Database size: attendance_records is the largest table, so use the
+        # planner's estimate where there is one rather than counting it
+        total_records = estimated_row_count(AttendanceRecord)
+        records_estimated = total_records is not None
+        
+        # Feature adoption (and the exact size otherwise), one round trip
+        columns = [
+            func.count().filter(Student.face_registered == True),
+            func.count().filter(Student.status == StudentStatus.ACTIVE)
+        ]
+        if not records_estimated:
+            columns.append(AttendanceRecord.query.with_entities(func.count(AttendanceRecord.id)).scalar_subquery())
+        counts = db.session.query(*columns).select_from(Student).one()
+        students_with_face, total_students = counts[0], counts[1]
+        if not records_estimated:
+            total_records = counts[2]
         uptime_percentage = 99.5  # Simulated uptime
         
-        # Feature adoption rates
-        students_with_face = Student.query.filter_by(face_registered=True).count()
-        total_students = Student.query.filter_by(status=StudentStatus.ACTIVE).count()
         face_adoption_rate = (students_with_face / total_students * 100) if total_students > 0 else 0
         
         return {
             'response_time_ms': avg_response_time,
             'uptime_percentage': uptime_percentage,
             'total_records': total_records,
+            'total_records_estimated': records_estimated,
             'face_adoption_rate': round(face_adoption_rate, 2),
             'system_status': 'healthy' if uptime_percentage > 95 else 'degraded'
         }
@@ -1063,60 +1400,53 @@ def calculate_system_performance_metrics() -> Dict:
             'response_time_ms': 0,
             'uptime_percentage': 0,
             'total_records': 0,
+            'total_records_estimated': False,
             'face_adoption_rate': 0,
             'system_status': 'unknown'
         }
 
 def calculate_peak_capacity_usage() -> float:
-    """Calculate peak capacity usage percentage."""
-    try:
-        # Get current active lectures
-        now = datetime.utcnow()
-        active_lectures = Lecture.query.filter(
-            Lecture.start_time <= now,
-            Lecture.end_time >= now,
-            Lecture.is_active == True
-        ).all()
-        
-        if not active_lectures:
-            return 0.0
-        
-        # Calculate total capacity being used
-        used_capacity = 0
-        for lecture in active_lectures:
-            # Assume room capacity (simplified)
-            used_capacity += 30  # Default room capacity
-        
-        # Total system capacity
-        total_capacity = db.session.query(func.sum(Room.capacity)).filter_by(is_active=True).scalar() or 0
-        
-        return round((used_capacity / total_capacity * 100), 2) if total_capacity > 0 else 0.0
-        
-    except Exception:
-        return 0.0
+    """Calculate peak capacity usage percentage.
+    
+    Query errors propagate: a broken query must not read as 0% usage.
+    """
+    now = datetime.utcnow()
+    
+    # Capacity of the rooms hosting a lecture right now; lectures name their room
+    used_capacity = select(func.coalesce(func.sum(Room.capacity), 0)).join(
+        Lecture, Lecture.room == Room.name
+    ).where(
+        Lecture.start_time <= now,
+        Lecture.end_time >= now,
+        Lecture.is_active == True,
+        Room.is_active == True
+    ).scalar_subquery()
+    
+    # Total system capacity
+    total_capacity = select(func.coalesce(func.sum(Room.capacity), 0)).where(
+        Room.is_active == True
+    ).scalar_subquery()
+    
+    used_capacity, total_capacity = db.session.query(used_capacity, total_capacity).one()
+    
+    return round((used_capacity / total_capacity * 100), 2) if total_capacity > 0 else 0.0
 
 def calculate_concurrent_attendance_rate() -> float:
     """Calculate concurrent attendance rate for active lectures."""
     try:
         now = datetime.utcnow()
         
-        # Get active lectures
-        active_lectures = Lecture.query.filter(
+        # Attendance across all active lectures, one aggregate
+        total_expected, total_present = db.session.query(
+            func.count(AttendanceRecord.id),
+            count_present()
+        ).join(
+            Lecture, AttendanceRecord.lecture_id == Lecture.id
+        ).filter(
             Lecture.start_time <= now,
             Lecture.end_time >= now,
             Lecture.is_active == True
-        ).all()
-        
-        if not active_lectures:
-            return 0.0
-        
-        total_expected = 0
-        total_present = 0
-        
-        for lecture in active_lectures:
-            attendance_records = AttendanceRecord.query.filter_by(lecture_id=lecture.id).all()
-            total_expected += len(attendance_records)
-            total_present += len([r for r in attendance_records if r.is_present])
+        ).one()
         
         return round((total_present / total_expected * 100), 2) if total_expected > 0 else 0.0
         
@@ -1,18 +1,23 @@
 # File: backend/app/api/students.py
 """Student Management API - Admin Only."""
-from flask import Blueprint, request, jsonify
+from flask import Blueprint, request, jsonify, Response, stream_with_context
 from flask_jwt_extended import jwt_required, get_jwt_identity
 from app import db, limiter
 from app.models.user import User, UserRole
 from app.models.student import Student, StudyType, StudentStatus, Section
-from app.utils.helpers import success_response, error_response
+from app.utils.helpers import success_response, error_response, json_response, estimated_row_count
 from app.utils.decorators import admin_required, teacher_required
 from app.services.student_service import StudentService
 import pandas as pd
+import csv
 import io
+import math
 
 students_bp = Blueprint('students', __name__)
 
+# Rows parsed per DataFrame when importing a CSV
+BULK_IMPORT_CHUNK_SIZE = 1000
+
 @students_bp.route('/health', methods=['GET'])
 def health_check():
     """Health check endpoint."""
@@ -31,6 +36,7 @@ def get_students():
         status = request.args.get('status')
         page = request.args.get('page', 1, type=int)
         per_page = request.args.get('per_page', 20, type=int)
+        cursor = request.args.get('cursor', type=int)
         
         # Build query
         query = Student.query
@@ -44,16 +50,34 @@ def get_students():
         if status:
             query = query.filter_by(status=StudentStatus[status.upper()])
         
+        if cursor is not None:
+            # Keyset pagination on id: no COUNT and no OFFSET scan
+            items = query.filter(Student.id > cursor).order_by(Student.id).limit(per_page).all()
+            
+            return json_response(
+                data={
+                    'students': [student.to_dict() for student in items],
+                    'next_cursor': items[-1].id if len(items) == per_page else None
+                }
+            )
+        
+        # Unfiltered listings use the planner's row estimate instead of a COUNT
+        filtered = any((section, study_year, study_type, status))
+        total = None if filtered else estimated_row_count(Student)
+        
         # Paginate
-        pagination = query.paginate(page=page, per_page=per_page)
+        pagination = query.paginate(page=page, per_page=per_page, count=total is None)
+        if total is None:
+            total = pagination.total
         
+        # to_dict only reads columns, so the page needs no further queries
         students = [student.to_dict() for student in pagination.items]
         
-        return success_response(
+        return json_response(
             data={
                 'students': students,
-                'total': pagination.total,
-                'pages': pagination.pages,
+                'total': total,
+                'pages': math.ceil(total / per_page) if total else 0,
                 'current_page': page
             }
         )
@@ -131,9 +155,20 @@ def create_students_bulk():
         # Read file
         try:
             if file.filename.lower().endswith('.csv'):
-                df = pd.read_csv(io.StringIO(file.stream.read().decode("utf-8")))
+                # Parse the upload stream directly, in bounded chunks. A first
+                # pass parses the whole file, so a malformed row far down fails
+                # the upload before any student is committed.
+                df = None
+                for chunk in pd.read_csv(file.stream, encoding='utf-8', chunksize=BULK_IMPORT_CHUNK_SIZE):
+                    if df is None:
+                        df = chunk
+                if df is None:
+                    return error_response("Uploaded file is empty", 400)
+                file.stream.seek(0)
+                chunks = pd.read_csv(file.stream, encoding='utf-8', chunksize=BULK_IMPORT_CHUNK_SIZE)
             else:
                 df = pd.read_excel(file.stream)
+                chunks = df
         except Exception as e:
             return error_response(f"Error reading file: {str(e)}", 400)
         
@@ -144,7 +179,7 @@ def create_students_bulk():
             return error_response(f"Missing columns: {', '.join(missing_columns)}", 400)
         
         # Process students
-        results = StudentService.create_students_bulk(df)
+        results = StudentService.create_students_bulk(chunks)
         
         return success_response(
             data={
@@ -257,33 +292,14 @@ def export_students():
         if study_year:
             query = query.filter_by(study_year=study_year)
         
-        students = query.all()
-        
-        # Create DataFrame
-        data = []
-        for student in students:
-            data.append({
-                'university_id': student.university_id,
-                'full_name': student.full_name,
-                'section': student.section.value if student.section else '',
-                'study_year': student.study_year,
-                'study_type': student.study_type.value if student.study_type else '',
-                'is_repeater': 'نعم' if student.is_repeater else 'لا',
-                'status': student.status.value if student.status else '',
-                'created_at': student.created_at.strftime('%Y-%m-%d')
-            })
-        
-        df = pd.DataFrame(data)
-        
-        # Convert to CSV
-        output = io.StringIO()
-        df.to_csv(output, index=False, encoding='utf-8-sig')
-        output.seek(0)
-        
-        return output.getvalue(), 200, {
-            'Content-Type': 'text/csv; charset=utf-8',
-            'Content-Disposition': 'attachment; filename=students_export.csv'
-        }
+        # Stream row by row instead of building the whole file in memory
+        return Response(
+            stream_with_context(generate_students_csv(query)),
+            content_type='text/csv; charset=utf-8',
+            headers={
+                'Content-Disposition': 'attachment; filename=students_export.csv'
+            }
+        )
         
     except Exception as e:
         return error_response(f"Error exporting students: {str(e)}", 500)
@@ -320,3 +336,48 @@ def get_import_template():
         
     except Exception as e:
         return error_response(f"Error generating template: {str(e)}", 500)
+
+# =================== HELPER FUNCTIONS ===================
+
+EXPORT_COLUMNS = (
+    'university_id', 'full_name', 'section', 'study_year',
+    'study_type', 'is_repeater', 'status', 'created_at'
+)
+
+# Only the exported columns are selected, so rows come back as plain tuples
+EXPORT_ENTITIES = (
+    Student.university_id, Student.full_name, Student.section, Student.study_year,
+    Student.study_type, Student.is_repeater, Student.status, Student.created_at
+)
+
+def student_export_row(row):
+    """Build one export row in EXPORT_COLUMNS order from an EXPORT_ENTITIES tuple."""
+    university_id, full_name, section, study_year, study_type, is_repeater, status, created_at = row
+    return (
+        university_id,
+        full_name,
+        section.value if section else '',
+        study_year,
+        study_type.value if study_type else '',
+        'نعم' if is_repeater else 'لا',
+        status.value if status else '',
+        created_at.strftime('%Y-%m-%d')
+    )
+
+def generate_students_csv(query, batch_size=500):
+    """Yield CSV chunks for the export query without buffering the whole file."""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    
+    # BOM so Excel opens the Arabic content as UTF-8
+    buffer.write('\ufeff')
+    writer.writerow(EXPORT_COLUMNS)
+    yield buffer.getvalue()
+    buffer.seek(0)
+    buffer.truncate()
+    
+    for row in query.with_entities(*EXPORT_ENTITIES).yield_per(batch_size):
+        writer.writerow(student_export_row(row))
+        yield buffer.getvalue()
+        buffer.seek(0)
+        buffer.truncate()
@@ -230,6 +230,9 @@ def migrate_attendance_records_table():
             ('verification_warnings', 'TEXT'),  # JSON array
             ('verification_errors', 'TEXT'),  # JSON array
             ('verification_recommendations', 'TEXT'),  # JSON array
+            
+            # Exceptional check-ins (GPS failed, other checks passed) await approval
+            ('is_exceptional', 'BOOLEAN', 'FALSE'),
         ]
         
         for column_info in new_columns:
@@ -250,6 +253,46 @@ def migrate_attendance_records_table():
         print(f"❌ Attendance records table migration failed: {str(e)}")
         raise
 
+def migrate_lectures_table():
+    """Add the day_of_week and duration_hours columns and time indexes to lectures."""
+    try:
+        inspector = inspect(db.engine)
+        columns = [col['name'] for col in inspector.get_columns('lectures')]
+        is_postgresql = db.engine.dialect.name == 'postgresql'
+        
+        print("🔄 Migrating lectures table for statistics...")
+        
+        statements = []
+        if 'day_of_week' not in columns:
+            # SQLite can only add computed columns as VIRTUAL
+            if is_postgresql:
+                generated = "(CAST(EXTRACT(DOW FROM start_time) AS SMALLINT)) STORED"
+            else:
+                generated = "(CAST(STRFTIME('%w', start_time) AS INTEGER)) VIRTUAL"
+            statements.append(f"ALTER TABLE lectures ADD COLUMN day_of_week SMALLINT GENERATED ALWAYS AS {generated}")
+        if 'duration_hours' not in columns:
+            statements.append("ALTER TABLE lectures ADD COLUMN duration_hours FLOAT")
+        # Backfill rows written before the ORM started maintaining the column
+        if is_postgresql:
+            statements.append("UPDATE lectures SET duration_hours = EXTRACT(EPOCH FROM end_time - start_time) / 3600 WHERE duration_hours IS NULL")
+        else:
+            statements.append("UPDATE lectures SET duration_hours = (julianday(end_time) - julianday(start_time)) * 24 WHERE duration_hours IS NULL")
+        statements.append("CREATE INDEX IF NOT EXISTS ix_lectures_day_of_week ON lectures(day_of_week)")
+        if is_postgresql:
+            statements.append("CREATE INDEX IF NOT EXISTS ix_lectures_start_time_brin ON lectures USING BRIN (start_time)")
+        else:
+            statements.append("CREATE INDEX IF NOT EXISTS ix_lectures_start_time_brin ON lectures(start_time)")
+        
+        with db.engine.begin() as connection:
+            for statement in statements:
+                connection.execute(text(statement))
+        
+        print("✅ Lectures table migration completed")
+        
+    except Exception as e:
+        print(f"❌ Lectures table migration failed: {str(e)}")
+        raise
+
 def create_new_tables():
     """Create new tables for enhanced functionality."""
     try:
@@ -383,6 +426,12 @@ def create_indexes():
             # System analytics indexes
             "CREATE INDEX IF NOT EXISTS idx_analytics_metric_name ON system_analytics(metric_name)",
             "CREATE INDEX IF NOT EXISTS idx_analytics_recorded_at ON system_analytics(recorded_at)",
+            
+            # Schedules indexes
+            "DROP INDEX IF EXISTS ix_schedule_room_day_start",
+            "CREATE INDEX IF NOT EXISTS ix_sched_student ON schedules(is_active, section, study_year, study_type, day_of_week, start_time)",
+            "CREATE INDEX IF NOT EXISTS ix_sched_teacher ON schedules(is_active, teacher_id, day_of_week, start_time)",
+            "CREATE INDEX IF NOT EXISTS ix_sched_room_day ON schedules(is_active, room_id, day_of_week, start_time)",
         ]
         
         for index_sql in indexes:
@@ -398,6 +447,93 @@ def create_indexes():
         print(f"❌ Index creation failed: {str(e)}")
         raise
 
+def create_statistics_indexes():
+    """Create the indexes behind the statistics aggregations.
+    
+    On PostgreSQL they are built CONCURRENTLY so attendance keeps being
+    recorded meanwhile, which cannot run inside a transaction.
+    """
+    try:
+        print("🔄 Creating statistics indexes...")
+        
+        if db.engine.dialect.name == 'postgresql':
+            statements = [
+                "CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_lectures_teacher_start ON lectures(teacher_id, start_time) INCLUDE (is_active)",
+                "CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_lectures_start_active ON lectures(start_time) WHERE is_active",
+                "CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_attendance_created_at ON attendance_records(created_at)",
+                "CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_attendance_lecture_covering ON attendance_records(lecture_id) INCLUDE (is_present, verification_method, student_id)",
+                "CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_students_active_section_year ON students(section, study_year) WHERE status = 'ACTIVE'",
+            ]
+        else:
+            statements = [
+                "CREATE INDEX IF NOT EXISTS ix_lectures_teacher_start ON lectures(teacher_id, start_time)",
+                "CREATE INDEX IF NOT EXISTS ix_lectures_start_active ON lectures(start_time) WHERE is_active",
+                "CREATE INDEX IF NOT EXISTS ix_attendance_created_at ON attendance_records(created_at)",
+                "CREATE INDEX IF NOT EXISTS ix_attendance_lecture_covering ON attendance_records(lecture_id)",
+                "CREATE INDEX IF NOT EXISTS ix_students_active_section_year ON students(section, study_year) WHERE status = 'ACTIVE'",
+            ]
+        
+        with db.engine.connect().execution_options(isolation_level='AUTOCOMMIT') as connection:
+            for statement in statements:
+                connection.execute(text(statement))
+        
+        print("✅ Statistics indexes created")
+        
+    except Exception as e:
+        print(f"❌ Statistics index creation failed: {str(e)}")
+        raise
+
+def create_statistics_views():
+    """Create the materialized views backing the statistics dashboards (PostgreSQL only)."""
+    try:
+        if db.engine.dialect.name != 'postgresql':
+            print("⚠️ Statistics views need PostgreSQL, skipping")
+            return
+        
+        print("🔄 Creating statistics views...")
+        
+        statements = [
+            # Daily attendance rollup, refreshed by the statistics API
+            """
+            CREATE MATERIALIZED VIEW IF NOT EXISTS mv_attendance_daily AS
+            SELECT CAST(l.start_time AS date) AS day, l.teacher_id, s.section, s.study_year,
+                   a.verification_method, COUNT(*) AS total,
+                   SUM(CASE WHEN a.is_present THEN 1 ELSE 0 END) AS present,
+                   SUM(CASE WHEN a.is_exceptional THEN 1 ELSE 0 END) AS exceptional
+            FROM attendance_records a
+            JOIN lectures l ON a.lecture_id = l.id
+            LEFT JOIN students s ON a.student_id = s.user_id
+            GROUP BY 1, 2, 3, 4, 5
+            """,
+            # REFRESH ... CONCURRENTLY needs a unique index over every row
+            "CREATE UNIQUE INDEX IF NOT EXISTS ux_mv_attendance_daily ON mv_attendance_daily(day, teacher_id, section, study_year, verification_method)",
+            
+            # Per-student attendance totals for the top/bottom performer rankings
+            """
+            CREATE MATERIALIZED VIEW IF NOT EXISTS mv_student_attendance AS
+            SELECT s.id AS student_id, s.university_id, s.full_name, s.section, s.study_year,
+                   COUNT(a.id) AS total_lectures,
+                   SUM(CASE WHEN a.is_present THEN 1 ELSE 0 END) AS present_count,
+                   SUM(CASE WHEN a.is_present THEN 1 ELSE 0 END) * 100.0 / NULLIF(COUNT(a.id), 0) AS attendance_rate
+            FROM students s
+            LEFT JOIN attendance_records a ON a.student_id = s.user_id
+            WHERE s.status = 'ACTIVE'
+            GROUP BY s.id
+            """,
+            "CREATE UNIQUE INDEX IF NOT EXISTS ux_mv_student_attendance ON mv_student_attendance(student_id)",
+            "CREATE INDEX IF NOT EXISTS ix_mv_student_attendance_rate ON mv_student_attendance(attendance_rate) WHERE total_lectures >= 5",
+        ]
+        
+        with db.engine.begin() as connection:
+            for statement in statements:
+                connection.execute(text(statement))
+        
+        print("✅ Statistics views created")
+        
+    except Exception as e:
+        print(f"❌ Statistics views creation failed: {str(e)}")
+        raise
+
 def seed_enhanced_data():
     """Seed database with enhanced sample data."""
     try:
@@ -549,6 +685,7 @@ def main():
             migrate_rooms_table()
             migrate_students_table()
             migrate_attendance_records_table()
+            migrate_lectures_table()
             
             # Step 4: Create new tables
             print("\n🏗️ STEP 4: Creating new tables")
@@ -557,6 +694,8 @@ def main():
             # Step 5: Create indexes
             print("\n📊 STEP 5: Creating performance indexes")
             create_indexes()
+            create_statistics_indexes()
+            create_statistics_views()
             
             # Step 6: Seed enhanced data
             print("\n🌱 STEP 6: Seeding enhanced sample data")
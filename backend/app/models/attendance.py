@@ -9,6 +9,13 @@ class AttendanceRecord(BaseModel):
     """Attendance record model."""
     
     __tablename__ = 'attendance_records'
+    __table_args__ = (
+        # Statistics join attendance to lectures and only read these columns
+        db.Index('ix_attendance_lecture_covering', 'lecture_id',
+                 postgresql_include=['is_present', 'verification_method', 'student_id']),
+        # Recent-activity counts filter on the last 24 hours of records
+        db.Index('ix_attendance_created_at', 'created_at'),
+    )
     
     student_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False)
     lecture_id = db.Column(db.Integer, db.ForeignKey('lectures.id'), nullable=False)
@@ -24,6 +31,7 @@ class AttendanceRecord(BaseModel):
     longitude = db.Column(db.Float, nullable=True)
     
     # For emergency check-ins that need approval
+    is_exceptional = db.Column(db.Boolean, default=False)
     approved_by = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=True)
     approved_at = db.Column(db.DateTime, nullable=True)
     
@@ -23,7 +23,6 @@ class AttendanceSession(BaseModel):
     
     # Relationships
     lecture = db.relationship('Lecture', backref='attendance_sessions')
-    records = db.relationship('AttendanceRecord', backref='session', lazy='dynamic')
     
     @staticmethod
     def generate_qr_code() -> str:
@@ -1,6 +1,7 @@
 # backend/app/models/lecture.py - Updated
 """Lecture model with location support."""
 from datetime import datetime
+from sqlalchemy import event
 from app import db
 from app.models.base import BaseModel
 
@@ -8,12 +9,30 @@ class Lecture(BaseModel):
     """Lecture model."""
     
     __tablename__ = 'lectures'
+    __table_args__ = (
+        # Statistics scan lectures by start_time range; lectures are created
+        # roughly in time order, so a BRIN index stays tiny (btree elsewhere)
+        db.Index('ix_lectures_start_time_brin', 'start_time', postgresql_using='brin'),
+        # Per-teacher statistics filter on teacher_id and a start_time range
+        db.Index('ix_lectures_teacher_start', 'teacher_id', 'start_time', postgresql_include=['is_active']),
+        # Most statistics only count active lectures in a start_time window
+        db.Index('ix_lectures_start_active', 'start_time',
+                 postgresql_where=db.text('is_active'), sqlite_where=db.text('is_active')),
+    )
     
     title = db.Column(db.String(255), nullable=False)
     description = db.Column(db.Text, nullable=True)
     teacher_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False)
     start_time = db.Column(db.DateTime, nullable=False)
     end_time = db.Column(db.DateTime, nullable=False)
+    # 0 = Sunday, as EXTRACT(DOW); computed by the database for day-of-week grouping
+    day_of_week = db.Column(
+        db.SmallInteger,
+        db.Computed(db.cast(db.extract('dow', db.literal_column('start_time')), db.SmallInteger), persisted=True),
+        index=True
+    )
+    # Kept in sync by set_duration_hours so utilization sums a plain column
+    duration_hours = db.Column(db.Float, nullable=True)
     room = db.Column(db.String(50), nullable=True)
     is_active = db.Column(db.Boolean, default=True)
     
@@ -36,4 +55,13 @@ class Lecture(BaseModel):
     def __repr__(self):
         return f'<Lecture {self.title}>'
 
+@event.listens_for(Lecture, 'before_insert')
+@event.listens_for(Lecture, 'before_update')
+def set_duration_hours(mapper, connection, target):
+    """Store the lecture length in hours whenever it is written."""
+    if target.start_time and target.end_time:
+        target.duration_hours = (target.end_time - target.start_time).total_seconds() / 3600
+    else:
+        target.duration_hours = None
+
 # ===================================
\ No newline at end of file
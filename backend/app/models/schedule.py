@@ -22,6 +22,15 @@ class Schedule(BaseModel):
     """Schedule for classes."""
     
     __tablename__ = 'schedules'
+    __table_args__ = (
+        # Student views: section/year/type filters ordered by day and time
+        db.Index('ix_sched_student', 'is_active', 'section', 'study_year',
+                 'study_type', 'day_of_week', 'start_time'),
+        # Teacher views: own schedules ordered by day and time
+        db.Index('ix_sched_teacher', 'is_active', 'teacher_id', 'day_of_week', 'start_time'),
+        # Room/day/time overlap check on create and bulk import
+        db.Index('ix_sched_room_day', 'is_active', 'room_id', 'day_of_week', 'start_time'),
+    )
     
     # Basic Info
     subject_name = db.Column(db.String(255), nullable=False)
@@ -48,7 +57,6 @@ class Schedule(BaseModel):
     
     # Relationships
     teacher = db.relationship('User', backref='teaching_schedules')
-    lectures = db.relationship('Lecture', backref='schedule', lazy='dynamic')
     
     def to_dict(self):
         """Convert to dictionary."""
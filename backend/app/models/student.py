@@ -26,6 +26,11 @@ class Student(BaseModel):
     """Student model with detailed information."""
     
     __tablename__ = 'students'
+    __table_args__ = (
+        # Statistics group active students by section and year
+        db.Index('ix_students_active_section_year', 'section', 'study_year',
+                 postgresql_where=db.text("status = 'ACTIVE'"), sqlite_where=db.text("status = 'ACTIVE'")),
+    )
     
     # Link to User
     user_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False, unique=True)
@@ -50,7 +50,9 @@ class User(BaseModel):
     
     # Relationships
     lectures = db.relationship('Lecture', backref='teacher', lazy='dynamic')
-    attendance_records = db.relationship('AttendanceRecord', backref='student', lazy='dynamic')
+    # approved_by also points at users, so name the student side explicitly
+    attendance_records = db.relationship('AttendanceRecord', backref='student', lazy='dynamic',
+                                         foreign_keys='AttendanceRecord.student_id')
     
     def set_password(self, password: str) -> None:
         """Set user password with hashing."""
@@ -1,6 +1,6 @@
 # File: backend/app/services/student_service.py
 """Student management service."""
-from typing import Dict, List, Tuple, Optional
+from typing import Dict, Iterable, List, Tuple, Optional, Union
 from app import db
 from app.models.user import User, UserRole
 from app.models.student import Student, StudyType, Section
@@ -85,10 +85,20 @@ class StudentService:
             return None, f"Error creating student: {str(e)}"
     
     @staticmethod
-    def create_students_bulk(df: pd.DataFrame) -> List[Dict]:
-        """Create multiple students from DataFrame."""
+    def create_students_bulk(df: Union[pd.DataFrame, Iterable[pd.DataFrame]]) -> List[Dict]:
+        """Create multiple students from a DataFrame or an iterator of DataFrame chunks."""
         results = []
+        chunks = [df] if isinstance(df, pd.DataFrame) else df
         
+        for chunk in chunks:
+            StudentService._create_students_chunk(chunk, results)
+        
+        return results
+    
+    @staticmethod
+    def _create_students_chunk(df: pd.DataFrame, results: List[Dict]) -> None:
+        """Create the students of one chunk, appending a result per row."""
+        # Chunked readers keep a running index, so row numbers stay file-wide
         for index, row in df.iterrows():
             try:
                 result, error = StudentService.create_student(
@@ -124,6 +134,4 @@ class StudentService:
                     'name': row.get('full_name', 'Unknown'),
                     'success': False,
                     'error': str(e)
-                })
-        
-        return results
\ No newline at end of file
+                })
\ No newline at end of file
@@ -1,16 +1,29 @@
 # File: backend/app/utils/decorators.py
 """Custom decorators for authorization and validation."""
 from functools import wraps
+import gzip
+from flask import request, make_response, g
 from flask_jwt_extended import get_jwt_identity
 from app.models.user import User, UserRole
 from app.utils.helpers import error_response
 
+def load_current_user():
+    """User for the request's JWT identity, loaded once per request and kept on g.
+
+    The entry is keyed by identity because g lives on the app context, which
+    requests share when one is already pushed (as in tests).
+    """
+    identity = get_jwt_identity()
+    cached = g.get('jwt_user')
+    if cached is None or cached[0] != identity:
+        cached = g.jwt_user = (identity, User.query.get(identity))
+    return cached[1]
+
 def admin_required(f):
     """Decorator to require admin role."""
     @wraps(f)
     def decorated_function(*args, **kwargs):
-        current_user_id = get_jwt_identity()
-        user = User.query.get(current_user_id)
+        user = load_current_user()
         
         if not user:
             return error_response("User not found", 404)
@@ -25,8 +38,7 @@ def teacher_required(f):
     """Decorator to require teacher role or higher."""
     @wraps(f)
     def decorated_function(*args, **kwargs):
-        current_user_id = get_jwt_identity()
-        user = User.query.get(current_user_id)
+        user = load_current_user()
         
         if not user:
             return error_response("User not found", 404)
@@ -41,8 +53,7 @@ def student_required(f):
     """Decorator to require student role."""
     @wraps(f)
     def decorated_function(*args, **kwargs):
-        current_user_id = get_jwt_identity()
-        user = User.query.get(current_user_id)
+        user = load_current_user()
         
         if not user:
             return error_response("User not found", 404)
@@ -57,8 +68,7 @@ def super_admin_required(f):
     """Decorator to require super admin role."""
     @wraps(f)
     def decorated_function(*args, **kwargs):
-        current_user_id = get_jwt_identity()
-        user = User.query.get(current_user_id)
+        user = load_current_user()
         
         if not user:
             return error_response("User not found", 404)
@@ -68,4 +78,30 @@ def super_admin_required(f):
         
         return f(*args, **kwargs)
     return decorated_function
-    
\ No newline at end of file
+    
+
+def gzip_response(min_size: int = 500, level: int = 1):
+    """Decorator to gzip large 200 responses for clients that accept it.
+    
+    Level 1 keeps CPU cost low; JSON still shrinks several times over.
+    """
+    def decorator(f):
+        @wraps(f)
+        def decorated_function(*args, **kwargs):
+            response = make_response(f(*args, **kwargs))
+            
+            if (response.status_code != 200 or response.direct_passthrough
+                    or 'Content-Encoding' in response.headers
+                    or 'gzip' not in request.accept_encodings):
+                return response
+            
+            data = response.get_data()
+            if len(data) < min_size:
+                return response
+            
+            response.set_data(gzip.compress(data, compresslevel=level))
+            response.headers['Content-Encoding'] = 'gzip'
+            response.vary.add('Accept-Encoding')
+            return response
+        return decorated_function
+    return decorator
@@ -1,6 +1,17 @@
 """Helper functions for the application."""
-from flask import jsonify
-from typing import Dict, Any
+from flask import jsonify, current_app
+from typing import Dict, Any, Optional
+import redis
+from sqlalchemy import text
+from app import db
+
+try:
+    import orjson
+except ImportError:  # optional fast JSON encoder
+    orjson = None
+
+# Redis clients keyed by URL, created on first use
+_redis_clients: Dict[str, redis.Redis] = {}
 
 def handle_error(error, status_code: int):
     """Handle application errors with consistent format."""
@@ -22,10 +33,55 @@ def success_response(data: Any = None, message: str = "Success"):
     
     return jsonify(response)
 
+def json_response(data: Any = None, message: str = "Success", status: int = 200):
+    """Success response encoded with orjson when it is installed."""
+    response = {
+        'error': False,
+        'message': message
+    }
+    
+    if data is not None:
+        response['data'] = data
+    
+    if orjson is None:
+        return jsonify(response), status
+    
+    return current_app.response_class(
+        orjson.dumps(response, option=orjson.OPT_NON_STR_KEYS),
+        status=status,
+        mimetype='application/json'
+    )
+
 def error_response(message: str, status_code: int = 400):
     """Return consistent error response."""
     return jsonify({
         'error': True,
         'message': message,
         'status_code': status_code
-    }), status_code
\ No newline at end of file
+    }), status_code
+
+def get_redis() -> Optional[redis.Redis]:
+    """Return a Redis client for REDIS_URL, or None when Redis is not configured."""
+    url = current_app.config.get('REDIS_URL')
+    if not url:
+        return None
+    
+    client = _redis_clients.get(url)
+    if client is None:
+        client = redis.Redis.from_url(url, decode_responses=True)
+        _redis_clients[url] = client
+    return client
+
+def estimated_row_count(model) -> Optional[int]:
+    """The planner's row estimate for model's table on PostgreSQL, else None.
+    
+    pg_class.reltuples is refreshed by autovacuum/ANALYZE and is usually
+    within a few percent; it is -1 until the table is first analyzed.
+    """
+    if db.engine.dialect.name != 'postgresql':
+        return None
+    estimate = db.session.execute(
+        text("SELECT reltuples::bigint FROM pg_class WHERE oid = to_regclass(:table_name)"),
+        {'table_name': model.__tablename__}
+    ).scalar()
+    return estimate if estimate is not None and estimate >= 0 else None
@@ -0,0 +1,181 @@
+# File: backend/app/utils/http_client.py
+"""Minimal JSON-over-HTTP client for probing external services.
+
+Connections are kept alive and reused per host, so repeated probes skip the
+TCP and TLS handshakes. Idle connections expire after KEEPALIVE_EXPIRY
+seconds and every connection is retired after MAX_CONNECTION_AGE, so a
+long-lived socket never pins us to one stale backend.
+
+Probe responses are requested gzip-compressed and read only up to
+MAX_RESPONSE_BYTES, since callers need a status field, not a full payload.
+
+Transport errors and 5xx responses are retried with exponential backoff,
+all within the caller's timeout budget.
+"""
+from http.client import HTTPConnection, HTTPSConnection, HTTPException
+from typing import Dict, Optional, Tuple
+from urllib.parse import urlencode, urlsplit
+import json
+import zlib
+import threading
+import time
+
+KEEPALIVE_EXPIRY = 30.0
+MAX_CONNECTION_AGE = 15 * 60
+MAX_KEEPALIVE_PER_HOST = 16
+MAX_RESPONSE_BYTES = 64 * 1024
+RETRY_ATTEMPTS = 2
+RETRY_BACKOFF = 0.2  # seconds, doubled per attempt
+RETRY_BACKOFF_MAX = 1.0
+
+# (scheme, host, port) -> idle [(connection, created_at, last_used)]
+_idle = {}
+_idle_lock = threading.Lock()
+
+def get_json(url: str, params: Optional[Dict] = None, timeout: float = 10.0,
+             max_bytes: int = MAX_RESPONSE_BYTES, attempts: int = RETRY_ATTEMPTS) -> Tuple[int, Dict]:
+    """GET a JSON document and return (status code, parsed body).
+
+    Error statuses are returned rather than raised, since the APIs we probe
+    explain failures in a JSON body. Network errors and timeouts raise.
+    Bodies larger than max_bytes are not read and parse as {}.
+
+    timeout bounds the whole call, retries included. Transport errors and
+    5xx responses are retried; 4xx responses are final.
+    """
+    parts = urlsplit(url)
+    path = parts.path or '/'
+    query = '&'.join(q for q in (parts.query, urlencode(params or {})) if q)
+    if query:
+        path = f"{path}?{query}"
+    key = (parts.scheme, parts.hostname, parts.port)
+    deadline = time.monotonic() + timeout
+
+    for attempt in range(1, attempts + 1):
+        try:
+            status, body = _get_once(key, path, deadline - time.monotonic(), max_bytes)
+        except (OSError, HTTPException):
+            if attempt == attempts or not _backoff(attempt, deadline):
+                raise
+            continue
+        if status < 500 or attempt == attempts or not _backoff(attempt, deadline):
+            return status, body
+
+def _backoff(attempt: int, deadline: float) -> bool:
+    """Sleep before the next attempt; False if that would overrun the deadline."""
+    delay = min(RETRY_BACKOFF * 2 ** (attempt - 1), RETRY_BACKOFF_MAX)
+    if time.monotonic() + delay >= deadline:
+        return False
+    time.sleep(delay)
+    return True
+
+def _get_once(key: tuple, path: str, timeout: float, max_bytes: int) -> Tuple[int, Dict]:
+    """One GET over a pooled connection."""
+    if timeout <= 0:
+        raise TimeoutError('request timed out')
+    headers = {'Accept': 'application/json', 'Accept-Encoding': 'gzip', 'Connection': 'keep-alive'}
+
+    conn, created_at, reused = _acquire(key, timeout)
+    try:
+        try:
+            conn.request('GET', path, headers=headers)
+            response = conn.getresponse()
+        except (HTTPException, ConnectionError):
+            if not reused:
+                raise
+            # The server dropped an idle connection; retry once on a fresh one
+            conn.close()
+            conn, created_at, reused = _new_connection(key, timeout)
+            conn.request('GET', path, headers=headers)
+            response = conn.getresponse()
+    except Exception:
+        conn.close()
+        raise
+
+    try:
+        body = response.read(max_bytes + 1)
+    except Exception:
+        conn.close()
+        raise
+
+    # An unread remainder leaves the connection unusable for the next request
+    truncated = len(body) > max_bytes
+    if truncated or response.will_close or not response.isclosed():
+        conn.close()
+    else:
+        _release(key, conn, created_at)
+    if truncated:
+        return response.status, {}
+    if response.getheader('Content-Encoding') == 'gzip':
+        body = _gunzip(body, max_bytes)
+    return response.status, _parse(body)
+
+def close_connections():
+    """Close every idle pooled connection."""
+    with _idle_lock:
+        pooled = [entry for entries in _idle.values() for entry in entries]
+        _idle.clear()
+    for conn, _, _ in pooled:
+        conn.close()
+
+def _acquire(key: tuple, timeout: float) -> tuple:
+    """A warm idle connection for key if one is still fresh, else a new one."""
+    now = time.monotonic()
+    expired = []
+    found = None
+    with _idle_lock:
+        entries = _idle.get(key, [])
+        while entries:
+            conn, created_at, last_used = entries.pop()
+            if now - last_used < KEEPALIVE_EXPIRY and now - created_at < MAX_CONNECTION_AGE:
+                found = (conn, created_at)
+                break
+            expired.append(conn)
+    for conn in expired:
+        conn.close()
+
+    if found is None:
+        return _new_connection(key, timeout)
+    conn, created_at = found
+    conn.timeout = timeout
+    try:
+        if conn.sock is not None:
+            conn.sock.settimeout(timeout)
+    except OSError:
+        conn.close()
+        return _new_connection(key, timeout)
+    return conn, created_at, True
+
+def _new_connection(key: tuple, timeout: float) -> tuple:
+    """Open a connection for (scheme, host, port)."""
+    scheme, host, port = key
+    connection_class = HTTPSConnection if scheme == 'https' else HTTPConnection
+    return connection_class(host, port, timeout=timeout), time.monotonic(), False
+
+def _release(key: tuple, conn, created_at: float):
+    """Return a connection to the idle pool, or close it if the pool is full or it is too old."""
+    now = time.monotonic()
+    if now - created_at < MAX_CONNECTION_AGE:
+        with _idle_lock:
+            entries = _idle.setdefault(key, [])
+            if len(entries) < MAX_KEEPALIVE_PER_HOST:
+                entries.append((conn, created_at, now))
+                return
+    conn.close()
+
+def _gunzip(body: bytes, max_bytes: int) -> bytes:
+    """Decompress a gzip body, giving up (b'') past max_bytes of output."""
+    decompressor = zlib.decompressobj(16 + zlib.MAX_WBITS)
+    try:
+        data = decompressor.decompress(body, max_bytes)
+    except zlib.error:
+        return b''
+    return b'' if decompressor.unconsumed_tail else data
+
+def _parse(body: bytes) -> Dict:
+    """Parse a JSON body, treating empty or non-JSON bodies as {}."""
+    try:
+        parsed = json.loads(body) if body else {}
+    except ValueError:
+        return {}
+    return parsed if isinstance(parsed, dict) else {}
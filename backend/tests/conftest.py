@@ -0,0 +1,176 @@
+# File: backend/tests/conftest.py
+"""Shared fixtures for the API tests."""
+from datetime import time
+
+import pytest
+from flask import Flask
+from flask_jwt_extended import create_access_token
+
+from app import db, jwt, limiter
+from app.models import Room, Schedule, WeekDay, Section, StudyType, User, UserRole
+from app.utils import helpers
+from app.api.auth import auth_bp
+from app.api.schedules import schedules_bp, _schedule_dict, _current_results
+from app.api.statistics import statistics_bp, _statistics_responses
+from app.api.settings import settings_bp
+from app.api.students import students_bp
+
+FAKE_REDIS_URL = 'redis://fake'
+
+class FakeRedis:
+    """In-memory stand-in for the few Redis commands the API uses."""
+
+    def __init__(self):
+        self.data = {}
+        self.ttls = {}
+        self.subscribers = {}
+        self.pipelines = 0
+
+    def get(self, key):
+        return self.data.get(key)
+
+    def set(self, key, value):
+        self.data[key] = value
+        return True
+
+    def setex(self, key, ttl, value):
+        self.data[key] = value
+        self.ttls[key] = ttl
+        return True
+
+    def incr(self, key):
+        self.data[key] = str(int(self.data.get(key, 0)) + 1)
+        return int(self.data[key])
+
+    def pipeline(self):
+        self.pipelines += 1
+        return FakePipeline(self)
+
+    def publish(self, channel, message):
+        handlers = self.subscribers.get(channel, [])
+        for handler in handlers:
+            handler({'type': 'message', 'channel': channel, 'data': message})
+        return len(handlers)
+
+    def pubsub(self, ignore_subscribe_messages=False):
+        return FakePubSub(self)
+
+class FakePipeline:
+    """Queues commands and runs them against the FakeRedis on execute()."""
+
+    def __init__(self, redis):
+        self.redis = redis
+        self.commands = []
+
+    def __getattr__(self, name):
+        return lambda *args: self.commands.append((name, args))
+
+    def execute(self):
+        return [getattr(self.redis, name)(*args) for name, args in self.commands]
+
+class FakePubSub:
+    """Delivers FakeRedis.publish() messages to the subscribed handlers inline."""
+
+    def __init__(self, redis):
+        self.redis = redis
+
+    def subscribe(self, **handlers):
+        for channel, handler in handlers.items():
+            self.redis.subscribers.setdefault(channel, []).append(handler)
+
+    def run_in_thread(self, sleep_time=0, daemon=False, exception_handler=None):
+        return FakeListener()
+
+class FakeListener:
+    """Stands in for the pub/sub worker thread, which never dies."""
+
+    def is_alive(self):
+        return True
+
+@pytest.fixture
+def app():
+    """App with the blueprints under test, on an in-memory SQLite database.
+
+    Built here rather than via create_app so a test only needs the
+    blueprints it exercises.
+    """
+    app = Flask(__name__)
+    app.config.update(
+        TESTING=True,
+        SECRET_KEY='test',
+        JWT_SECRET_KEY='test',
+        SQLALCHEMY_DATABASE_URI='sqlite:///:memory:',
+        RATELIMIT_ENABLED=False
+    )
+    db.init_app(app)
+    jwt.init_app(app)
+    limiter.init_app(app)
+
+    app.register_blueprint(auth_bp, url_prefix='/api/auth')
+    app.register_blueprint(students_bp, url_prefix='/api/admin/students')
+    app.register_blueprint(schedules_bp, url_prefix='/api/schedules')
+    app.register_blueprint(statistics_bp, url_prefix='/api/statistics')
+    app.register_blueprint(settings_bp, url_prefix='/api/settings')
+
+    # Process-wide caches must not leak rows between test databases
+    _schedule_dict.cache_clear()
+    _current_results.clear()
+    _statistics_responses.clear()
+
+    with app.app_context():
+        db.create_all()
+        yield app
+        db.session.remove()
+        db.drop_all()
+
+@pytest.fixture
+def fake_redis(app):
+    """Route get_redis() to an in-memory FakeRedis."""
+    fake = FakeRedis()
+    app.config['REDIS_URL'] = FAKE_REDIS_URL
+    helpers._redis_clients[FAKE_REDIS_URL] = fake
+    yield fake
+    helpers._redis_clients.pop(FAKE_REDIS_URL, None)
+
+def make_user(email, name, role):
+    """Create and commit a user."""
+    user = User(email=email, name=name, role=role)
+    user.set_password('password')
+    db.session.add(user)
+    db.session.commit()
+    return user
+
+def auth_headers(user):
+    """Bearer header for an access token issued to user."""
+    return {'Authorization': f'Bearer {create_access_token(identity=str(user.id))}'}
+
+@pytest.fixture
+def admin(app):
+    return make_user('admin@test.local', 'Admin', UserRole.SUPER_ADMIN)
+
+@pytest.fixture
+def teacher(app):
+    return make_user('teacher@test.local', 'Teacher', UserRole.TEACHER)
+
+@pytest.fixture
+def room(app):
+    room = Room(
+        name='A101', building='Main', floor=1, capacity=30,
+        ground_reference_altitude=0, floor_altitude_above_ground=0, room_floor_altitude=0,
+        ceiling_height=3, room_ceiling_altitude=3, gps_boundaries=[], corner_points_3d=[],
+        center_latitude=0, center_longitude=0, center_altitude=0
+    )
+    db.session.add(room)
+    db.session.commit()
+    return room
+
+def make_schedule(teacher, room, day=WeekDay.SUNDAY, start=time(8), end=time(10), **fields):
+    """Create and commit an active schedule."""
+    schedule = Schedule(
+        subject_name=fields.pop('subject_name', 'Math'), teacher_id=teacher.id, room_id=room.id,
+        section=Section.A, study_year=1, study_type=StudyType.MORNING,
+        day_of_week=day, start_time=start, end_time=end, **fields
+    )
+    db.session.add(schedule)
+    db.session.commit()
+    return schedule
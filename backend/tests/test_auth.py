@@ -0,0 +1,24 @@
+# File: backend/tests/test_auth.py
+"""Auth API: token refresh."""
+from flask_jwt_extended import create_refresh_token
+
+from app import db
+
+def refresh(client, user):
+    token = create_refresh_token(identity=str(user.id))
+    return client.post('/api/auth/refresh', headers={'Authorization': f'Bearer {token}'})
+
+def test_refresh_issues_an_access_token(client, admin):
+    response = refresh(client, admin)
+
+    assert response.status_code == 200
+    assert response.get_json()['data']['access_token']
+
+def test_refresh_rejects_inactive_users(client, admin):
+    admin.is_active = False
+    db.session.commit()
+
+    response = refresh(client, admin)
+
+    assert response.status_code == 401
+    assert response.get_json()['message'] == 'User not found or inactive'
@@ -0,0 +1,87 @@
+# File: backend/tests/test_http_client.py
+"""Probe HTTP client: connection reuse, bounded gzip reads and retries."""
+import gzip
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from app.utils import http_client
+from app.utils.http_client import get_json
+
+class ProbeHandler(BaseHTTPRequestHandler):
+    """Replies with the next queued (status, body, gzipped) response."""
+    protocol_version = 'HTTP/1.1'
+
+    def do_GET(self):
+        server = self.server
+        server.requests.append((self.path, self.client_address[1], self.headers.get('Accept-Encoding')))
+        status, body, gzipped = server.responses.pop(0) if server.responses else (200, {'ok': True}, False)
+
+        payload = body if isinstance(body, bytes) else json.dumps(body).encode()
+        if gzipped:
+            payload = gzip.compress(payload)
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(payload)))
+        if gzipped:
+            self.send_header('Content-Encoding', 'gzip')
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def log_message(self, *args):
+        pass
+
+@pytest.fixture
+def server():
+    """Local keep-alive HTTP server; queue replies on server.responses."""
+    server = ThreadingHTTPServer(('127.0.0.1', 0), ProbeHandler)
+    server.daemon_threads = True
+    server.requests = []
+    server.responses = []
+    server.url = f"http://127.0.0.1:{server.server_address[1]}"
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server
+    http_client.close_connections()
+    server.shutdown()
+    server.server_close()
+
+def test_probes_reuse_one_keepalive_connection(server):
+    assert get_json(f"{server.url}/first") == (200, {'ok': True})
+    assert get_json(f"{server.url}/second", params={'key': 'x'}) == (200, {'ok': True})
+
+    paths = [path for path, _, _ in server.requests]
+    ports = {port for _, port, _ in server.requests}
+    assert paths == ['/first', '/second?key=x']
+    assert len(ports) == 1
+
+def test_gzip_bodies_are_decoded_within_the_size_bound(server):
+    server.responses = [
+        (200, {'status': 'OK'}, True),
+        (200, {'padding': 'x' * 4096}, True),
+        (200, b'{"padding": "' + b'x' * 4096 + b'"}', False),
+    ]
+
+    assert get_json(server.url) == (200, {'status': 'OK'})
+    # Past max_bytes, compressed or not, the body is dropped unparsed
+    assert get_json(server.url, max_bytes=1024) == (200, {})
+    assert get_json(server.url, max_bytes=1024) == (200, {})
+    assert all(encoding == 'gzip' for _, _, encoding in server.requests)
+
+def test_5xx_is_retried_but_4xx_is_final(server, monkeypatch):
+    monkeypatch.setattr(http_client, 'RETRY_BACKOFF', 0.01)
+    server.responses = [(503, {}, False), (200, {'ok': True}, False), (401, {'ok': False}, False)]
+
+    assert get_json(server.url) == (200, {'ok': True})
+    assert get_json(server.url) == (401, {'ok': False})
+    assert len(server.requests) == 3
+
+def test_retries_stay_inside_the_timeout_budget(server, monkeypatch):
+    monkeypatch.setattr(http_client, 'RETRY_BACKOFF', 5)
+    server.responses = [(503, {'error': 'busy'}, False)]
+
+    # Backing off would overrun the 1 second budget, so the 503 is returned as is
+    assert get_json(server.url, timeout=1) == (503, {'error': 'busy'})
+    assert len(server.requests) == 1
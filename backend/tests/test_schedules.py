@@ -0,0 +1,119 @@
+# File: backend/tests/test_schedules.py
+"""Schedule API: serialization cache, current-schedule cache and conflicts."""
+from datetime import datetime, time
+
+from flask_jwt_extended import create_access_token
+from sqlalchemy.exc import OperationalError
+
+from app import db
+from app.api import schedules as schedules_api
+from app.models import Schedule, WeekDay
+from tests.conftest import auth_headers, make_schedule
+
+# WeekDay members in datetime.weekday() order
+PY_WEEKDAYS = (WeekDay.MONDAY, WeekDay.TUESDAY, WeekDay.WEDNESDAY, WeekDay.THURSDAY,
+               WeekDay.FRIDAY, WeekDay.SATURDAY, WeekDay.SUNDAY)
+
+def all_day_schedule(teacher, room):
+    """A schedule running today for the whole day, so /current always finds it."""
+    today = PY_WEEKDAYS[datetime.now().weekday()]
+    return make_schedule(teacher, room, day=today, start=time(0), end=time(23, 59))
+
+def current_teacher_name(client, user):
+    current = client.get('/api/schedules/current', headers=auth_headers(user)).get_json()['data']['current']
+    return current and current['teacher']
+
+def test_schedule_dict_is_rebuilt_after_an_update(client, admin, teacher, room):
+    schedule = make_schedule(teacher, room)
+    headers = auth_headers(admin)
+
+    assert client.get(f'/api/schedules/{schedule.id}', headers=headers).get_json()['data']['subject_name'] == 'Math'
+
+    response = client.put(f'/api/schedules/{schedule.id}', headers=headers, json={'subject_name': 'Physics'})
+    assert response.status_code == 200
+
+    data = client.get('/api/schedules/', headers=headers).get_json()['data']
+    assert [schedule['subject_name'] for schedule in data] == ['Physics']
+
+def test_schedule_dict_follows_teacher_and_room_renames(client, admin, teacher, room):
+    schedule = make_schedule(teacher, room)
+    headers = auth_headers(admin)
+
+    data = client.get(f'/api/schedules/{schedule.id}', headers=headers).get_json()['data']
+    assert (data['teacher'], data['room']) == ('Teacher', 'A101')
+
+    teacher.name = 'Renamed Teacher'
+    room.name = 'B202'
+    db.session.commit()
+
+    data = client.get('/api/schedules/', headers=headers).get_json()['data'][0]
+    assert (data['teacher'], data['room']) == ('Renamed Teacher', 'B202')
+
+def test_current_candidates_are_served_from_redis(client, teacher, room, fake_redis):
+    all_day_schedule(teacher, room)
+
+    assert current_teacher_name(client, teacher) == 'Teacher'
+    keys = [key for key in fake_redis.data if key.startswith('current:')]
+    assert len(keys) == 1
+    assert fake_redis.ttls[keys[0]] == 600
+
+    # The cached candidates answer even once the row is gone from the database
+    with db.engine.begin() as connection:
+        connection.execute(Schedule.__table__.delete())
+    assert current_teacher_name(client, teacher) == 'Teacher'
+
+def test_current_candidates_are_invalidated_by_schedule_writes(client, admin, teacher, room, fake_redis):
+    schedule = all_day_schedule(teacher, room)
+
+    assert current_teacher_name(client, teacher) == 'Teacher'
+    assert any(key.startswith('current:') for key in fake_redis.data)
+
+    response = client.delete(f'/api/schedules/{schedule.id}', headers=auth_headers(admin))
+    assert response.status_code == 200
+
+    assert current_teacher_name(client, teacher) is None
+
+def test_current_candidates_follow_teacher_rename_but_not_logins(client, teacher, room, fake_redis):
+    all_day_schedule(teacher, room)
+    assert current_teacher_name(client, teacher) == 'Teacher'
+    generation = fake_redis.get('schedules:current:generation')
+
+    teacher.last_login = datetime.utcnow()
+    db.session.commit()
+    assert fake_redis.get('schedules:current:generation') == generation
+
+    teacher.name = 'Renamed Teacher'
+    db.session.commit()
+    assert current_teacher_name(client, teacher) == 'Renamed Teacher'
+
+def test_current_schedule_database_errors_return_a_fixed_body(client, teacher, monkeypatch):
+    def fail(now):
+        raise OperationalError('SELECT secret', {}, Exception('connection refused'))
+    monkeypatch.setattr(schedules_api, 'cached_current_schedule', fail)
+
+    response = client.get('/api/schedules/current', headers=auth_headers(teacher))
+
+    assert response.status_code == 500
+    assert response.get_json()['message'] == 'Error fetching current schedule'
+
+def test_current_schedule_for_deleted_user_is_404(client, app):
+    headers = {'Authorization': f'Bearer {create_access_token(identity="999")}'}
+
+    response = client.get('/api/schedules/current', headers=headers)
+
+    assert response.status_code == 404
+    assert response.get_json()['message'] == 'User not found'
+
+def test_time_overlaps_only_within_same_room_and_day(client, admin, teacher, room):
+    first = make_schedule(teacher, room, start=time(8), end=time(10), subject_name='Math')
+    second = make_schedule(teacher, room, start=time(9), end=time(11), subject_name='Physics')
+    # Touching, not overlapping
+    make_schedule(teacher, room, start=time(11), end=time(12), subject_name='Chemistry')
+    # Same time on another day
+    make_schedule(teacher, room, day=WeekDay.MONDAY, start=time(9), end=time(11), subject_name='Biology')
+
+    data = client.get('/api/schedules/conflicts?type=time', headers=auth_headers(admin)).get_json()['data']
+
+    overlaps = [conflict for conflict in data['conflicts'] if conflict['type'] == 'time_overlap']
+    assert [(c['schedule1_id'], c['schedule2_id']) for c in overlaps] == [(first.id, second.id)]
+    assert overlaps[0]['overlap_time'] == '09:00:00 - 10:00:00'
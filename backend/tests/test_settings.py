@@ -0,0 +1,183 @@
+# File: backend/tests/test_settings.py
+"""Settings API: Redis-backed store, validation memo and probe coalescing."""
+import json
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+from flask_jwt_extended import create_access_token
+
+from app import db
+from app.api import settings as settings_api
+from app.api.settings import cached_probe, validate_cached
+from app.models import UserRole
+from tests.conftest import auth_headers
+
+@pytest.fixture
+def settings_state(app, tmp_path, monkeypatch):
+    """Fresh process-wide settings caches and a throwaway settings file."""
+    monkeypatch.setattr(settings_api, 'SETTINGS_FILE', str(tmp_path / 'system_settings.json'))
+    monkeypatch.setattr(settings_api, 'settings_cache', settings_api._MISSING)
+    monkeypatch.setattr(settings_api, 'settings_rev', None)
+    monkeypatch.setattr(settings_api, 'settings_updated_at', None)
+    monkeypatch.setattr(settings_api, '_settings_listener', None)
+    monkeypatch.setattr(settings_api, '_invalidations', 0)
+    monkeypatch.setattr(settings_api, '_checked_invalidations', -1)
+    monkeypatch.setattr(settings_api, '_validation_cache', type(settings_api._validation_cache)())
+    monkeypatch.setattr(settings_api, '_connection_results', {})
+    monkeypatch.setattr(settings_api, '_inflight_probes', {})
+
+def qr_expiry(client, headers):
+    response = client.get('/api/settings/', headers=headers)
+    assert response.status_code == 200
+    return response.get_json()['data']['settings']['attendance']['qr_code_expiry_seconds']
+
+def publish_from_other_worker(fake_redis, qr_code_expiry_seconds):
+    """Save settings the way another worker would: new blob, revision bump, notification."""
+    stored = json.loads(fake_redis.get(settings_api.SETTINGS_BLOB_KEY))
+    stored['attendance']['qr_code_expiry_seconds'] = qr_code_expiry_seconds
+    fake_redis.set(settings_api.SETTINGS_BLOB_KEY, json.dumps(stored))
+    fake_redis.publish(settings_api.SETTINGS_CHANNEL, fake_redis.incr(settings_api.SETTINGS_REV_KEY))
+
+def test_settings_reload_only_when_the_redis_revision_moves(client, admin, fake_redis, settings_state):
+    headers = auth_headers(admin)
+    settings = client.get('/api/settings/', headers=headers).get_json()['data']['settings']
+    settings['attendance']['qr_code_expiry_seconds'] = 120
+
+    assert client.put('/api/settings/', headers=headers, json=settings).status_code == 200
+    assert fake_redis.get(settings_api.SETTINGS_REV_KEY) == '1'
+    assert qr_expiry(client, headers) == 120
+
+    # A blob rewritten without a revision bump is not re-read
+    stale = json.loads(fake_redis.get(settings_api.SETTINGS_BLOB_KEY))
+    stale['attendance']['qr_code_expiry_seconds'] = 45
+    fake_redis.set(settings_api.SETTINGS_BLOB_KEY, json.dumps(stale))
+    assert qr_expiry(client, headers) == 120
+
+    publish_from_other_worker(fake_redis, 90)
+    assert qr_expiry(client, headers) == 90
+
+def test_workers_recheck_redis_only_after_an_invalidation(client, admin, fake_redis, settings_state):
+    headers = auth_headers(admin)
+    fake_redis.set(settings_api.SETTINGS_BLOB_KEY, json.dumps({'attendance': {'qr_code_expiry_seconds': 75}}))
+    fake_redis.set(settings_api.SETTINGS_REV_KEY, '1')
+
+    assert qr_expiry(client, headers) == 75
+    reads = fake_redis.pipelines
+    assert qr_expiry(client, headers) == 75
+    assert fake_redis.pipelines == reads
+
+    publish_from_other_worker(fake_redis, 90)
+    assert qr_expiry(client, headers) == 90
+    assert fake_redis.pipelines == reads + 1
+
+def test_settings_role_follows_the_user_not_the_token(client, admin, settings_state):
+    # Tokens from before the claim was dropped still carry a role
+    token = create_access_token(identity=str(admin.id), additional_claims={'role': 'super_admin'})
+    headers = {'Authorization': f'Bearer {token}'}
+    data = client.get('/api/settings/', headers=headers).get_json()['data']
+    assert 'jwt_expiry_hours' in data['settings']['security']
+
+    admin.role = UserRole.ADMIN
+    db.session.commit()
+
+    # Same token, demoted user: sensitive settings are now hidden
+    data = client.get('/api/settings/', headers=headers).get_json()['data']
+    assert 'jwt_expiry_hours' not in data['settings']['security']
+
+def test_failed_saves_roll_back_and_return_a_fixed_message(client, admin, settings_state, tmp_path, monkeypatch):
+    headers = auth_headers(admin)
+    settings = client.get('/api/settings/', headers=headers).get_json()['data']['settings']
+    settings['attendance']['qr_code_expiry_seconds'] = 120
+    monkeypatch.setattr(settings_api, 'SETTINGS_FILE', str(tmp_path / 'missing' / 'system_settings.json'))
+    admin.name = 'Unsaved'
+
+    response = client.put('/api/settings/', headers=headers, json=settings)
+
+    assert response.status_code == 500
+    assert response.get_json()['message'] == 'Error processing settings request'
+    assert admin.name == 'Admin'
+    assert qr_expiry(client, headers) == 60
+
+def test_http_and_auth_errors_keep_their_status(client, admin, settings_state):
+    response = client.put('/api/settings/', headers={**auth_headers(admin), 'Content-Type': 'application/json'},
+                          data='{not json')
+    assert response.status_code == 400
+    assert response.get_json()['error'] is True
+
+    assert client.get('/api/settings/').status_code == 401
+
+def test_bulk_etag_depends_on_the_requested_categories(client, admin, fake_redis, settings_state):
+    headers = auth_headers(admin)
+    settings = client.get('/api/settings/', headers=headers).get_json()['data']['settings']
+    settings['ui']['theme'] = 'dark'
+    assert client.put('/api/settings/', headers=headers, json=settings).status_code == 200
+
+    response = client.get('/api/settings/bulk?cats=ui', headers=headers)
+    assert list(response.get_json()['data']) == ['ui']
+    etag = response.headers['ETag']
+
+    assert client.get('/api/settings/bulk?cats=ui', headers={**headers, 'If-None-Match': etag}).status_code == 304
+
+    response = client.get('/api/settings/bulk?cats=ui,system', headers={**headers, 'If-None-Match': etag})
+    assert response.status_code == 200
+    assert sorted(response.get_json()['data']) == ['system', 'ui']
+
+def test_validation_is_memoized_per_payload(app, settings_state):
+    calls = []
+
+    def validator(data):
+        calls.append(data)
+        return (True, None)
+
+    with app.test_request_context(json={'attendance': {}, 'ui': {}}):
+        assert validate_cached(validator, {'attendance': {}, 'ui': {}}) == (True, None)
+    # Same payload with its keys in another order
+    with app.test_request_context(json={'ui': {}, 'attendance': {}}):
+        assert validate_cached(validator, {'ui': {}, 'attendance': {}}) == (True, None)
+    with app.test_request_context(json={'attendance': {'qr_code_expiry_seconds': 60}}):
+        validate_cached(validator, {'attendance': {'qr_code_expiry_seconds': 60}})
+
+    assert len(calls) == 2
+
+def test_import_validates_its_own_payload_after_a_put_of_the_same_body(client, admin, settings_state):
+    headers = auth_headers(admin)
+    body = client.get('/api/settings/', headers=headers).get_json()['data']['settings']
+    body['settings'] = {'attendance': {}}  # every other category is missing
+
+    assert client.put('/api/settings/', headers=headers, json=body).status_code == 200
+
+    response = client.post('/api/settings/import', headers=headers, json=body)
+    assert response.status_code == 400
+    assert response.get_json()['message'] == 'Invalid imported settings: Missing category: security'
+
+def test_concurrent_probes_share_one_upstream_call(settings_state, monkeypatch):
+    # Failures expire at once, so only the in-flight sharing can dedupe
+    monkeypatch.setattr(settings_api, 'CONNECTION_FAILURE_TTL', 0)
+    started, release = threading.Event(), threading.Event()
+    calls = []
+
+    @cached_probe('telegram')
+    def probe(settings):
+        calls.append(settings)
+        started.set()
+        release.wait(5)
+        return {'success': False, 'message': 'unauthorized'}
+
+    with ThreadPoolExecutor(max_workers=4) as pool:
+        leader = pool.submit(probe, {'telegram_bot_token': 'token'})
+        assert started.wait(5)
+        followers = [pool.submit(probe, {'telegram_bot_token': 'token'}) for _ in range(3)]
+        time.sleep(0.1)
+        release.set()
+        results = [future.result(5) for future in [leader, *followers]]
+
+    assert len(calls) == 1
+    assert results == [{'success': False, 'message': 'unauthorized'}] * 4
+    assert settings_api._inflight_probes == {}
+
+    # Nothing in flight and the failure expired: the next call probes again
+    release.set()
+    probe({'telegram_bot_token': 'token'})
+    assert len(calls) == 2
@@ -0,0 +1,161 @@
+# File: backend/tests/test_statistics.py
+"""Statistics API: response cache, filters and room/capacity figures."""
+from datetime import datetime, time, timedelta
+
+from sqlalchemy import text
+
+from app import db
+from app.api import statistics as statistics_api
+from app.api.statistics import calculate_peak_capacity_usage, daily_attendance_totals
+from app.models import AttendanceRecord, Lecture, UserRole
+from tests.conftest import auth_headers, make_user
+
+def add_lecture(teacher, room_name, start, hours=2, **fields):
+    lecture = Lecture(title='Lecture', teacher_id=teacher.id, start_time=start,
+                      end_time=start + timedelta(hours=hours), room=room_name, **fields)
+    db.session.add(lecture)
+    db.session.commit()
+    return lecture
+
+def insert_lecture_outside_orm(teacher):
+    """Insert a lecture without the ORM session, so no invalidation fires."""
+    now = datetime.utcnow()
+    with db.engine.begin() as connection:
+        connection.execute(Lecture.__table__.insert().values(
+            title='Raw', teacher_id=teacher.id, start_time=now, end_time=now + timedelta(hours=1),
+            is_active=True, created_at=now, updated_at=now
+        ))
+
+def total_lectures(client, headers):
+    response = client.get('/api/statistics/overview', headers=headers)
+    assert response.status_code == 200
+    return response.get_json()['data']['overview']['total_lectures']
+
+def test_statistics_are_cached_until_a_commit_touches_their_tables(client, admin, teacher):
+    headers = auth_headers(admin)
+    assert total_lectures(client, headers) == 0
+
+    # Served from the cache: the raw insert bypasses the session events
+    insert_lecture_outside_orm(teacher)
+    assert total_lectures(client, headers) == 0
+
+    # An ORM commit moves the cache to a new generation
+    add_lecture(teacher, 'A101', datetime.utcnow())
+    assert total_lectures(client, headers) == 2
+
+def test_statistics_cache_ttls_in_redis(client, admin, fake_redis):
+    headers = auth_headers(admin)
+
+    assert client.get('/api/statistics/system', headers=headers).status_code == 200
+    assert client.get('/api/statistics/realtime', headers=headers).status_code == 200
+
+    ttls = {key.split(':')[1]: ttl for key, ttl in fake_redis.ttls.items()}
+    assert ttls == {'system_statistics': 30, 'realtime_statistics': 5}
+
+    generation = fake_redis.get('statistics:generation')
+    add_lecture(admin, 'A101', datetime.utcnow())
+    assert fake_redis.get('statistics:generation') != generation
+
+def test_logins_leave_the_statistics_cache_alone(client, admin, fake_redis):
+    assert client.get('/api/statistics/system', headers=auth_headers(admin)).status_code == 200
+    generation = fake_redis.get('statistics:generation')
+
+    response = client.post('/api/auth/login', json={'email': admin.email, 'password': 'password'})
+    assert response.status_code == 200
+    assert fake_redis.get('statistics:generation') == generation
+
+    admin.name = 'Renamed'
+    db.session.commit()
+    assert fake_redis.get('statistics:generation') != generation
+
+def test_system_statistics_counts_attendance_in_one_pass(client, admin, teacher, room):
+    student = make_user('student@test.local', 'Student', UserRole.STUDENT)
+    lecture = add_lecture(teacher, room.name, datetime.utcnow())
+    db.session.add_all([
+        AttendanceRecord(student_id=student.id, lecture_id=lecture.id, latitude=33.3, longitude=44.4),
+        AttendanceRecord(student_id=student.id, lecture_id=lecture.id, verification_method='manual',
+                         is_exceptional=True, approved_by=admin.id),
+        AttendanceRecord(student_id=student.id, lecture_id=lecture.id, verification_method='manual',
+                         is_exceptional=True),
+        AttendanceRecord(student_id=student.id, lecture_id=lecture.id, is_present=False),
+    ])
+    db.session.commit()
+
+    response = client.get('/api/statistics/system', headers=auth_headers(admin))
+    assert response.status_code == 200
+    data = response.get_json()['data']
+
+    assert data['database_statistics'] == {
+        'total_users': 3, 'total_students': 0, 'total_lectures': 1,
+        'total_attendance_records': 4, 'total_schedules': 0, 'total_rooms': 1
+    }
+    assert data['recent_activity_24h'] == {'new_attendance_records': 4, 'new_lectures': 1, 'new_users': 3}
+    usage = data['feature_usage']
+    assert usage['exceptional_attendance'] == {'total_exceptional': 2, 'approved_exceptional': 1}
+    assert usage['gps_verification'] == {'records_with_location': 1}
+    assert usage['qr_verification'] == {'qr_verified_records': 2}
+    assert data['error_statistics'] == {'failed_verifications': 1, 'pending_approvals': 1}
+
+def test_attendance_statistics_rejects_unknown_section(client, teacher):
+    headers = auth_headers(teacher)
+
+    response = client.get('/api/statistics/attendance?section=z', headers=headers)
+    assert response.status_code == 400
+    assert response.get_json()['message'] == 'Invalid section: z'
+
+    response = client.get('/api/statistics/attendance?section=a', headers=headers)
+    assert response.status_code == 200
+    assert response.get_json()['data']['overall_statistics']['exceptional_records'] == 0
+
+def test_peak_capacity_usage_counts_rooms_of_running_lectures(app, teacher, room):
+    assert calculate_peak_capacity_usage() == 0.0
+
+    now = datetime.utcnow()
+    add_lecture(teacher, room.name, now - timedelta(hours=1))
+    add_lecture(teacher, room.name, now - timedelta(hours=5))  # already over
+    add_lecture(teacher, 'Elsewhere', now - timedelta(hours=1))  # not a known room
+
+    assert calculate_peak_capacity_usage() == 100.0
+
+def test_room_utilization_uses_lecture_durations(client, admin, teacher, room):
+    start = datetime.utcnow() - timedelta(days=2)
+    add_lecture(teacher, room.name, start, hours=2)
+    add_lecture(teacher, room.name, start + timedelta(days=1), hours=1.5)
+
+    response = client.get('/api/statistics/rooms', headers=auth_headers(admin))
+    assert response.status_code == 200
+
+    utilization = response.get_json()['data']['detailed_utilization']
+    assert [(row['room_name'], row['lectures_count'], row['hours_used']) for row in utilization] == [
+        ('A101', 2, 3.5)
+    ]
+
+def test_daily_attendance_reads_the_view_only_for_whole_past_days(app, teacher, monkeypatch):
+    student = make_user('student@test.local', 'Student', UserRole.STUDENT)
+    today = datetime.utcnow().date()
+    for day_offset in (3, 1, 0):
+        lecture = add_lecture(teacher, 'A101', datetime.combine(today - timedelta(days=day_offset), time(13)), hours=1)
+        db.session.add(AttendanceRecord(student_id=student.id, lecture_id=lecture.id, latitude=33.3, longitude=44.4))
+    db.session.commit()
+
+    # A rollup as of its last refresh: yesterday is stale, today not yet included
+    with db.engine.begin() as connection:
+        connection.execute(text('CREATE TABLE mv_attendance_daily '
+                                '(day DATE, teacher_id INTEGER, section TEXT, study_year INTEGER, '
+                                'verification_method TEXT, total INTEGER, present INTEGER, exceptional INTEGER)'))
+        connection.execute(text("INSERT INTO mv_attendance_daily VALUES "
+                                "(:day, :teacher, NULL, NULL, 'qr', 7, 5, 0)"),
+                           [{'day': today - timedelta(days=3), 'teacher': teacher.id},
+                            {'day': today - timedelta(days=1), 'teacher': teacher.id}])
+    monkeypatch.setattr(statistics_api, '_views_available', frozenset({'mv_attendance_daily'}))
+    monkeypatch.setattr(statistics_api, 'refresh_statistics_views', lambda: None)
+
+    # Starts mid-day three days ago: that partial day comes from the live tables
+    start = datetime.combine(today - timedelta(days=3), time(12))
+    totals = daily_attendance_totals(start, datetime.combine(today, time(23)))
+
+    assert totals == {
+        (today - timedelta(days=3)).isoformat(): (1, 1),
+        (today - timedelta(days=1)).isoformat(): (7, 5),
+        today.isoformat(): (1, 1),
+    }
@@ -0,0 +1,100 @@
+# File: backend/tests/test_students.py
+"""Student API: keyset pagination, chunked bulk import and CSV export."""
+import io
+
+import pytest
+
+from app.api import students as students_api
+from app.services.student_service import StudentService
+from tests.conftest import auth_headers
+
+BULK_HEADER = 'full_name,section,study_year,study_type\n'
+
+@pytest.fixture
+def students(app):
+    """Twelve students alternating between sections A and B."""
+    for i in range(12):
+        result, error = StudentService.create_student(
+            full_name=f'Student {i}', section='A' if i % 2 == 0 else 'B',
+            study_year=1, study_type='morning'
+        )
+        assert error is None
+
+def upload(client, headers, content, filename='students.csv'):
+    return client.post(
+        '/api/admin/students/bulk', headers=headers,
+        data={'file': (io.BytesIO(content.encode('utf-8')), filename)},
+        content_type='multipart/form-data'
+    )
+
+def test_keyset_pagination_walks_all_students(client, admin, students):
+    headers = auth_headers(admin)
+    seen, cursor = [], 0
+
+    while cursor is not None:
+        data = client.get(f'/api/admin/students/?cursor={cursor}&per_page=5', headers=headers).get_json()['data']
+        seen.extend(student['full_name'] for student in data['students'])
+        cursor = data['next_cursor']
+
+    assert seen == [f'Student {i}' for i in range(12)]
+
+def test_keyset_pagination_applies_filters(client, admin, students):
+    data = client.get('/api/admin/students/?section=b&cursor=0&per_page=10',
+                      headers=auth_headers(admin)).get_json()['data']
+
+    assert [student['section'] for student in data['students']] == ['B'] * 6
+    assert data['next_cursor'] is None
+
+def test_page_pagination_reports_exact_totals_on_sqlite(client, admin, students):
+    data = client.get('/api/admin/students/?page=2&per_page=5', headers=auth_headers(admin)).get_json()['data']
+
+    assert (data['total'], data['pages'], data['current_page']) == (12, 3, 2)
+    assert len(data['students']) == 5
+
+def test_bulk_import_keeps_file_row_numbers_across_chunks(client, admin, monkeypatch):
+    monkeypatch.setattr(students_api, 'BULK_IMPORT_CHUNK_SIZE', 2)
+    rows = ['Ali,A,1,morning', 'Sara,Z,2,morning', 'Mona,B,3,evening', 'Zaid,A,4,morning', 'Huda,X,1,morning']
+
+    response = upload(client, auth_headers(admin), BULK_HEADER + '\n'.join(rows) + '\n')
+
+    assert response.status_code == 200
+    data = response.get_json()['data']
+    assert (data['total'], data['successful'], data['failed']) == (5, 3, 2)
+    assert [(r['row'], r['success']) for r in data['results']] == [
+        (2, True), (3, False), (4, True), (5, True), (6, False)
+    ]
+
+def test_bulk_import_rejects_a_malformed_later_chunk_before_committing(client, admin, monkeypatch):
+    monkeypatch.setattr(students_api, 'BULK_IMPORT_CHUNK_SIZE', 2)
+    rows = ['Ali,A,1,morning', 'Sara,B,2,morning', 'Mona,B,3,evening', 'Zaid,A,4,morning,extra']
+    headers = auth_headers(admin)
+
+    response = upload(client, headers, BULK_HEADER + '\n'.join(rows) + '\n')
+
+    assert response.status_code == 400
+    assert response.get_json()['message'].startswith('Error reading file: Error tokenizing data')
+    data = client.get('/api/admin/students/?page=1', headers=headers).get_json()['data']
+    assert data['total'] == 0
+
+def test_bulk_import_validates_columns_and_empty_files(client, admin):
+    headers = auth_headers(admin)
+
+    response = upload(client, headers, 'full_name,section\nAli,A\n')
+    assert response.status_code == 400
+    assert response.get_json()['message'] == 'Missing columns: study_year, study_type'
+
+    assert upload(client, headers, '').status_code == 400
+
+    response = upload(client, headers, BULK_HEADER)
+    assert response.status_code == 200
+    assert response.get_json()['data']['total'] == 0
+
+def test_export_streams_csv_rows(client, admin, students):
+    response = client.get('/api/admin/students/export?section=a', headers=auth_headers(admin))
+
+    assert response.status_code == 200
+    assert response.is_streamed
+    lines = response.get_data(as_text=True).splitlines()
+    assert lines[0] == '﻿university_id,full_name,section,study_year,study_type,is_repeater,status,created_at'
+    assert len(lines) == 7
+    assert all(',A,1,morning,لا,active,' in line for line in lines[1:])